@@ -0,0 +1,160 @@
+"""Time barcode scans in the sales form against a large catalog.
+
+Creates a database with --products products, then reports the median and
+99th percentile time of a barcode lookup with idx_products_user_barcode,
+without it, and from the loaded product catalog. Finally replays a
+scanner burst (keystrokes followed by Enter, with repeated and
+alternating barcodes) into the sales form and checks that every scan ended up on the right
+sales line exactly once. Exits with status 1 if the indexed median exceeds
+--budget-ms or the burst lost or duplicated a scan.
+
+    python benchmarks/barcode_lookup.py --products 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication, QMessageBox
+
+from database import catalog, connection
+from database.db_setup import setup_database
+from forms.sales_form import SalesForm
+from forms.workers import get_thread_pool, shutdown_thread_pool
+
+
+def populate(count):
+    with connection.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, barcode, category, subcategory, product_name,
+                description, tax_rate, price, default_unit, user_id
+            ) VALUES (?, ?, 'Category', 'Subcategory', ?, '', 5, 10, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"{i:013d}", f"Product {i:08d}") for i in range(count)))
+
+
+def time_lookups(lookup, barcodes):
+    timings = []
+    for barcode in barcodes:
+        start = time.perf_counter()
+        lookup(barcode)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return (statistics.median(timings) * 1000,
+            timings[int(len(timings) * 0.99)] * 1000)
+
+
+def scan_burst(app, form, barcodes):
+    # Returns the expected (product id, quantity) of each saved line, in order
+    expected = []
+    for barcode in barcodes:
+        product_id = int(barcode) + 1
+        if expected and expected[-1][0] == product_id:
+            expected[-1][1] += 1
+        else:
+            expected.append([product_id, 1])
+        QTest.keyClicks(form.scan_input, barcode)
+        QTest.keyClick(form.scan_input, Qt.Key_Return)
+    # The last line stays on the form until the next scan or Save Sale
+    pending = expected.pop()
+    for _ in range(5):
+        get_thread_pool().waitForDone()
+        app.processEvents()
+    return expected, pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--scans', type=int, default=200)
+    parser.add_argument('--budget-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            connection.set_database_path(os.path.join('database', 'inventory.db'))
+            setup_database()
+            start = time.perf_counter()
+            populate(args.products)
+            print(f"{args.products} products inserted in {time.perf_counter() - start:.1f}s")
+
+            # Built without a user so nothing loads, then pointed at user 1
+            form = SalesForm()
+            form.current_user = {'id': 1}
+            rng = random.Random(42)
+            barcodes = [f"{rng.randrange(args.products):013d}" for _ in range(args.lookups)]
+            print(f"{'lookup':<12} {'median':>9} {'p99':>9}")
+
+            # Nothing is cached until the catalog is loaded, so these hit SQLite
+            def lookup(barcode):
+                return catalog.find_barcode(1, barcode)
+
+            median, p99 = time_lookups(lookup, barcodes)
+            print(f"{'indexed':<12} {median:>7.3f}ms {p99:>7.3f}ms")
+            if median > args.budget_ms:
+                failures.append(f"indexed lookup median over the {args.budget_ms}ms budget")
+
+            conn = connection.get_connection()
+            conn.execute("DROP INDEX idx_products_user_barcode")
+            median, p99 = time_lookups(lookup, barcodes[:20])
+            print(f"{'no index':<12} {median:>7.3f}ms {p99:>7.3f}ms")
+            conn.execute("""
+                CREATE INDEX idx_products_user_barcode ON products
+                (user_id, barcode, sku_id, product_name, tax_rate, price)
+            """)
+
+            start = time.perf_counter()
+            catalog.get_catalog(1)
+            print(f"catalog loaded in {time.perf_counter() - start:.1f}s")
+            median, p99 = time_lookups(lookup, barcodes)
+            print(f"{'cached':<12} {median:>7.3f}ms {p99:>7.3f}ms")
+
+            # Runs of the same barcode, so some scans add to the current line
+            QMessageBox.critical = lambda *a, **k: failures.append(f"save failed: {a[2]}")
+            form.customer_combo.setCurrentText("Walk-in")
+            burst = []
+            while len(burst) < args.scans:
+                burst += [rng.choice(barcodes)] * rng.choice([1, 1, 2, 3])
+            start = time.perf_counter()
+            expected, pending = scan_burst(app, form, burst)
+            elapsed = time.perf_counter() - start
+            print(f"{len(burst)} scans handled and saved in {elapsed * 1000:.0f}ms "
+                  f"({elapsed / len(burst) * 1000:.2f}ms per scan)")
+
+            saved = [list(row) for row in conn.execute(
+                "SELECT product_id, quantity FROM sales ORDER BY id")]
+            if saved != expected:
+                failures.append(f"burst saved {len(saved)} lines, expected {len(expected)}")
+            on_form = [form.product_combo.currentData()['id'], form.quantity_input.value()]
+            if on_form != pending:
+                failures.append(f"last line is {on_form}, expected {pending}")
+            if form.sales_model.rowCount() != len(expected):
+                failures.append("sales history does not show every saved line")
+
+            print(f"catalog cache: {catalog.cache_stats()}")
+            shutdown_thread_pool()
+            connection.close_all()
+        finally:
+            os.chdir(cwd)
+
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Time streaming exports and check memory stays flat as they grow.
+
+Creates a database with --rows sales, then, each in a fresh process,
+exports a tenth of them and all of them to CSV, gzipped CSV and JSON
+Lines with database/exporter.py, and reads the same rows with
+fetchall() for comparison. Reports rows per second and the peak
+resident memory of each process (with memory-mapped I/O off), which
+for the exporter should not grow with the number of rows beyond
+SQLite's page cache, capped by the storage profile's cache_size.
+
+    python benchmarks/export_memory.py --rows 1000000
+"""
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def populate(rows, products):
+    from database import connection
+    from database.db_setup import setup_database
+    setup_database(profile='bulk')
+    with connection.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, category, product_name, tax_rate, price, default_unit, user_id
+            ) VALUES (?, 'General', ?, 5, 10, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"Product number {i}") for i in range(products)))
+        cursor.executemany("INSERT INTO customers (name, user_id) VALUES (?, 1)",
+                           ((f"Customer {i:06d}",) for i in range(1000)))
+        cursor.executemany("""
+            INSERT INTO sales (
+                customer_id, product_id, quantity, rate, tax_rate,
+                total_rate, tax_amount, total_amount, user_id, created_at
+            ) VALUES (?, ?, 3, 12.5, 5, 37.5, 1.88, 39.38, 1, datetime(?, 'unixepoch'))
+        """, ((i % 1000 + 1, i % products + 1, 1420070400 + i * 60) for i in range(rows)))
+    connection.close_all()
+
+
+def child(limit, mode):
+    from database.connection import get_connection
+    from database.exporter import export_rows
+    # Pages of a memory-mapped database count as resident once read, which
+    # would hide what the process itself holds
+    get_connection().execute("PRAGMA mmap_size = 0")
+    # The last `limit` rows, so each mode reads the same rows
+    since_id = get_connection().execute("SELECT MAX(id) FROM sales").fetchone()[0] - limit
+    start = time.perf_counter()
+    if mode == 'fetchall':
+        cursor = get_connection().execute("""
+            SELECT t.id, t.created_at, c.name, p.sku_id, p.product_name, t.quantity,
+                   t.rate, t.tax_rate, t.total_rate, t.tax_amount, t.total_amount
+            FROM sales t
+            JOIN customers c ON c.id = t.customer_id
+            JOIN products p ON p.id = t.product_id
+            WHERE t.user_id = 1 AND t.id > ? ORDER BY t.id
+        """, (since_id,))
+        rows = cursor.fetchall()
+        with open('sales.csv', 'w', newline='') as f:
+            csv.writer(f).writerows(rows)
+        count, output = len(rows), 'sales.csv'
+    else:
+        output = {'csv': 'sales.csv', 'csv.gz': 'sales.csv.gz', 'jsonl': 'sales.jsonl'}[mode]
+        count = export_rows(1, 'sales', output, since_id=since_id)['rows']
+    elapsed = time.perf_counter() - start
+    assert count == limit
+    print(count, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+          os.path.getsize(output))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 0:
+        populate(args.rows, args.products)
+        return
+    if args.child:
+        child(args.child, args.mode)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        script = os.path.abspath(__file__)
+        subprocess.run([sys.executable, script, '--child', '0', '--rows', str(args.rows),
+                        '--products', str(args.products)], cwd=tmp, env=env, check=True)
+        print(f"{'rows':>8} {'mode':>9} {'rows/s':>9} {'time':>7} {'RSS':>8} {'file':>8}")
+        for rows in sorted({max(1, args.rows // 10), args.rows}):
+            for mode in ('fetchall', 'csv', 'csv.gz', 'jsonl'):
+                output = subprocess.run(
+                    [sys.executable, script, '--child', str(rows), '--mode', mode],
+                    cwd=tmp, env=env, check=True, capture_output=True, text=True
+                ).stdout.split()
+                count, elapsed = int(output[-4]), float(output[-3])
+                rss, size = int(output[-2]), int(output[-1])
+                print(f"{count:>8} {mode:>9} {count / elapsed:>9.0f} {elapsed:>6.1f}s "
+                      f"{rss / 1024:>6.0f}MB {size / 1024 / 1024:>6.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Time building and first showing each form, offscreen.
+
+Creates the main window, then builds each form --repeat times as a page
+of its stacked widget, shows it and processes events, so the time covers
+construction, style sheet polishing and the first layout. No user is
+logged in, so no data is loaded. Reports the median per form.
+
+Most of the time is style sheet work: with the application style sheet
+set, a widget is re-polished each time it is reparented (see styles.py).
+
+    python benchmarks/form_construction.py --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+
+from database import connection
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            connection.set_database_path(os.path.join('database', 'inventory.db'))
+            import main as app_main
+            from forms.goods_receiving import GoodsReceivingForm
+            from forms.sales_form import SalesForm
+            from forms.product_master import ProductMasterForm
+            from forms.supplier_master import SupplierMasterForm
+            from forms.customer_master import CustomerMasterForm
+
+            window = app_main.MainWindow()
+            window.show()
+            app.processEvents()
+            pages = window.stacked_widget
+
+            print(f"{'form':<22} {'median':>9} {'max':>9}")
+            total = 0
+            for form_class in (GoodsReceivingForm, SalesForm, ProductMasterForm,
+                               SupplierMasterForm, CustomerMasterForm):
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    form = form_class(current_user=None)
+                    pages.addWidget(form)
+                    pages.setCurrentWidget(form)
+                    app.processEvents()
+                    timings.append(time.perf_counter() - start)
+                    pages.removeWidget(form)
+                    form.deleteLater()
+                    app.processEvents()
+                median = statistics.median(timings) * 1000
+                total += median
+                print(f"{form_class.__name__:<22} {median:>7.1f}ms "
+                      f"{max(timings) * 1000:>7.1f}ms")
+            print(f"{'all forms':<22} {total:>7.1f}ms")
+            window.close()
+            connection.close_all()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Time loading historical sales with the bulk loader and row by row.
+
+Creates a database with --products products and --existing sales, writes
+--rows sales for --customers customers to a CSV file, and loads it with
+database/history.py. For comparison, loads the first --sample rows the
+way the Sales form saves a line: customer lookup and one INSERT per row,
+each in its own transaction, with indexes and triggers in place.
+
+    python benchmarks/history_load.py --rows 1000000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connection
+from database.db_setup import setup_database
+from database.history import load_history
+from database.masters import get_or_create_customer
+
+
+def populate(products, existing):
+    with connection.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, category, product_name, tax_rate, price, default_unit, user_id
+            ) VALUES (?, 'General', ?, 5, 10, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"Product number {i}") for i in range(products)))
+        cursor.execute("INSERT INTO customers (name, user_id) VALUES ('Walk-in', 1)")
+        cursor.executemany("""
+            INSERT INTO sales (
+                customer_id, product_id, quantity, rate, tax_rate,
+                total_rate, tax_amount, total_amount, user_id
+            ) VALUES (1, ?, 1, 10, 5, 10, 0.5, 10.5, 1)
+        """, ((i % products + 1,) for i in range(existing)))
+
+
+def write_file(path, rows, products, customers):
+    rng = random.Random(42)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['created_at', 'customer', 'product_sku', 'quantity', 'rate', 'tax_rate'])
+        for i in range(rows):
+            writer.writerow([
+                f"20{15 + i * 10 // rows:02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} "
+                f"{rng.randint(8, 20):02d}:{rng.randint(0, 59):02d}:00",
+                f"Customer {rng.randrange(customers):06d}",
+                f"SKU-{rng.randrange(products):08d}",
+                rng.randint(1, 20), f"{rng.uniform(1, 500):.2f}", rng.choice([0, 5, 12, 18]),
+            ])
+
+
+def load_row_by_row(path, sample):
+    # What the Sales form does for each line it saves
+    with open(path, newline='') as f:
+        rows = list(zip(range(sample), csv.DictReader(f)))
+    start = time.perf_counter()
+    for _, row in rows:
+        with connection.transaction() as cursor:
+            customer_id, _ = get_or_create_customer(cursor, row['customer'], 1)
+            cursor.execute("SELECT id FROM products WHERE sku_id = ? AND user_id = 1",
+                           (row['product_sku'],))
+            product_id = cursor.fetchone()[0]
+            quantity, rate, tax_rate = int(row['quantity']), float(row['rate']), float(row['tax_rate'])
+            total_rate = quantity * rate
+            tax_amount = total_rate * tax_rate / 100
+            cursor.execute("""
+                INSERT INTO sales (
+                    customer_id, product_id, quantity, rate, tax_rate,
+                    total_rate, tax_amount, total_amount, user_id, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+            """, (customer_id, product_id, quantity, rate, tax_rate, round(total_rate, 2),
+                  round(tax_amount, 2), round(total_rate + tax_amount, 2), row['created_at']))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--customers', type=int, default=5000)
+    parser.add_argument('--existing', type=int, default=100000)
+    parser.add_argument('--sample', type=int, default=5000)
+    parser.add_argument('--profile', default='bulk')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.set_database_path(os.path.join(tmp, 'inventory.db'))
+        setup_database(profile=args.profile)
+        populate(args.products, args.existing)
+        path = os.path.join(tmp, 'sales.csv')
+        write_file(path, args.rows, args.products, args.customers)
+        size = os.path.getsize(path)
+        print(f"{args.rows} sales ({size / 1024 / 1024:.0f}MB CSV) into {args.existing} "
+              f"existing, '{args.profile}' profile")
+
+        start = time.perf_counter()
+        result = load_history(1, 'sales', path)
+        elapsed = time.perf_counter() - start
+        print(f"{'bulk loader':<14} {result['loaded'] / elapsed:>9.0f} rows/s "
+              f"({result['loaded']} rows in {elapsed:.1f}s, {result['error_count']} errors)")
+
+        elapsed = load_row_by_row(path, args.sample)
+        print(f"{'row by row':<14} {args.sample / elapsed:>9.0f} rows/s "
+              f"({args.sample} rows in {elapsed:.1f}s)")
+
+        cursor = connection.get_connection().cursor()
+        cursor.execute("""
+            SELECT (SELECT SUM(quantity) FROM stock_levels),
+                   (SELECT -SUM(quantity) FROM sales)
+        """)
+        stock, sold = cursor.fetchone()
+        print(f"stock levels {'match' if stock == sold else 'DO NOT match'} history")
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Measure file size and list-query time before and after integer keys.
+
+Builds a synthetic database at schema version 2 (text customer/supplier
+names and product SKUs on every transaction row), times the sales list
+query, then applies the integer foreign key migration and measures again.
+
+    python benchmarks/integer_keys.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connection
+from database.db_setup import setup_database
+from database.migrations import migrate
+
+TEXT_KEY_QUERY = """
+    SELECT s.customer, p.product_name, s.quantity, s.rate, s.tax_rate,
+           s.total_rate, s.tax_amount, s.total_amount
+    FROM sales s
+    LEFT JOIN products p ON s.product_sku = p.sku_id AND s.user_id = p.user_id
+    WHERE s.user_id = ?
+    ORDER BY s.id DESC
+"""
+
+INTEGER_KEY_QUERY = """
+    SELECT c.name, p.product_name, s.quantity, s.rate, s.tax_rate,
+           s.total_rate, s.tax_amount, s.total_amount
+    FROM sales s
+    JOIN customers c ON c.id = s.customer_id
+    JOIN products p ON p.id = s.product_id
+    WHERE s.user_id = ?
+    ORDER BY s.id DESC
+"""
+
+
+def populate(rows, products, customers):
+    rng = random.Random(42)
+    with connection.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, category, product_name, tax_rate, price, default_unit, user_id
+            ) VALUES (?, 'General', ?, 5, 10, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"Product number {i}") for i in range(products)))
+        cursor.executemany(
+            "INSERT INTO customers (name, user_id) VALUES (?, 1)",
+            ((f"Customer account {i:06d}",) for i in range(customers))
+        )
+        cursor.executemany("""
+            INSERT INTO sales (
+                customer, product_sku, quantity, rate, tax_rate,
+                total_rate, tax_amount, total_amount, user_id
+            ) VALUES (?, ?, 1, 10, 5, 10, 0.5, 10.5, 1)
+        """, ((f"Customer account {rng.randrange(customers):06d}",
+               f"SKU-{rng.randrange(products):08d}") for _ in range(rows)))
+
+
+def measure(db_path, query):
+    conn = connection.get_connection()
+    conn.execute("VACUUM")
+    size = os.path.getsize(db_path)
+    start = time.perf_counter()
+    conn.execute(query, (1,)).fetchall()
+    return size, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--customers', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            db_path = os.path.join('database', 'inventory.db')
+            connection.set_database_path(db_path)
+            os.makedirs('database', exist_ok=True)
+            connection.set_storage_profile(None)
+            migrate(target_version=2)
+            populate(args.rows, args.products, args.customers)
+
+            text_size, text_time = measure(db_path, TEXT_KEY_QUERY)
+            start = time.perf_counter()
+            setup_database()
+            migration_time = time.perf_counter() - start
+            int_size, int_time = measure(db_path, INTEGER_KEY_QUERY)
+            connection.close_all()
+        finally:
+            os.chdir(cwd)
+
+    print(f"{args.rows} sales, {args.products} products, {args.customers} customers")
+    print(f"{'':<14} {'file size':>12} {'list query':>12}")
+    print(f"{'text keys':<14} {text_size / 1e6:>10.1f}MB {text_time * 1000:>10.1f}ms")
+    print(f"{'integer keys':<14} {int_size / 1e6:>10.1f}MB {int_time * 1000:>10.1f}ms")
+    print(f"migration took {migration_time:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
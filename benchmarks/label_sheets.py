@@ -0,0 +1,90 @@
+"""Time printing label sheets and check memory stays flat as runs grow.
+
+Creates a database of --products products, then, each in a fresh process,
+prints labels for the first tenth of them and for all of them, with one
+worker process and with --workers. Reports sheets per second and the
+peak resident memory of the printing process and of its largest worker,
+which should not grow with the number of labels.
+
+    python benchmarks/label_sheets.py --products 50000 --workers 8
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def populate(products):
+    from database import connection
+    from database.db_setup import setup_database
+    setup_database()
+    with connection.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, barcode, category, subcategory, product_name,
+                description, tax_rate, price, default_unit, user_id
+            ) VALUES (?, ?, 'Category', 'Subcategory', ?, 'A product description',
+                      5, ?, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"{i:013d}", f"Product {i:08d} in a longer name",
+               i % 1000 / 10) for i in range(products)))
+    connection.close_all()
+
+
+def child(labels, workers, code):
+    from database.connection import get_connection
+    from database.labels import generate_labels
+    skus = [row[0] for row in get_connection().execute(
+        "SELECT sku_id FROM products ORDER BY id LIMIT ?", (labels,))]
+    start = time.perf_counter()
+    _, sheets = generate_labels(1, 'labels.pdf', code, skus, workers=workers)
+    elapsed = time.perf_counter() - start
+    print(sheets, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+          resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+          os.path.getsize('labels.pdf'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--code', choices=['qr', 'code128'], default='qr')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 0:
+        populate(args.products)
+        return
+    if args.child:
+        child(args.child, args.workers, args.code)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        script = os.path.abspath(__file__)
+        subprocess.run([sys.executable, script, '--child', '0',
+                        '--products', str(args.products)], cwd=tmp, env=env, check=True)
+        print(f"{os.cpu_count()} CPUs, {args.code} labels")
+        print(f"{'labels':>7} {'workers':>8} {'sheets/s':>9} {'time':>8} "
+              f"{'main RSS':>9} {'worker RSS':>11} {'PDF':>9}")
+        for labels in sorted({max(1, args.products // 10), args.products}):
+            for workers in sorted({1, args.workers}):
+                output = subprocess.run(
+                    [sys.executable, script, '--child', str(labels),
+                     '--workers', str(workers), '--code', args.code],
+                    cwd=tmp, env=env, check=True, capture_output=True, text=True
+                ).stdout.split()
+                sheets, elapsed = int(output[-5]), float(output[-4])
+                main_rss, worker_rss, size = (int(value) for value in output[-3:])
+                print(f"{labels:>7} {workers:>8} {sheets / elapsed:>9.1f} {elapsed:>7.1f}s "
+                      f"{main_rss / 1024:>7.0f}MB {worker_rss / 1024:>9.0f}MB "
+                      f"{size / 1024 / 1024:>7.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
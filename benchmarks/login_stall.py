@@ -0,0 +1,150 @@
+"""Measure the longest event-loop stall while the main window loads after login.
+
+Creates a large database, then logs in as admin in a fresh process and
+records the gap between ticks of a 5ms timer until every form has finished
+loading. Runs once with queries on the worker pool and once with the same
+calls executed inline on the GUI thread. Exits with status 1 if the worker
+run stalls for longer than --budget-ms.
+
+    python benchmarks/login_stall.py --products 200000 --sales 500000
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+TICK_MS = 5
+
+
+def populate(products, parties, rows):
+    from database import connection
+    from database.db_setup import setup_database
+    rng = random.Random(42)
+    setup_database()
+    with connection.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, barcode, category, subcategory, product_name,
+                description, tax_rate, price, default_unit, user_id
+            ) VALUES (?, ?, ?, ?, ?, 'A product description', 5, 10, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"{i:013d}", f"Category {i % 50}",
+               f"Subcategory {i % 400}", f"Product {i:08d}") for i in range(products)))
+        cursor.executemany("INSERT INTO customers (name, user_id) VALUES (?, 1)",
+                           ((f"Customer {i:06d}",) for i in range(parties)))
+        cursor.executemany("INSERT INTO suppliers (name, user_id) VALUES (?, 1)",
+                           ((f"Supplier {i:06d}",) for i in range(parties)))
+        for table, party in (('goods_receiving', 'supplier_id'), ('sales', 'customer_id')):
+            cursor.executemany(f"""
+                INSERT INTO {table} (
+                    {party}, product_id, quantity, rate, tax_rate,
+                    total_rate, tax_amount, total_amount, user_id
+                ) VALUES (?, ?, 1, 10, 5, 10, 0.5, 10.5, 1)
+            """, ((rng.randrange(parties) + 1, rng.randrange(products) + 1)
+                  for _ in range(rows)))
+    connection.close_all()
+
+
+class InlinePool:
+    # Stands in for the QThreadPool so every query runs on the GUI thread
+    def start(self, worker):
+        worker.run()
+
+    def waitForDone(self, msecs=-1):
+        return True
+
+
+def child(mode):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from forms import workers
+    import main
+
+    if mode == 'inline':
+        workers._thread_pool = InlinePool()
+
+    app = QApplication([])
+    window = main.MainWindow()
+    # Build every page up front so the login loads them all, as the
+    # heaviest case; normally only the landing page loads at login
+    for index in range(main.CUSTOMER_MASTER_PAGE + 1):
+        window.page_form(index)
+    forms = window.built_forms()
+    workers.get_thread_pool().waitForDone()
+    app.processEvents()
+
+    gaps = []
+    last = [time.perf_counter()]
+    started = []
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+        if started and not any(form.queries.is_busy() for form in forms):
+            app.quit()
+
+    def login():
+        started.append(time.perf_counter())
+        window.login_window.username_input.setText('admin')
+        window.login_window.password_input.setText('admin123')
+        window.login_window.login()
+
+    timer = QTimer()
+    timer.setInterval(TICK_MS)
+    timer.timeout.connect(tick)
+    timer.start()
+    QTimer.singleShot(20, login)
+    app.exec()
+    elapsed = time.perf_counter() - started[0]
+    print(f"{max(gaps)} {elapsed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--parties', type=int, default=20000)
+    parser.add_argument('--sales', type=int, default=200000)
+    parser.add_argument('--budget-ms', type=float, default=150.0)
+    parser.add_argument('--child', choices=['populate', 'workers', 'inline'],
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 'populate':
+        populate(args.products, args.parties, args.sales)
+        return
+    if args.child:
+        child(args.child)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', 'populate',
+                        '--products', str(args.products), '--parties', str(args.parties),
+                        '--sales', str(args.sales)], cwd=tmp, env=env, check=True)
+        print(f"{args.products} products, {args.parties} customers/suppliers, "
+              f"{args.sales} sales and receiving records")
+        print(f"{'queries':<10} {'longest stall':>14} {'fully loaded':>14}")
+        for mode in ('inline', 'workers'):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', mode],
+                cwd=tmp, env=env, check=True, capture_output=True, text=True
+            ).stdout.split()
+            stall, elapsed = float(output[-2]), float(output[-1])
+            results[mode] = stall
+            print(f"{mode:<10} {stall * 1000:>12.0f}ms {elapsed * 1000:>12.0f}ms")
+
+    if results['workers'] * 1000 > args.budget_ms:
+        print(f"longest stall exceeds the {args.budget_ms:.0f}ms budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Compare the paged product grid with filling a QTableWidget up front.
+
+Creates a database with many products, then opens the grid in a fresh
+process for each implementation and reports the time until the grid is
+shown and the process memory growth. Runs offscreen, no display needed.
+
+    python benchmarks/product_grid.py --products 200000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+PRODUCT_COLUMNS = """
+    sku_id, barcode, category, subcategory, product_name,
+    description, tax_rate, price, default_unit
+"""
+
+
+def rss_bytes():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def populate(count):
+    from database import connection
+    from database.db_setup import setup_database
+    setup_database()
+    with connection.transaction() as cursor:
+        cursor.executemany(f"""
+            INSERT INTO products ({PRODUCT_COLUMNS}, user_id)
+            VALUES (?, ?, 'Category', 'Subcategory', ?, 'A product description',
+                    5, 10, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"{i:013d}", f"Product {i:08d}") for i in range(count)))
+    connection.close_all()
+
+
+def open_table_widget():
+    # The grid as it was: one QTableWidgetItem per cell for every product
+    from PySide6.QtWidgets import QTableWidget, QTableWidgetItem
+    from database.connection import get_connection
+    table = QTableWidget()
+    table.setColumnCount(9)
+    rows = get_connection().execute(f"""
+        SELECT {PRODUCT_COLUMNS} FROM products WHERE user_id = ? ORDER BY product_name
+    """, (1,)).fetchall()
+    table.setRowCount(len(rows))
+    for row, product in enumerate(rows):
+        for col, value in enumerate(product):
+            table.setItem(row, col, QTableWidgetItem(str(value) if value is not None else ""))
+    return table
+
+
+def open_paged_model():
+    from forms.product_master import ProductMasterForm
+    form = ProductMasterForm({'id': 1, 'username': 'admin', 'name': 'Administrator'})
+    return form
+
+
+def child(mode):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtWidgets import QApplication
+    from database.db_setup import setup_database
+    from forms.workers import get_thread_pool
+    app = QApplication([])
+    setup_database()
+    before = rss_bytes()
+    start = time.perf_counter()
+    widget = open_table_widget() if mode == 'widget' else open_paged_model()
+    widget.show()
+    # The paged model reads its first page on a worker thread
+    get_thread_pool().waitForDone()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed} {rss_bytes() - before}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=200000)
+    parser.add_argument('--child', choices=['populate', 'widget', 'model'],
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 'populate':
+        populate(args.products)
+        return
+    if args.child:
+        child(args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', 'populate',
+                        '--products', str(args.products)], cwd=tmp, env=env, check=True)
+        print(f"{args.products} products")
+        print(f"{'grid':<22} {'open time':>10} {'memory':>10}")
+        for mode, label in (('widget', 'QTableWidget (old)'), ('model', 'KeysetTableModel')):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', mode],
+                cwd=tmp, env=env, check=True, capture_output=True, text=True
+            ).stdout.split()
+            elapsed, memory = float(output[-2]), int(output[-1])
+            print(f"{label:<22} {elapsed * 1000:>8.0f}ms {memory / 1e6:>8.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
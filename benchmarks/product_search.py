@@ -0,0 +1,106 @@
+"""Time product searches against a large catalog.
+
+Creates a database with many products built from a small vocabulary, so
+common words match thousands of rows, then runs a set of typical searches
+(whole words, partial words, barcodes and SKUs) and reports the median and
+worst time of each. Exits with status 1 if any median exceeds --budget-ms.
+
+    python benchmarks/product_search.py --products 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connection
+from database.db_setup import setup_database
+from database.search import search_products, SEARCH_LIMIT
+
+BRANDS = ["Acme", "Northwind", "Contoso", "Fabrikam", "Globex", "Initech", "Umbrella",
+          "Stark", "Wayne", "Tyrell", "Cyberdyne", "Hooli", "Vandelay", "Wonka"]
+COLORS = ["Red", "Blue", "Green", "Black", "White", "Silver", "Yellow", "Purple",
+          "Orange", "Grey", "Navy", "Teal"]
+ITEMS = ["Shirt", "Trousers", "Jacket", "Kettle", "Toaster", "Blender", "Drill",
+         "Hammer", "Screwdriver", "Notebook", "Pen", "Stapler", "Lamp", "Chair",
+         "Desk", "Backpack", "Bottle", "Mug", "Plate", "Charger", "Cable", "Headphones"]
+SIZES = ["Small", "Medium", "Large", "XL", "250ml", "500ml", "1L", "Pack of 6"]
+CATEGORIES = ["Clothing", "Kitchen", "Tools", "Stationery", "Furniture", "Electronics"]
+
+QUERIES = [
+    "blue shirt",
+    "blue sh",
+    "northwind kettle large",
+    "hea",
+    "sta",
+    "stapler",
+    "0000000012345",
+    "SKU-00123456",
+    "tyrell lamp 500ml",
+    "nothing matches this",
+]
+
+SEARCH_COLUMNS = "p.id, p.sku_id, p.product_name, p.tax_rate, p.price"
+
+
+def populate(count):
+    rng = random.Random(42)
+    with connection.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, barcode, category, subcategory, product_name,
+                description, tax_rate, price, default_unit, user_id
+            ) VALUES (?, ?, ?, ?, ?, ?, 5, 10, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"{i:013d}", rng.choice(CATEGORIES), rng.choice(ITEMS),
+               f"{rng.choice(BRANDS)} {rng.choice(COLORS)} {rng.choice(ITEMS)} "
+               f"{rng.choice(SIZES)} {i}",
+               f"A {rng.choice(COLORS).lower()} {rng.choice(ITEMS).lower()} "
+               f"from {rng.choice(BRANDS)}") for i in range(count)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=500000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=SEARCH_LIMIT)
+    parser.add_argument('--budget-ms', type=float, default=10.0)
+    args = parser.parse_args()
+
+    over_budget = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            connection.set_database_path(os.path.join('database', 'inventory.db'))
+            setup_database()
+            start = time.perf_counter()
+            populate(args.products)
+            print(f"{args.products} products inserted and indexed in "
+                  f"{time.perf_counter() - start:.1f}s")
+            print(f"{'query':<26} {'results':>8} {'median':>9} {'max':>9}")
+            for query in QUERIES:
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    rows = search_products(1, query, SEARCH_COLUMNS, args.limit)
+                    timings.append(time.perf_counter() - start)
+                median = statistics.median(timings) * 1000
+                if median > args.budget_ms:
+                    over_budget.append(query)
+                print(f"{query:<26} {len(rows):>8} {median:>7.2f}ms "
+                      f"{max(timings) * 1000:>7.2f}ms")
+            connection.close_all()
+        finally:
+            os.chdir(cwd)
+
+    if over_budget:
+        print(f"over the {args.budget_ms:.0f}ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Scroll the product grid to the bottom and count thumbnails decoded.
+
+Creates a database of products with their own photos, saved the old way
+(full size, named after the SKU) so every grid thumbnail has to be made
+from the photo. Then, in a fresh process, opens Product Master offscreen,
+scrolls the whole grid a page per event-loop turn and waits for the last
+screen's thumbnails. Reports how many photos were decoded, against rows
+scrolled past, and the longest the GUI thread was stalled (gap between
+ticks of a 5ms timer) while scrolling. Runs with the thumbnail column
+left empty ("off"), then "cold" with no thumbnails on disk and "warm"
+with the ones the cold run made.
+
+    python benchmarks/product_thumbnails.py --products 5000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+TICK_MS = 5
+
+
+def populate(products):
+    from PIL import Image
+    from database import connection
+    from database.db_setup import setup_database
+    setup_database()
+    os.makedirs('images', exist_ok=True)
+    background = Image.linear_gradient('L').resize((1600, 1200)).convert('RGB')
+    for i in range(products):
+        photo = background.copy()
+        photo.paste((i * 37 % 256, i * 91 % 256, i * 53 % 256), (0, 0, 800, 600))
+        photo.save(f"images/SKU-{i:08d}.jpg", quality=90)
+    with connection.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, barcode, category, subcategory, product_name,
+                description, tax_rate, price, default_unit, user_id, image_path
+            ) VALUES (?, ?, 'Category', 'Subcategory', ?, 'A product description',
+                      5, 10, 'pc', 1, ?)
+        """, ((f"SKU-{i:08d}", f"{i:013d}", f"Product {i:08d}",
+               f"images/SKU-{i:08d}.jpg") for i in range(products)))
+    connection.close_all()
+
+
+def child(thumbnails):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication, QScrollArea
+    from database import images
+    from database.db_setup import setup_database
+    from forms.product_master import ProductMasterForm
+    from forms.thumbnails import ThumbnailLoader
+    from forms.workers import get_thread_pool, shutdown_thread_pool
+
+    if not thumbnails:
+        ThumbnailLoader.pixmap = lambda self, image_path: None
+
+    decoded = []
+    decode = images._decode
+    images._decode = lambda path, size: decoded.append(path) or decode(path, size)
+
+    app = QApplication([])
+    setup_database()
+    form = ProductMasterForm({'id': 1, 'username': 'admin', 'name': 'Administrator'})
+    form.resize(1200, 800)
+    form.show()
+    get_thread_pool().waitForDone()
+    app.processEvents()
+    table = form.products_table
+    form.findChild(QScrollArea).ensureWidgetVisible(table)
+    app.processEvents()
+    loader = form.products_model.thumbnails
+    scroll_bar = table.verticalScrollBar()
+
+    stalls = []
+    last_tick = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        stalls.append(now - last_tick[0])
+        last_tick[0] = now
+
+    timer = QTimer()
+    timer.setInterval(TICK_MS)
+    timer.timeout.connect(tick)
+    timer.start()
+
+    # A page per turn, reading more rows from the database as it goes
+    while not (scroll_bar.value() == scroll_bar.maximum()
+               and not form.products_model.canFetchMore()):
+        scroll_bar.setValue(scroll_bar.value() + scroll_bar.pageStep())
+        app.processEvents()
+    timer.stop()
+    scroll_stall = max(stalls)
+
+    # Then wait for the last screen's thumbnails, leaving the CPU idle (the
+    # image thread runs only when it is), until a repaint asks for no more
+    def check():
+        if not loader.jobs.is_busy() and not loader.wanted:
+            app.quit()
+
+    table.viewport().update()
+    timer.timeout.disconnect(tick)
+    timer.timeout.connect(check)
+    timer.start()
+    start = time.perf_counter()
+    app.exec()
+    last_screen = time.perf_counter() - start
+
+    shutdown_thread_pool()
+    print(f"{form.products_model.rowCount()} {len(decoded)} {scroll_stall} {last_screen}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--child', choices=['populate', 'off', 'on'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 'populate':
+        populate(args.products)
+        return
+    if args.child:
+        child(args.child == 'on')
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', 'populate',
+                        '--products', str(args.products)],
+                       cwd=tmp, env=env, check=True)
+        print(f"{args.products} products, each with a 1600x1200 photo")
+        print(f"{'run':<6} {'rows':>7} {'decoded':>8} {'max stall':>10} {'last screen':>12}")
+        for run, mode in (('off', 'off'), ('cold', 'on'), ('warm', 'on')):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', mode],
+                cwd=tmp, env=env, check=True, capture_output=True, text=True
+            ).stdout.split()
+            rows, decoded = int(output[-4]), int(output[-3])
+            stall, last_screen = float(output[-2]), float(output[-1])
+            print(f"{run:<6} {rows:>7} {decoded:>8} {stall * 1000:>8.0f}ms "
+                  f"{last_screen * 1000:>10.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Check that the per-user list queries are served by indexes.
+
+Builds a fresh database in a temporary directory, runs EXPLAIN QUERY PLAN
+on each list query used by the forms and exits non-zero if any of them
+falls back to a full table scan or a temporary B-tree sort.
+
+    python benchmarks/query_plans.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connection
+from database.catalog import CATALOG_QUERY, BARCODE_QUERY, CATEGORY_TREE_QUERY
+from database.db_setup import setup_database
+from database.exporter import EXPORTS
+from database.rollups import _rollup_rows
+from forms.customer_master import CUSTOMERS_FIRST_PAGE_QUERY, CUSTOMERS_PAGE_QUERY
+from forms.goods_receiving import RECEIVING_PAGE_QUERY
+from forms.product_master import PRODUCTS_FIRST_PAGE_QUERY, PRODUCTS_PAGE_QUERY
+from forms.sales_form import SALES_PAGE_QUERY
+from forms.sales_history import HISTORY_SELECT, history_filters
+from forms.supplier_master import SUPPLIERS_FIRST_PAGE_QUERY, SUPPLIERS_PAGE_QUERY
+
+LIST_QUERIES = {
+    'SalesForm.fetch_sales_page': SALES_PAGE_QUERY,
+    'GoodsReceivingForm.fetch_receiving_page': RECEIVING_PAGE_QUERY,
+    'ProductMasterForm.fetch_products_page (first page)': PRODUCTS_FIRST_PAGE_QUERY,
+    'ProductMasterForm.fetch_products_page': PRODUCTS_PAGE_QUERY,
+    'catalog.get_catalog': CATALOG_QUERY,
+    'catalog.find_barcode': BARCODE_QUERY,
+    'catalog.get_category_tree': CATEGORY_TREE_QUERY,
+    'SupplierMasterForm.fetch_suppliers_page (first page)': SUPPLIERS_FIRST_PAGE_QUERY,
+    'SupplierMasterForm.fetch_suppliers_page': SUPPLIERS_PAGE_QUERY,
+    'CustomerMasterForm.fetch_customers_page (first page)': CUSTOMERS_FIRST_PAGE_QUERY,
+    'CustomerMasterForm.fetch_customers_page': CUSTOMERS_PAGE_QUERY,
+}
+
+# Exports stream through fetchmany, so a sort would hold every row first
+for _table, _query in EXPORTS.items():
+    if _table != 'products':
+        LIST_QUERIES[f'exporter.export_rows ({_table})'] = f"""
+            {_query} WHERE t.user_id = ? AND t.id > ? ORDER BY t.id
+        """
+    LIST_QUERIES[f'exporter.export_rows ({_table} by date)'] = f"""
+        {_query} WHERE t.user_id = ? AND t.created_at >= ? AND t.created_at < date(?, '+1 day')
+        ORDER BY t.created_at, t.id
+    """
+
+# Every filter combination of the Sales History screen, on a later page
+for _name, _filters in {
+    'no filters': {},
+    'dates': {'start': '2024-01-01', 'end': '2024-12-31'},
+    'customer': {'customer_id': 1},
+    'product': {'product_id': 1},
+    'customer and dates': {'customer_id': 1, 'start': '2024-01-01', 'end': '2024-12-31'},
+    'product and dates': {'product_id': 1, 'start': '2024-01-01', 'end': '2024-12-31'},
+    'customer and product': {'customer_id': 1, 'product_id': 1},
+}.items():
+    _index, _where, _ = history_filters(1, **_filters)
+    LIST_QUERIES[f'SalesHistoryForm.query_history_page ({_name})'] = f"""
+        {HISTORY_SELECT.format(index=_index)}
+        WHERE {_where} AND (s.created_at, s.id) < (?, ?)
+        ORDER BY s.created_at DESC, s.id DESC
+        LIMIT ?
+    """
+
+# Rollup rows read by the Reports screen, days at either end of a range of
+# months; grouping what they return is cheap, so only the reads are checked
+for _scope in ('total', 'product', 'customer'):
+    LIST_QUERIES[f'rollups._rollup_rows ({_scope})'] = \
+        _rollup_rows(1, _scope, '2023-01-15', '2024-06-10')[0]
+
+
+def plan_problems(plan):
+    problems = []
+    for detail in plan:
+        if detail.startswith('SCAN '):
+            problems.append(detail)
+        if 'USE TEMP B-TREE' in detail:
+            problems.append(detail)
+    return problems
+
+
+def main():
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            connection.set_database_path(os.path.join('database', 'inventory.db'))
+            setup_database()
+            conn = connection.get_connection()
+            for name, query in LIST_QUERIES.items():
+                params = (1,) * query.count('?')
+                plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+                problems = plan_problems(plan)
+                status = 'FAIL' if problems else 'ok'
+                failed = failed or bool(problems)
+                print(f"{status:<5} {name}")
+                for detail in plan:
+                    print(f"        {detail}")
+            connection.close_all()
+        finally:
+            os.chdir(cwd)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Time Sales History searches over years of sales.
+
+Creates a database with --rows sales spread over --years, then for each
+filter combination of the Sales History screen times the first page, the
+average page while scrolling through up to --depth pages with keyset
+pagination as the screen does, and page --depth read with OFFSET for
+comparison. Reports the best of --repeat runs in milliseconds; the
+screen aims for under 100ms per page.
+
+    python benchmarks/sales_history.py --rows 2000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connection
+from database.db_setup import setup_database
+from forms.sales_history import HISTORY_SELECT, history_filters, query_history_page
+from forms.table_models import PAGE_SIZE
+
+TARGET_MS = 100
+
+
+def populate(rows, years, products, customers):
+    setup_database(profile='bulk')
+    with connection.transaction() as cursor:
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, category, product_name, tax_rate, price, default_unit, user_id
+            ) VALUES (?, 'General', ?, 5, 10, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"Product number {i}") for i in range(products)))
+        cursor.executemany("INSERT INTO customers (name, user_id) VALUES (?, 1)",
+                           ((f"Customer {i:06d}",) for i in range(customers)))
+        # A sale every few minutes, oldest first, as a shop would record them
+        step = years * 365 * 86400 // rows
+        cursor.executemany("""
+            INSERT INTO sales (
+                customer_id, product_id, quantity, rate, tax_rate,
+                total_rate, tax_amount, total_amount, user_id, created_at
+            ) VALUES (?, ?, 3, 12.5, 5, 37.5, 1.88, 39.38, 1,
+                      datetime(1420070400 + ?, 'unixepoch'))
+        """, ((i * 7919 % customers + 1, i * 104729 % products + 1, i * step)
+              for i in range(rows)))
+
+
+def best_ms(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def keyset_pages(filters, depth):
+    # Pages read, which is fewer than depth for a narrow search
+    last_row = None
+    for pages in range(1, depth + 1):
+        page = query_history_page(1, filters, last_row, PAGE_SIZE)
+        if len(page) < PAGE_SIZE:
+            return pages
+        last_row = page[-1]
+    return depth
+
+
+def offset_page(filters, depth):
+    index, where, params = history_filters(1, **filters)
+    return connection.get_connection().execute(f"""
+        {HISTORY_SELECT.format(index=index)}
+        WHERE {where}
+        ORDER BY s.created_at DESC, s.id DESC
+        LIMIT ? OFFSET ?
+    """, params + [PAGE_SIZE, (depth - 1) * PAGE_SIZE]).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--years', type=int, default=6)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--customers', type=int, default=5000)
+    parser.add_argument('--depth', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    searches = {
+        'no filters': {},
+        'one month': {'start': '2018-03-01', 'end': '2018-03-31'},
+        'one year': {'start': '2017-01-01', 'end': '2017-12-31'},
+        'customer': {'customer_id': 42},
+        'product': {'product_id': 42},
+        'customer, one year': {'customer_id': 42, 'start': '2017-01-01', 'end': '2017-12-31'},
+        'product, one year': {'product_id': 42, 'start': '2017-01-01', 'end': '2017-12-31'},
+        'customer and product': {'customer_id': 42, 'product_id': 42},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.set_database_path(os.path.join(tmp, 'inventory.db'))
+        populate(args.rows, args.years, args.products, args.customers)
+        print(f"{args.rows} sales over {args.years} years, {PAGE_SIZE} rows per page")
+        print(f"{'search':<22} {'first page':>11} {'scrolling':>16} "
+              f"{f'page {args.depth} (OFFSET)':>18}")
+        slow = False
+        for name, filters in searches.items():
+            first = best_ms(lambda: query_history_page(1, filters, None, PAGE_SIZE), args.repeat)
+            pages = keyset_pages(filters, args.depth)
+            deep = best_ms(lambda: keyset_pages(filters, args.depth), args.repeat) / pages
+            offset = best_ms(lambda: offset_page(filters, args.depth), args.repeat)
+            slow = slow or max(first, deep) > TARGET_MS
+            print(f"{name:<22} {first:>9.1f}ms {deep:>6.1f}ms x {pages:<4} "
+                  f"{offset:>16.1f}ms")
+        print(f"every page under {TARGET_MS}ms" if not slow else f"some pages over {TARGET_MS}ms")
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
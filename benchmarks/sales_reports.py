@@ -0,0 +1,211 @@
+"""Time the Reports screen's queries against aggregating sales directly.
+
+Creates a database with --rows sales spread over --years and computes
+their rollups as the history loader does, then times each report query
+of the Reports screen and the same figures computed with GROUP BY over
+sales. Also times saving --saves sales one per transaction
+with and without the rollup triggers, which is what keeping the rollups
+current costs a till. Reports the best of --repeat runs in milliseconds.
+
+    python benchmarks/sales_reports.py --rows 2000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connection
+from database.db_setup import setup_database
+from database.rollups import (get_sales_summary, get_sales_by_period, get_top_sellers,
+                              rebuild_sales_rollups)
+
+TARGET_MS = 100
+
+ROLLUP_TRIGGERS = ('trg_sales_rollup_insert', 'trg_sales_rollup_delete',
+                   'trg_sales_rollup_update')
+
+INSERT_SALE = """
+    INSERT INTO sales (
+        customer_id, product_id, quantity, rate, tax_rate,
+        total_rate, tax_amount, total_amount, user_id, created_at
+    ) VALUES (?, ?, 3, 12.5, 5, 37.5, 1.88, 39.38, 1,
+              datetime(1420070400 + ?, 'unixepoch'))
+"""
+
+MEASURES = """
+    COUNT(*), SUM(s.quantity), SUM(s.total_rate), SUM(s.tax_amount), SUM(s.total_amount)
+"""
+
+# The same figures straight from sales; a day's sales end before the next day
+DIRECT_QUERIES = {
+    'summary': f"""
+        SELECT {MEASURES} FROM sales s
+        WHERE s.user_id = 1 AND s.created_at >= :start AND s.created_at < date(:end, '+1 day')
+    """,
+    'by day': f"""
+        SELECT date(s.created_at) AS day, {MEASURES} FROM sales s
+        WHERE s.user_id = 1 AND s.created_at >= :start AND s.created_at < date(:end, '+1 day')
+        GROUP BY day ORDER BY day
+    """,
+    'by month': f"""
+        SELECT date(s.created_at, 'start of month') AS month, {MEASURES} FROM sales s
+        WHERE s.user_id = 1 AND s.created_at >= :start AND s.created_at < date(:end, '+1 day')
+        GROUP BY month ORDER BY month
+    """,
+    'by year': f"""
+        SELECT date(s.created_at, 'start of year') AS year, {MEASURES} FROM sales s
+        WHERE s.user_id = 1 AND s.created_at >= :start AND s.created_at < date(:end, '+1 day')
+        GROUP BY year ORDER BY year
+    """,
+    'top products': f"""
+        SELECT p.product_name || ' (' || p.sku_id || ')', {MEASURES} FROM sales s
+        JOIN products p ON p.id = s.product_id
+        WHERE s.user_id = 1 AND s.created_at >= :start AND s.created_at < date(:end, '+1 day')
+        GROUP BY s.product_id ORDER BY SUM(s.total_amount) DESC LIMIT 20
+    """,
+    'top customers': f"""
+        SELECT c.name, {MEASURES} FROM sales s
+        JOIN customers c ON c.id = s.customer_id
+        WHERE s.user_id = 1 AND s.created_at >= :start AND s.created_at < date(:end, '+1 day')
+        GROUP BY s.customer_id ORDER BY SUM(s.total_amount) DESC LIMIT 20
+    """,
+}
+
+ROLLUP_QUERIES = {
+    'summary': lambda start, end: get_sales_summary(1, start, end),
+    'by day': lambda start, end: get_sales_by_period(1, 'day', start, end),
+    'by month': lambda start, end: get_sales_by_period(1, 'month', start, end),
+    'by year': lambda start, end: get_sales_by_period(1, 'year', start, end),
+    'top products': lambda start, end: get_top_sellers(1, 'product', start, end),
+    'top customers': lambda start, end: get_top_sellers(1, 'customer', start, end),
+}
+
+
+def drop_rollup_triggers(cursor):
+    # Returns what restore_rollup_triggers needs to put them back
+    cursor.execute(f"""
+        SELECT sql FROM sqlite_master
+        WHERE type = 'trigger' AND name IN ({', '.join('?' * len(ROLLUP_TRIGGERS))})
+    """, ROLLUP_TRIGGERS)
+    triggers = [row[0] for row in cursor.fetchall()]
+    for name in ROLLUP_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER {name}")
+    return triggers
+
+
+def restore_rollup_triggers(cursor, triggers):
+    for sql in triggers:
+        cursor.execute(sql)
+
+
+def populate(rows, years, products, customers):
+    setup_database(profile='bulk')
+    with connection.transaction() as cursor:
+        triggers = drop_rollup_triggers(cursor)
+        cursor.executemany("""
+            INSERT INTO products (
+                sku_id, category, product_name, tax_rate, price, default_unit, user_id
+            ) VALUES (?, 'General', ?, 5, 10, 'pc', 1)
+        """, ((f"SKU-{i:08d}", f"Product number {i}") for i in range(products)))
+        cursor.executemany("INSERT INTO customers (name, user_id) VALUES (?, 1)",
+                           ((f"Customer {i:06d}",) for i in range(customers)))
+        # A sale every few minutes, oldest first, as a shop would record them
+        step = years * 365 * 86400 // rows
+        cursor.executemany(INSERT_SALE, ((i * 7919 % customers + 1, i * 104729 % products + 1,
+                                          i * step) for i in range(rows)))
+        rebuild_sales_rollups(cursor)
+        restore_rollup_triggers(cursor, triggers)
+    connection.close_all()
+
+
+def best_ms(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def figures(rows, name):
+    if name.startswith('top'):
+        # Which of several best sellers with equal totals make the list is
+        # up to rounding, so only the totals are compared
+        return [round(row[-1], 2) for row in rows]
+    return [[round(v, 2) if isinstance(v, float) else v for v in row] for row in rows]
+
+
+def save_sales(saves, products, customers):
+    # One sale per transaction, as the Sales screen saves them
+    start = time.perf_counter()
+    for i in range(saves):
+        with connection.transaction() as cursor:
+            cursor.execute(INSERT_SALE, (i % customers + 1, i % products + 1, i))
+    return (time.perf_counter() - start) * 1000 / saves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--years', type=int, default=6)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--customers', type=int, default=5000)
+    parser.add_argument('--saves', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    last_year = 2015 + args.years - 1
+    periods = {
+        'one month': ('2017-03-01', '2017-03-31'),
+        'a year, mid-month': ('2016-07-15', '2017-07-14'),
+        'one year': (f'{last_year}-01-01', f'{last_year}-12-31'),
+        'all years': ('2015-01-01', f'{last_year}-12-31'),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.set_database_path(os.path.join(tmp, 'inventory.db'))
+        start = time.perf_counter()
+        populate(args.rows, args.years, args.products, args.customers)
+        print(f"{args.rows} sales over {args.years} years, "
+              f"loaded with rollups in {time.perf_counter() - start:.1f}s")
+        setup_database()
+        conn = connection.get_connection()
+
+        print(f"{'query':<14} {'period':<18} {'rollups':>9} {'sales':>10}")
+        slow = False
+        for period, (start, end) in periods.items():
+            for name, rollup_query in ROLLUP_QUERIES.items():
+                if (name, period) in (('by day', 'all years'), ('by year', 'one month')):
+                    continue
+                # Both ways give the same figures, to the cent
+                expected = figures(conn.execute(
+                    DIRECT_QUERIES[name], {'start': start, 'end': end}).fetchall(), name)
+                result = rollup_query(start, end)
+                result = figures([result] if name == 'summary' else result, name)
+                assert result == expected, (name, period)
+
+                rollups = best_ms(lambda: rollup_query(start, end), args.repeat)
+                direct = best_ms(lambda: conn.execute(
+                    DIRECT_QUERIES[name], {'start': start, 'end': end}).fetchall(), args.repeat)
+                slow = slow or rollups > TARGET_MS
+                print(f"{name:<14} {period:<18} {rollups:>7.1f}ms {direct:>8.1f}ms")
+        print(f"every report under {TARGET_MS}ms" if not slow
+              else f"some reports over {TARGET_MS}ms")
+
+        with_triggers = save_sales(args.saves, args.products, args.customers)
+        with connection.transaction() as cursor:
+            triggers = drop_rollup_triggers(cursor)
+        without_triggers = save_sales(args.saves, args.products, args.customers)
+        with connection.transaction() as cursor:
+            restore_rollup_triggers(cursor, triggers)
+        print(f"saving a sale: {with_triggers:.3f}ms with rollups, "
+              f"{without_triggers:.3f}ms without")
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
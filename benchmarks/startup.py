@@ -0,0 +1,122 @@
+"""Measure time to the login window and from login to the first usable page.
+
+Creates a large database, then starts the application in fresh processes
+and reports, per run:
+
+- login window: from process start until the event loop first runs with
+  the login window up, i.e. when it can take input
+- first page: from submitting the login until the page shown after login
+  has finished loading
+
+"lazy" is the application as shipped: forms are built when their page is
+first shown, and the landing page is built while the login window waits
+for input. "eager" builds every form before the login window appears and
+loads them all at login, as the application used to.
+
+Exits with status 1 if the lazy median time to the login window exceeds
+--budget-ms, so a slow new import on the startup path shows up here; run
+main.py with INVENTORY_PROFILE_STARTUP=1 to see which import it is.
+
+    python benchmarks/startup.py --products 100000 --sales 200000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Time "spent typing" between the login window appearing and the login
+TYPING_MS = 500
+TICK_MS = 5
+
+
+def child(mode, started):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from forms.workers import shutdown_thread_pool
+    import main
+
+    marks = {}
+    app = QApplication([])
+    # Queued before MainWindow's own timers, so it fires on the first turn
+    # of the event loop
+    QTimer.singleShot(0, lambda: marks.setdefault('login_window', time.monotonic()))
+    window = main.MainWindow()
+    if mode == 'eager':
+        for index in range(main.CUSTOMER_MASTER_PAGE + 1):
+            window.page_form(index)
+
+    def login():
+        marks['login'] = time.monotonic()
+        window.login_window.username_input.setText('admin')
+        window.login_window.password_input.setText('admin123')
+        window.login_window.login()
+
+    def tick():
+        page = window.stacked_widget.currentWidget()
+        if 'login' in marks and not page.queries.is_busy():
+            marks['first_page'] = time.monotonic()
+            app.quit()
+
+    timer = QTimer()
+    timer.setInterval(TICK_MS)
+    timer.timeout.connect(tick)
+    timer.start()
+    QTimer.singleShot(TYPING_MS, login)
+    app.exec()
+    # Other pages may still be loading in eager mode
+    shutdown_thread_pool()
+    print(f"{marks['login_window'] - started} {marks['first_page'] - marks['login']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--parties', type=int, default=20000)
+    parser.add_argument('--sales', type=int, default=200000)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--budget-ms', type=float, default=800.0)
+    parser.add_argument('--child', choices=['lazy', 'eager'], help=argparse.SUPPRESS)
+    parser.add_argument('--started', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.started)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        subprocess.run([sys.executable, os.path.join(REPO_ROOT, 'benchmarks', 'login_stall.py'),
+                        '--child', 'populate', '--products', str(args.products),
+                        '--parties', str(args.parties), '--sales', str(args.sales)],
+                       cwd=tmp, env=env, check=True)
+        print(f"{args.products} products, {args.parties} customers/suppliers, "
+              f"{args.sales} sales and receiving records; median of {args.runs} runs")
+        print(f"{'forms':<8} {'login window':>14} {'first page':>12}")
+        for mode in ('eager', 'lazy'):
+            results = []
+            for _ in range(args.runs):
+                started = time.monotonic()
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', mode,
+                     '--started', repr(started)],
+                    cwd=tmp, env=env, check=True, capture_output=True, text=True
+                ).stdout.split()
+                results.append((float(output[-2]), float(output[-1])))
+            login_window = statistics.median(result[0] for result in results)
+            first_page = statistics.median(result[1] for result in results)
+            print(f"{mode:<8} {login_window * 1000:>12.0f}ms {first_page * 1000:>10.0f}ms")
+
+    if login_window * 1000 > args.budget_ms:
+        print(f"time to the login window exceeds the {args.budget_ms:.0f}ms budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Compare write throughput and read latency across storage profiles.
+
+Simulates several tills committing single-row sales while another terminal
+keeps reloading its sales list, once per storage profile, on a fresh
+database in a temporary directory.
+
+    python benchmarks/storage_profiles.py --writers 4 --duration 5
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connection
+from database.db_setup import setup_database
+from database.storage_profiles import STORAGE_PROFILES
+
+SALES_LIST_QUERY = """
+    SELECT c.name, p.product_name, s.quantity, s.rate, s.tax_rate,
+           s.total_rate, s.tax_amount, s.total_amount
+    FROM sales s
+    JOIN customers c ON c.id = s.customer_id
+    JOIN products p ON p.id = s.product_id
+    WHERE s.user_id = ?
+    ORDER BY s.id DESC
+    LIMIT 200
+"""
+
+
+def writer(stop, counts, errors, user_id):
+    pool = connection.get_pool()
+    written = 0
+    while not stop.is_set():
+        try:
+            with pool.transaction() as cursor:
+                cursor.execute("""
+                    INSERT INTO sales (
+                        customer_id, product_id, quantity, rate, tax_rate,
+                        total_rate, tax_amount, total_amount, user_id
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (1, 1, 1, 10.0, 5.0, 10.0, 0.5, 10.5, user_id))
+            written += 1
+        except sqlite3.OperationalError:
+            errors.append(1)
+    counts.append(written)
+    pool.release()
+
+
+def reader(stop, latencies, errors):
+    pool = connection.get_pool()
+    conn = pool.get_connection()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            conn.execute(SALES_LIST_QUERY, (1,)).fetchall()
+        except sqlite3.OperationalError:
+            errors.append(1)
+            continue
+        latencies.append(time.perf_counter() - start)
+    pool.release()
+
+
+def run_profile(name, writers, duration):
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            connection.set_database_path(os.path.join('database', 'inventory.db'))
+            setup_database(profile=name)
+            with connection.transaction() as cursor:
+                cursor.execute("INSERT INTO customers (name, user_id) VALUES ('Walk-in', 1)")
+                cursor.execute("""
+                    INSERT INTO products (
+                        sku_id, category, product_name, tax_rate, price, default_unit, user_id
+                    ) VALUES ('SKU-1', 'General', 'Item', 5, 10, 'pc', 1)
+                """)
+            connection.close_all()
+
+            stop = threading.Event()
+            counts, latencies, errors = [], [], []
+            threads = [threading.Thread(target=writer, args=(stop, counts, errors, 1))
+                       for _ in range(writers)]
+            threads.append(threading.Thread(target=reader, args=(stop, latencies, errors)))
+            for thread in threads:
+                thread.start()
+            time.sleep(duration)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            connection.close_all()
+        finally:
+            os.chdir(cwd)
+
+    latencies.sort()
+    return {
+        'writes_per_sec': sum(counts) / duration,
+        'read_p50_ms': statistics.median(latencies) * 1000 if latencies else float('nan'),
+        'read_p95_ms': latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float('nan'),
+        'read_max_ms': latencies[-1] * 1000 if latencies else float('nan'),
+        'locked_errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--profiles', nargs='*', default=sorted(STORAGE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':<10} {'writes/s':>10} {'read p50':>10} {'read p95':>10} "
+          f"{'read max':>10} {'locked':>8}")
+    for name in args.profiles:
+        result = run_profile(name, args.writers, args.duration)
+        print(f"{name:<10} {result['writes_per_sec']:>10.0f} "
+              f"{result['read_p50_ms']:>8.2f}ms {result['read_p95_ms']:>8.2f}ms "
+              f"{result['read_max_ms']:>8.2f}ms {result['locked_errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+"""Process-wide cache of each user's product catalog.
+
+The sales and receiving product pickers and barcode scans read products
+from here instead of each running their own query, and the product form
+reads its category/subcategory lists from a CategoryTree kept alongside.
+Each is loaded once per user, on first use, and saved products are added
+to them (``add_product``, ``add_category``) rather than reloading.
+
+Loads run outside the module lock, which is only held to look up or
+publish a catalog or category tree, so scans keep being answered while
+one loads. A saved product is inserted in place and bumps the catalog's
+``version``; pickers get their lists from ``get_products``, copies made
+once per version, so a combo model is never changed underneath it.
+Products added by another terminal are picked up when a barcode scan
+misses the cache, or at the next login (``invalidate``).
+
+    python -m database.catalog --user-id 1     # load time and cache stats
+"""
+import argparse
+import bisect
+import threading
+import time
+from database.connection import get_connection
+
+CATALOG_SELECT = """
+    SELECT id, sku_id, product_name, tax_rate, price, barcode
+    FROM products
+"""
+
+# A user's whole catalog, in picker order
+CATALOG_QUERY = f"""
+    {CATALOG_SELECT}
+    WHERE user_id = ?
+    ORDER BY product_name, sku_id
+"""
+
+BARCODE_QUERY = f"""
+    {CATALOG_SELECT}
+    WHERE user_id = ? AND barcode = ?
+    LIMIT 1
+"""
+
+CATEGORY_TREE_QUERY = """
+    SELECT DISTINCT category, subcategory
+    FROM products
+    WHERE user_id = ?
+"""
+
+# Rows converted per fetchmany() call while loading a catalog
+FETCH_CHUNK = 1000
+
+_catalogs = {}
+_category_trees = {}
+# Per user, set when a catalog or category tree load in progress is
+# published or fails
+_loading = {}
+_tree_loading = {}
+# Bumped by invalidate, so a load that started before it is not published
+_generation = 0
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def product_entries(products):
+    """Combo labels and item data for product picker rows.
+
+    Rows start with id, sku_id, product_name, tax_rate, price.
+    """
+    labels = []
+    records = []
+    for product in products:
+        labels.append(f"{product[2]} ({product[1]})")
+        records.append({
+            'id': product[0],
+            'sku_id': product[1],
+            'tax_rate': product[3],
+            'price': product[4]
+        })
+    return labels, records
+
+
+class ProductCatalog:
+    """One user's products in name order, indexed by SKU and barcode.
+
+    ``labels`` and ``records`` are ready for a RecordListModel;
+    ``by_sku`` and ``by_barcode`` map to ``(label, record)``. Changed
+    in place under the module lock; ``version`` counts the changes.
+    """
+
+    def __init__(self, products=()):
+        self.version = 0
+        self._copies = None
+        self.labels, self.records = product_entries(products)
+        # (product_name, sku_id) of each entry, the order of the lists above
+        self.keys = [(product[2], product[1]) for product in products]
+        entries = list(zip(self.labels, self.records))
+        self.by_sku = {product[1]: entry for product, entry in zip(products, entries)}
+        self.by_barcode = {product[5]: entry
+                           for product, entry in zip(products, entries) if product[5]}
+        self.barcode_of = {product[1]: product[5] for product in products if product[5]}
+        if len(self.by_barcode) < sum(1 for product in products if product[5]):
+            # Some barcodes are shared; they resolve to the lowest SKU (see _index)
+            for product, (label, record) in zip(products, entries):
+                self._index(product, label, record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _index(self, product, label, record):
+        self.by_sku[product[1]] = (label, record)
+        barcode = product[5]
+        if barcode:
+            self.barcode_of[product[1]] = barcode
+            # Shared barcodes resolve to the lowest SKU, as the indexed lookup does
+            current = self.by_barcode.get(barcode)
+            if current is None or product[1] < current[1]['sku_id']:
+                self.by_barcode[barcode] = (label, record)
+
+    def _remove(self, sku_id):
+        label, record = self.by_sku.pop(sku_id)
+        # The label is "name (SKU)", so the sort key is recovered from it
+        position = bisect.bisect_left(self.keys, (label[:-len(sku_id) - 3], sku_id))
+        del self.labels[position], self.records[position], self.keys[position]
+        barcode = self.barcode_of.pop(sku_id, None)
+        if barcode and self.by_barcode.get(barcode, (None, None))[1] is record:
+            # Another product with the same barcode is found by the indexed
+            # lookup on the next scan
+            del self.by_barcode[barcode]
+
+    def put(self, product):
+        """Add ``product``, replacing the entry with the same SKU if any."""
+        if product[1] in self.by_sku:
+            self._remove(product[1])
+        labels, records = product_entries([product])
+        key = (product[2], product[1])
+        position = bisect.bisect_right(self.keys, key)
+        self.labels.insert(position, labels[0])
+        self.records.insert(position, records[0])
+        self.keys.insert(position, key)
+        self._index(product, labels[0], records[0])
+        self.version += 1
+
+    def copies(self):
+        """``(labels, records)`` lists that are not changed afterwards.
+
+        Made once per version and shared by every picker that asks.
+        """
+        if self._copies is None or self._copies[0] != self.version:
+            self._copies = (self.version, list(self.labels), list(self.records))
+        return self._copies[1:]
+
+
+class CategoryTree:
+    """A user's categories and the subcategories used under each."""
+
+    def __init__(self, pairs=()):
+        self.children = {}
+        for category, subcategory in pairs:
+            subcategories = self.children.setdefault(category, set())
+            if subcategory:
+                subcategories.add(subcategory)
+
+    def categories(self):
+        return sorted(self.children)
+
+    def subcategories(self, category=None):
+        """Subcategories under ``category``, or under every category if it is empty."""
+        if category:
+            return sorted(self.children.get(category, ()))
+        return sorted(set().union(*self.children.values()))
+
+    def with_category(self, category, subcategory):
+        """A copy of this tree with ``subcategory`` under ``category``."""
+        tree = CategoryTree()
+        tree.children = dict(self.children)
+        tree.children[category] = self.children.get(category, set()) | (
+            {subcategory} if subcategory else set())
+        return tree
+
+
+def _fetch_in_chunks(cursor):
+    # fetchall() holds the GIL until the last row is converted; smaller
+    # fetches let the GUI thread run in between
+    rows = []
+    while True:
+        chunk = cursor.fetchmany(FETCH_CHUNK)
+        if not chunk:
+            return rows
+        rows.extend(chunk)
+
+
+def _cached(cache, loading_by_user, user_id, load):
+    """cache[user_id], from load(cursor, user_id) run outside the lock.
+
+    Callers asking while it loads wait for that load instead of starting
+    their own; nobody else waits.
+    """
+    while True:
+        with _lock:
+            value = cache.get(user_id)
+            if value is not None:
+                _stats['hits'] += 1
+                return value
+            loading = loading_by_user.get(user_id)
+            if loading is None:
+                _stats['misses'] += 1
+                loading = loading_by_user[user_id] = threading.Event()
+                generation = _generation
+                break
+        # Published or failed; either way look again
+        loading.wait()
+
+    try:
+        value = load(get_connection().cursor(), user_id)
+        with _lock:
+            if generation == _generation:
+                cache[user_id] = value
+    finally:
+        with _lock:
+            del loading_by_user[user_id]
+        loading.set()
+    return value
+
+
+def _load_catalog(cursor, user_id):
+    cursor.execute(CATALOG_QUERY, (user_id,))
+    return ProductCatalog(_fetch_in_chunks(cursor))
+
+
+def get_catalog(user_id):
+    """The user's catalog, loading it on first use."""
+    return _cached(_catalogs, _loading, user_id, _load_catalog)
+
+
+def get_products(user_id):
+    """Labels and records of the user's catalog for a product picker."""
+    catalog = get_catalog(user_id)
+    with _lock:
+        return catalog.copies()
+
+
+def find_barcode(user_id, barcode):
+    """``(label, record)`` for the product with ``barcode``, or None.
+
+    Answered from the catalog when it is loaded. Otherwise, or when the
+    catalog has no such barcode, one lookup on idx_products_user_barcode;
+    a product found that way is added to the catalog.
+    """
+    with _lock:
+        catalog = _catalogs.get(user_id)
+        entry = catalog.by_barcode.get(barcode) if catalog is not None else None
+        _stats['hits' if entry is not None else 'misses'] += 1
+    if entry is not None:
+        return entry
+
+    cursor = get_connection().cursor()
+    cursor.execute(BARCODE_QUERY, (user_id, barcode))
+    product = cursor.fetchone()
+    if product is None:
+        return None
+    if catalog is not None:
+        add_product(user_id, product)
+    labels, records = product_entries([product])
+    return labels[0], records[0]
+
+
+def add_product(user_id, product):
+    """Add or update a saved product (a CATALOG_SELECT row) in a loaded catalog."""
+    with _lock:
+        catalog = _catalogs.get(user_id)
+        if catalog is not None:
+            catalog.put(product)
+
+
+def _load_category_tree(cursor, user_id):
+    # One pass over idx_products_user_category
+    cursor.execute(CATEGORY_TREE_QUERY, (user_id,))
+    return CategoryTree(cursor.fetchall())
+
+
+def get_category_tree(user_id):
+    """The user's category tree, loading it on first use."""
+    return _cached(_category_trees, _tree_loading, user_id, _load_category_tree)
+
+
+def add_category(user_id, category, subcategory):
+    """Record a saved product's category and subcategory in a loaded tree."""
+    with _lock:
+        tree = _category_trees.get(user_id)
+        if tree is None:
+            return
+        if category not in tree.children or (
+                subcategory and subcategory not in tree.children[category]):
+            _category_trees[user_id] = tree.with_category(category, subcategory)
+
+
+def invalidate(user_id=None):
+    """Drop a user's cached products and categories, or everyone's."""
+    global _generation
+    with _lock:
+        _generation += 1
+        if user_id is None:
+            _catalogs.clear()
+            _category_trees.clear()
+        else:
+            _catalogs.pop(user_id, None)
+            _category_trees.pop(user_id, None)
+
+
+def cache_stats():
+    with _lock:
+        return dict(_stats, catalogs=len(_catalogs), category_trees=len(_category_trees))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load a user's product catalog")
+    parser.add_argument('--user-id', type=int, default=1)
+    args = parser.parse_args()
+    from database.db_setup import setup_database
+    setup_database()
+    for attempt in ("first load", "cached"):
+        start = time.perf_counter()
+        catalog = get_catalog(args.user_id)
+        print(f"{attempt}: {len(catalog)} products in "
+              f"{(time.perf_counter() - start) * 1000:.1f}ms")
+    print(cache_stats())
@@ -0,0 +1,144 @@
+"""Shared SQLite access layer used by every form.
+
+Instead of opening and closing ``inventory.db`` around each query, every
+thread keeps one long-lived connection handed out by the pool. The schema
+stays parsed, the page cache stays warm and prepared statements are reused
+across loads and saves.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from database.storage_profiles import get_profile, apply_profile
+
+DB_PATH = os.path.join('database', 'inventory.db')
+
+# Prepared statements kept per connection (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    def __init__(self, db_path=DB_PATH, profile=None):
+        self.db_path = db_path
+        self.profile_name, self.profile = get_profile(profile)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}
+        # Bumped by close_all() so other threads drop their stale handles
+        self._generation = 0
+
+    def _connect(self):
+        # check_same_thread is off only so close_all() can run at shutdown;
+        # each connection is still used by the thread that created it.
+        conn = sqlite3.connect(
+            self.db_path,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False
+        )
+        apply_profile(conn, self.profile)
+        return conn
+
+    def get_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.generation != self._generation:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.generation = self._generation
+            self._local.depth = 0
+            with self._lock:
+                self._connections[threading.get_ident()] = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """Run a block atomically and yield a cursor.
+
+        Commits on success and rolls back on any exception. Nested blocks
+        become savepoints, so a helper can open its own transaction while
+        being called from inside a larger one. ``immediate`` takes the
+        write lock at the start, waiting for other writers, so what the
+        block reads cannot change before it writes; it has no effect on a
+        nested block.
+        """
+        conn = self.get_connection()
+        depth = self._local.depth
+        savepoint = f"sp_{depth}"
+        if depth == 0:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+
+        self._local.depth = depth + 1
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            if depth == 0:
+                conn.commit()
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        finally:
+            cursor.close()
+            self._local.depth = depth
+
+    def release(self):
+        """Close the calling thread's connection, e.g. when a worker exits."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        self._local.conn = None
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._generation += 1
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
+
+
+_pool = ConnectionPool()
+
+
+def get_pool():
+    return _pool
+
+
+def set_database_path(db_path):
+    """Point the shared pool at a different database file."""
+    _pool.close_all()
+    _pool.db_path = db_path
+
+
+def set_storage_profile(name):
+    """Switch the shared pool to another storage profile.
+
+    Open connections are closed so every thread reconnects with the new
+    pragmas.
+    """
+    _pool.close_all()
+    _pool.profile_name, _pool.profile = get_profile(name)
+
+
+def get_connection():
+    return _pool.get_connection()
+
+
+def transaction(immediate=False):
+    return _pool.transaction(immediate)
+
+
+def close_all():
+    _pool.close_all()
@@ -0,0 +1,177 @@
+"""Streaming exports of products, sales and goods receiving.
+
+Rows are read in index order with ``fetchmany`` EXPORT_BATCH at a time and
+written to the file as they arrive, so memory use is the same for a
+hundred rows or ten million. The output format follows the file name:
+``.csv`` or ``.jsonl``, with ``.gz`` added for gzip compression. The file
+is written under a temporary name and renamed when complete, so a reader
+never sees half an export.
+
+Sales and goods receiving are written with customer/supplier names and
+SKUs rather than ids, in the columns ``database/history.py`` loads.
+Exports can be limited to a date range on ``created_at`` (dates
+inclusive) and to rows after a given id. Ids only grow and SQLite has a
+single writer, so passing the last id of the previous export picks up
+exactly the rows added since; ``--state`` keeps those ids in a JSON file
+for nightly runs. Products edited after they were exported are not
+picked up again this way; export them in full.
+
+    python -m database.exporter --user-id 1 sales sales.csv.gz --from 2024-01-01 --to 2024-12-31
+    python -m database.exporter --user-id 1 --state exports.json goods_receiving receipts.jsonl
+"""
+import argparse
+import csv
+import datetime
+import gzip
+import json
+import os
+import threading
+from database.connection import get_connection
+from database.importer import FILE_TYPES
+
+# Rows per fetchmany() and per write
+EXPORT_BATCH = 5000
+
+# Columns written for each table, in order; every query has ``t`` for the
+# exported table
+EXPORTS = {
+    'products': """
+        SELECT t.id, t.sku_id, t.barcode, t.category, t.subcategory, t.product_name,
+               t.description, t.tax_rate, t.price, t.default_unit, t.created_at
+        FROM products t
+    """,
+    'sales': """
+        SELECT t.id, t.created_at, c.name AS customer, p.sku_id AS product_sku,
+               p.product_name, t.quantity, t.rate, t.tax_rate,
+               t.total_rate, t.tax_amount, t.total_amount
+        FROM sales t
+        JOIN customers c ON c.id = t.customer_id
+        JOIN products p ON p.id = t.product_id
+    """,
+    'goods_receiving': """
+        SELECT t.id, t.created_at, s.name AS supplier, p.sku_id AS product_sku,
+               p.product_name, t.quantity, t.rate, t.tax_rate,
+               t.total_rate, t.tax_amount, t.total_amount
+        FROM goods_receiving t
+        JOIN suppliers s ON s.id = t.supplier_id
+        JOIN products p ON p.id = t.product_id
+    """,
+}
+
+
+def _output_format(path):
+    # ('csv' or 'jsonl', gzipped) from a name like sales.csv.gz
+    root, extension = os.path.splitext(path.lower())
+    compressed = extension == '.gz'
+    if compressed:
+        extension = os.path.splitext(root)[1]
+    file_type = FILE_TYPES.get(extension)
+    if file_type is None:
+        raise ValueError("Exports are written to .csv or .jsonl files, optionally .gz")
+    return file_type, compressed
+
+
+def _date(value):
+    # ISO date, checked here rather than silently matching nothing
+    if value is None:
+        return None
+    return datetime.date.fromisoformat(str(value)).isoformat()
+
+
+def export_rows(user_id, table, output, start=None, end=None, since_id=None,
+                report=None, batch_size=EXPORT_BATCH):
+    """Write ``user_id``'s ``table`` rows to ``output`` (.csv or .jsonl, optionally .gz).
+
+    ``start`` and ``end`` are ISO dates, both included; ``since_id``
+    exports only rows with a greater id. ``report(rows)`` is called after
+    each batch written. Returns a dict with ``rows`` and ``last_id``, the
+    id to pass as ``since_id`` next time (``since_id`` again if nothing
+    was exported). Safe on a worker thread.
+    """
+    if table not in EXPORTS:
+        raise ValueError(f"Exports are of {', '.join(EXPORTS)}")
+    file_type, compressed = _output_format(output)
+    conditions, params = ["t.user_id = ?"], [user_id]
+    if start is not None:
+        conditions.append("t.created_at >= ?")
+        params.append(_date(start))
+    if end is not None:
+        conditions.append("t.created_at < date(?, '+1 day')")
+        params.append(_date(end))
+    if since_id is not None:
+        conditions.append("t.id > ?")
+        params.append(since_id)
+    # Both orders are served by an index (idx_*_user, idx_*_user_created),
+    # so rows stream without being sorted first. Products' user_id index,
+    # idx_products_user_name, is in name order, which would need a sort to
+    # give id order, so they always come by date on idx_products_user_created.
+    by_date = start is not None or end is not None or table == 'products'
+    order = 't.created_at, t.id' if by_date else 't.id'
+    query = f"{EXPORTS[table]} WHERE {' AND '.join(conditions)} ORDER BY {order}"
+
+    result = {'rows': 0, 'last_id': since_id}
+    temp_path = f"{output}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if compressed:
+        f = gzip.open(temp_path, 'wt', encoding='utf-8', newline='', compresslevel=6)
+    else:
+        f = open(temp_path, 'w', encoding='utf-8', newline='')
+    cursor = get_connection().cursor()
+    try:
+        with f:
+            cursor.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            if file_type == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(columns)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if file_type == 'csv':
+                    writer.writerows(rows)
+                else:
+                    f.writelines(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+                result['rows'] += len(rows)
+                result['last_id'] = max(result['last_id'] or 0, max(row[0] for row in rows))
+                if report:
+                    report(result['rows'])
+        os.replace(temp_path, output)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        cursor.close()
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export products, sales or goods receiving")
+    parser.add_argument('table', choices=sorted(EXPORTS))
+    parser.add_argument('output', help="a .csv or .jsonl file, optionally ending in .gz")
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--from', dest='start', help="first date, e.g. 2024-01-01")
+    parser.add_argument('--to', dest='end', help="last date, included")
+    parser.add_argument('--since-id', type=int, help="only rows with a greater id")
+    parser.add_argument('--state', help="JSON file of the last id exported per user and table; "
+                                        "only newer rows are exported and it is updated after")
+    args = parser.parse_args()
+
+    state = {}
+    if args.state and os.path.exists(args.state):
+        with open(args.state, encoding='utf-8') as f:
+            state = json.load(f)
+    last_ids = state.setdefault(str(args.user_id), {})
+    since_id = args.since_id if args.since_id is not None else last_ids.get(args.table)
+
+    from database.db_setup import setup_database
+    setup_database()
+    result = export_rows(args.user_id, args.table, args.output, args.start, args.end,
+                         since_id, report=lambda rows: print(f"\r{rows} rows", end=''))
+    print(f"\rExported {result['rows']} rows to {args.output}")
+
+    if args.state and result['last_id'] is not None:
+        last_ids[args.table] = result['last_id']
+        with open(f"{args.state}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(f"{args.state}.tmp", args.state)
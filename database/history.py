@@ -0,0 +1,243 @@
+"""Bulk loading of historical sales and goods receiving from another system.
+
+Records are read from a CSV or JSON Lines file (see ``database/importer.py``
+for how columns are matched) and loaded HISTORY_BATCH rows at a time:
+each batch is written as read to a temporary staging table with one
+``executemany``, then checked and copied across with a few set-based
+statements. Those statements reject bad rows, look up customer/supplier
+and product ids, create customers and suppliers that do not exist yet,
+normalize dates, compute ``total_rate``, ``tax_amount`` and
+``total_amount`` the way the forms do, and update stock levels, for the
+whole batch at once.
+
+The target table's secondary indexes and triggers (the stock and sales
+rollup triggers among them) are dropped for the load and recreated from
+their saved definitions at the end; loaded sales are added to the
+rollups in one pass before that.
+All of it is one transaction, so a failed or interrupted load leaves the
+database as it was, indexes and triggers included. Other terminals can
+read throughout but cannot save until the load is done; run it before
+going live.
+
+Columns: ``customer`` (sales) or ``supplier`` (goods receiving),
+``product_sku`` (or ``sku_id``), ``quantity``, ``rate`` and optionally
+``tax_rate`` (default: the product's) and ``created_at`` (any date or
+date and time SQLite understands; default: now). Rows with a missing or
+bad value, an unknown SKU or an unreadable date are skipped and reported
+by line number.
+
+    python -m database.history --user-id 1 sales old_sales.csv
+    python -m database.history --user-id 1 --profile bulk goods_receiving receipts.jsonl
+"""
+import argparse
+import os
+from database.connection import transaction
+from database.importer import FILE_TYPES, MAX_REPORTED_ERRORS, read_rows
+from database.rollups import roll_up_sales
+
+# Rows staged and copied per set of statements
+HISTORY_BATCH = 50000
+
+# For each table: the column naming the other party, its master table,
+# the id column that references it, and whether rows add to stock or
+# take from it
+HISTORY_TABLES = {
+    'sales': ('customer', 'customers', 'customer_id', '-'),
+    'goods_receiving': ('supplier', 'suppliers', 'supplier_id', '+'),
+}
+
+
+def _drop_indexes_and_triggers(cursor, table):
+    # Definitions of everything dropped, to recreate it afterwards
+    cursor.execute("""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    """, (table,))
+    definitions = cursor.fetchall()
+    for kind, name, _ in definitions:
+        cursor.execute(f"DROP {kind.upper()} {name}")
+    return definitions
+
+
+# Staged as read: column affinity turns numeric text into numbers and
+# leaves anything else as text, for the checks below to catch
+STAGE_COLUMNS = {
+    'party': 'TEXT', 'product_sku': 'TEXT', 'sku_id': 'TEXT', 'quantity': 'NUMERIC',
+    'rate': 'REAL', 'tax_rate': 'REAL', 'created_at': 'TEXT',
+}
+_SKU = "TRIM(COALESCE(NULLIF(TRIM(s.product_sku), ''), s.sku_id))"
+_DATE = "NULLIF(TRIM(s.created_at), '')"
+
+
+def _load_batch(cursor, table, user_id, insert, batch, error):
+    party_column, party_table, party_id, sign = HISTORY_TABLES[table]
+    cursor.executemany(insert, batch)
+
+    # Rows that cannot be loaded, with the reason, for the whole batch at once
+    cursor.execute(f"""
+        SELECT s.line, CASE
+            WHEN COALESCE(TRIM(s.party), '') = '' THEN 'Missing {party_column}'
+            WHEN COALESCE({_SKU}, '') = '' THEN 'Missing product_sku'
+            WHEN typeof(s.quantity) != 'integer'
+                THEN 'quantity is not a whole number: ' || COALESCE(s.quantity, '')
+            WHEN typeof(s.rate) NOT IN ('integer', 'real')
+                THEN 'rate is not a number: ' || COALESCE(s.rate, '')
+            WHEN typeof(s.tax_rate) = 'text' AND TRIM(s.tax_rate) != ''
+                THEN 'tax_rate is not a number: ' || s.tax_rate
+            WHEN p.id IS NULL THEN 'Unknown product SKU: ' || {_SKU}
+            ELSE 'Unreadable date: ' || s.created_at
+        END
+        FROM temp.history_stage s
+        LEFT JOIN products p ON p.sku_id = {_SKU} AND p.user_id = ?
+        WHERE p.id IS NULL
+           OR COALESCE(TRIM(s.party), '') = ''
+           OR typeof(s.quantity) != 'integer'
+           OR typeof(s.rate) NOT IN ('integer', 'real')
+           OR (typeof(s.tax_rate) = 'text' AND TRIM(s.tax_rate) != '')
+           OR ({_DATE} IS NOT NULL AND datetime({_DATE}) IS NULL)
+    """, (user_id,))
+    rejected = cursor.fetchall()
+    for line_number, message in rejected:
+        error(line_number, message)
+    if rejected:
+        cursor.executemany("DELETE FROM temp.history_stage WHERE line = ?",
+                           [(row[0],) for row in rejected])
+
+    # Names seen for the first time become customers or suppliers, as
+    # they do when typed into the forms
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO {party_table} (name, user_id)
+        SELECT DISTINCT TRIM(party), ? FROM temp.history_stage
+    """, (user_id,))
+
+    # Totals are rounded to cents, as the forms save them
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+    last_id = cursor.fetchone()[0]
+    cursor.execute(f"""
+        INSERT INTO {table} (
+            {party_id}, product_id, quantity, rate, tax_rate,
+            total_rate, tax_amount, total_amount, user_id, created_at
+        )
+        SELECT party_id, product_id, quantity, rate, tax_rate,
+               ROUND(quantity * rate, 2),
+               ROUND(quantity * rate * tax_rate / 100, 2),
+               ROUND(quantity * rate * (1 + tax_rate / 100), 2),
+               ?, created_at
+        FROM (
+            SELECT m.id AS party_id, p.id AS product_id, s.quantity, s.rate,
+                   IIF(typeof(s.tax_rate) IN ('integer', 'real'), s.tax_rate, p.tax_rate)
+                       AS tax_rate,
+                   COALESCE(datetime({_DATE}), datetime('now')) AS created_at,
+                   s.line
+            FROM temp.history_stage s
+            JOIN {party_table} m ON m.name = TRIM(s.party) AND m.user_id = ?
+            JOIN products p ON p.sku_id = {_SKU} AND p.user_id = ?
+        )
+        ORDER BY line
+    """, (user_id, user_id, user_id))
+    loaded = cursor.rowcount
+
+    # What the stock triggers would have done, one row per product
+    cursor.execute(f"""
+        INSERT INTO stock_levels (product_id, quantity)
+        SELECT product_id, {sign}SUM(quantity) FROM {table}
+        WHERE id > ?
+        GROUP BY product_id
+        ON CONFLICT (product_id) DO UPDATE SET quantity = quantity + excluded.quantity
+    """, (last_id,))
+    cursor.execute("DELETE FROM temp.history_stage")
+    return loaded
+
+
+def load_history(user_id, table, path, report=None, batch_size=HISTORY_BATCH):
+    """Load the ``table`` ('sales' or 'goods_receiving') rows in a .csv or .jsonl file.
+
+    ``report(message, done, total)`` is called after each batch with the
+    bytes read so far, and once per finishing step with a total of 0.
+    Returns a dict with ``loaded``, ``error_count`` and ``errors`` (up to
+    MAX_REPORTED_ERRORS ``(line, message)`` pairs).
+    """
+    if table not in HISTORY_TABLES:
+        raise ValueError(f"History is loaded into {' or '.join(HISTORY_TABLES)}")
+    file_type = FILE_TYPES.get(os.path.splitext(path)[1].lower())
+    if file_type is None:
+        raise ValueError("History is loaded from .csv or .jsonl files")
+    total_bytes = os.path.getsize(path)
+    result = {'loaded': 0, 'error_count': 0, 'errors': []}
+
+    def error(line_number, message):
+        result['error_count'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append((line_number, message))
+
+    party_column = HISTORY_TABLES[table][0]
+    columns = [party_column] + list(STAGE_COLUMNS)[1:]
+    with transaction() as cursor, open(path, 'rb') as f:
+        present, rows = read_rows(f, file_type, columns, (party_column, 'quantity', 'rate'))
+        if file_type == 'csv' and not {'product_sku', 'sku_id'} & set(present):
+            raise ValueError("Missing columns: product_sku")
+        staged = ['party' if column == party_column else column for column in present]
+        insert = (f"INSERT INTO temp.history_stage (line, {', '.join(staged)}) "
+                  f"VALUES ({', '.join('?' * (len(staged) + 1))})")
+        width = len(staged) + 1
+
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        last_existing_id = cursor.fetchone()[0]
+        definitions = _drop_indexes_and_triggers(cursor, table)
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS history_stage (
+                line INTEGER PRIMARY KEY,
+                {', '.join(f'{name} {kind}' for name, kind in STAGE_COLUMNS.items())}
+            )
+        """)
+        try:
+            batch = []
+            for row in rows:
+                if len(row) != width:
+                    error(row[0], row[1])
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    result['loaded'] += _load_batch(cursor, table, user_id, insert, batch, error)
+                    batch = []
+                    if report:
+                        report(f"Loading {table}", f.tell(), total_bytes)
+            if batch:
+                result['loaded'] += _load_batch(cursor, table, user_id, insert, batch, error)
+        finally:
+            cursor.execute("DROP TABLE IF EXISTS temp.history_stage")
+
+        if table == 'sales':
+            if report:
+                report("Updating sales rollups", 0, 0)
+            roll_up_sales(cursor, "id > ?", (last_existing_id,))
+        for kind, name, sql in definitions:
+            if report:
+                report(f"Recreating {kind} {name}", 0, 0)
+            cursor.execute(sql)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load historical sales or goods receiving")
+    parser.add_argument('table', choices=sorted(HISTORY_TABLES))
+    parser.add_argument('file', help="a .csv or .jsonl file")
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--profile', help="storage profile, e.g. bulk")
+    args = parser.parse_args()
+
+    from database.db_setup import setup_database
+    setup_database(profile=args.profile)
+
+    def print_progress(message, done, total):
+        if total:
+            print(f"\r{message}: {done * 100 // total}%", end='')
+        else:
+            print(f"\n{message}...", end='')
+
+    result = load_history(args.user_id, args.table, args.file, report=print_progress)
+    print(f"\nLoaded {result['loaded']} rows, {result['error_count']} errors")
+    for line_number, message in result['errors']:
+        print(f"  line {line_number}: {message}")
+    if result['error_count'] > len(result['errors']):
+        print(f"  ... and {result['error_count'] - len(result['errors'])} more")
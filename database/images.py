@@ -0,0 +1,228 @@
+"""Product image storage.
+
+A picked image is decoded once, scaled down to a bounded master and a
+few fixed-size thumbnails, re-encoded as JPEG and stored under the SHA-256
+of the original file, so the same photo picked for several products is
+processed and stored once:
+
+    images/<sha256>.jpg        master, longest side at most MASTER_SIZE
+    images/<sha256>_300.jpg    one thumbnail per THUMBNAIL_SIZES entry
+
+``products.image_path`` holds the master's path and ``thumbnail_path``
+gives a thumbnail's. Images saved before this module existed
+(``images/<sku_id>.<ext>``, copied at full size) are converted by
+``--existing``; until then ``grid_thumbnail`` makes their grid thumbnails
+on demand and keeps them under images/thumbnails.
+
+    python -m database.images photo.jpg ...     # ingest, report bytes saved
+    python -m database.images --existing        # convert older product images
+"""
+import argparse
+import hashlib
+import os
+import re
+import threading
+from PIL import Image, ImageOps
+from database.connection import get_connection, transaction
+
+IMAGE_DIR = 'images'
+
+# Longest side of a stored master, in pixels
+MASTER_SIZE = 1600
+
+# Square bounding boxes of the stored thumbnails; PREVIEW_SIZE fills the
+# Product Master preview, GRID_SIZE is for product grids
+PREVIEW_SIZE = 300
+GRID_SIZE = 64
+THUMBNAIL_SIZES = (PREVIEW_SIZE, GRID_SIZE)
+
+# Grid thumbnails of images that have none stored next to them
+THUMBNAIL_CACHE_DIR = os.path.join(IMAGE_DIR, 'thumbnails')
+
+JPEG_QUALITY = 85
+
+_STORED_NAME = re.compile(r'[0-9a-f]{64}\.jpg')
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def thumbnail_path(image_path, size):
+    return f"{os.path.splitext(image_path)[0]}_{size}.jpg"
+
+
+def is_stored(image_path):
+    """True if ``image_path`` is a master written by ``ingest_image``."""
+    return bool(image_path) and bool(_STORED_NAME.fullmatch(os.path.basename(image_path)))
+
+
+def format_bytes(count):
+    for unit in ('bytes', 'KB', 'MB'):
+        if count < 1024 or unit == 'MB':
+            return f"{count:.0f} {unit}" if unit == 'bytes' else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def _to_rgb(image):
+    # JPEG has no alpha; transparent areas become white, not black
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _decode(path, size):
+    with Image.open(path) as image:
+        # Lets the JPEG decoder scale down while decoding, so a camera
+        # photo is never expanded to full size in memory
+        image.draft('RGB', (size, size))
+        image = _to_rgb(ImageOps.exif_transpose(image))
+    image.thumbnail((size, size), Image.LANCZOS, reducing_gap=3.0)
+    return image
+
+
+def _save(image, path):
+    # Written under a temporary name and renamed, so nobody sees half a file
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            image.save(f, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return os.path.getsize(path)
+
+
+def ingest_image(source_path, image_dir=IMAGE_DIR):
+    """Store ``source_path`` as a master and thumbnails; safe on a worker thread.
+
+    Returns a dict with the master's ``image_path``, ``source_bytes``,
+    ``stored_bytes`` (written now; 0 for a ``duplicate`` of a stored image)
+    and ``saved_bytes``. Raises OSError (or PIL.UnidentifiedImageError)
+    for a file that cannot be read as an image.
+    """
+    source_bytes = os.path.getsize(source_path)
+    digest = content_hash(source_path)
+    image_path = os.path.join(image_dir, f"{digest}.jpg")
+    paths = [image_path] + [thumbnail_path(image_path, size) for size in THUMBNAIL_SIZES]
+    result = {'image_path': image_path, 'source_bytes': source_bytes}
+
+    if all(os.path.exists(path) for path in paths):
+        result.update(stored_bytes=0, saved_bytes=source_bytes, duplicate=True)
+        return result
+
+    os.makedirs(image_dir, exist_ok=True)
+    image = _decode(source_path, MASTER_SIZE)
+    stored_bytes = _save(image, image_path)
+    # Each thumbnail is scaled from the next larger image, not the master
+    for size, path in sorted(zip(THUMBNAIL_SIZES, paths[1:]), reverse=True):
+        image = image.copy()
+        image.thumbnail((size, size), Image.LANCZOS, reducing_gap=3.0)
+        stored_bytes += _save(image, path)
+
+    result.update(stored_bytes=stored_bytes, saved_bytes=source_bytes - stored_bytes,
+                  duplicate=False)
+    return result
+
+
+def grid_thumbnail(image_path):
+    """Path of a GRID_SIZE thumbnail of ``image_path``, or None if it is unreadable.
+
+    Stored images have one already. For others, one is made on first use
+    and cached on disk under the image's path, size and modification time,
+    so a replaced file gets a new thumbnail.
+    """
+    if is_stored(image_path):
+        path = thumbnail_path(image_path, GRID_SIZE)
+        if os.path.exists(path):
+            return path
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        return None
+    key = hashlib.sha1(
+        f"{os.path.abspath(image_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+    ).hexdigest()
+    path = os.path.join(THUMBNAIL_CACHE_DIR, f"{key}_{GRID_SIZE}.jpg")
+    if os.path.exists(path):
+        return path
+    try:
+        image = _decode(image_path, GRID_SIZE)
+        os.makedirs(THUMBNAIL_CACHE_DIR, exist_ok=True)
+        _save(image, path)
+    except OSError:
+        return None
+    return path
+
+
+def ingest_existing(image_dir=IMAGE_DIR, report=None):
+    """Convert every product image not yet in the store.
+
+    Products sharing an old file are all pointed at the new master and the
+    old file is removed. Missing or unreadable files are left alone.
+    Returns ``(converted, source_bytes, stored_bytes)``.
+    """
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT DISTINCT image_path FROM products WHERE image_path IS NOT NULL")
+    old_paths = [row[0] for row in cursor.fetchall() if not is_stored(row[0])]
+
+    converted = source_bytes = stored_bytes = 0
+    for old_path in old_paths:
+        try:
+            result = ingest_image(old_path, image_dir)
+        except OSError as e:
+            if report:
+                report(f"skipped {old_path}: {e}")
+            continue
+        with transaction() as cursor:
+            cursor.execute("UPDATE products SET image_path = ? WHERE image_path = ?",
+                           (result['image_path'], old_path))
+        os.remove(old_path)
+        converted += 1
+        source_bytes += result['source_bytes']
+        stored_bytes += result['stored_bytes']
+        if report:
+            report(f"{old_path} -> {result['image_path']}")
+    return converted, source_bytes, stored_bytes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Store product images as resized masters and thumbnails")
+    parser.add_argument('--existing', action='store_true',
+                        help="convert product images saved before the image store")
+    parser.add_argument('files', nargs='*', help="images to ingest")
+    args = parser.parse_args()
+    if not args.existing and not args.files:
+        parser.print_help()
+
+    source_total = stored_total = 0
+    for file_name in args.files:
+        try:
+            result = ingest_image(file_name)
+        except OSError as e:
+            print(f"{file_name}: {e}")
+            continue
+        source_total += result['source_bytes']
+        stored_total += result['stored_bytes']
+        note = "already stored" if result['duplicate'] else format_bytes(result['stored_bytes'])
+        print(f"{file_name}: {format_bytes(result['source_bytes'])} -> "
+              f"{result['image_path']} ({note})")
+    if args.existing:
+        from database.db_setup import setup_database
+        setup_database()
+        converted, source_bytes, stored_bytes = ingest_existing(report=print)
+        print(f"Converted {converted} images")
+        source_total += source_bytes
+        stored_total += stored_bytes
+    if source_total:
+        print(f"{format_bytes(source_total)} in, {format_bytes(stored_total)} stored, "
+              f"{format_bytes(source_total - stored_total)} saved")
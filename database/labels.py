@@ -0,0 +1,430 @@
+"""Printable shelf label sheets.
+
+Products are read from the database a sheet at a time and each sheet
+(COLUMNS x ROWS labels on an A4 page at DPI) is rendered in a pool of
+worker processes, one sheet per task, so a large catalog uses every core.
+Only a few sheets per worker are in flight at once and finished sheets
+are written out in order as they arrive, so memory stays the same whether
+the run is 50 labels or 50,000.
+
+A label shows the product name, SKU and price next to a QR code, or above
+a Code 128 barcode. The code holds the product's barcode, so labels scan
+into the Sales form, or its SKU if it has none. The output is one PDF, or
+numbered PNG files (``labels-0001.png``, ...) for a ``.png`` name.
+
+    python -m database.labels --user-id 1 labels.pdf
+    python -m database.labels --user-id 1 --code code128 --sku SKU-1 labels.png
+"""
+import argparse
+import functools
+import io
+import multiprocessing
+import os
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+from database.connection import get_connection
+
+# Sheet layout: A4 at print resolution, labels in a grid within the margins
+PAGE_SIZE_MM = (210, 297)
+DPI = 300
+MARGIN_MM = 8
+COLUMNS = 3
+ROWS = 8
+
+CODE_TYPES = ('qr', 'code128')
+
+# Sheets queued per worker process; enough to keep every worker busy
+# while the finished sheet at the head of the queue is written
+SHEETS_IN_FLIGHT_PER_WORKER = 2
+
+# SKUs looked up per query when labels are printed for a list of SKUs
+SKU_BATCH = 500
+
+LABEL_COLUMNS = "sku_id, product_name, price, barcode"
+
+# Code 128 symbols 0-105 as bar/space widths in modules, then the stop
+# symbol. Code set B covers printable ASCII: symbol = ord(char) - 32.
+_CODE128_PATTERNS = """
+    212222 222122 222221 121223 121322 131222 122213 122312 132212 221213
+    221312 231212 112232 122132 122231 113222 123122 123221 223211 221132
+    221231 213212 223112 312131 311222 321122 321221 312212 322112 322211
+    212123 212321 232121 111323 131123 131321 112313 132113 132311 211313
+    231113 231311 112133 112331 132131 113123 113321 133121 313121 211331
+    231131 213113 213311 213131 311123 311321 331121 312113 312311 332111
+    314111 221411 431111 111224 111422 121124 121421 141122 141221 112214
+    112412 122114 122411 142112 142211 241211 221114 413111 241112 134111
+    111242 121142 121241 114212 124112 124211 411212 421112 421211 212141
+    214121 412121 111143 111341 131141 114113 114311 411113 411311 113141
+    114131 311141 411131 211412 211214 211232 2331112
+""".split()
+_CODE128_START_B = 104
+_CODE128_STOP = 106
+
+# Blank modules either side of a barcode and around a QR code
+_CODE128_QUIET_ZONE = 10
+_QR_BORDER = 4
+_QR_MASK = 0
+
+
+def _mm_to_px(mm):
+    return round(mm * DPI / 25.4)
+
+
+def code128_modules(text):
+    """Bar widths of ``text`` as Code 128 set B, starting with a bar.
+
+    Raises ValueError for characters outside printable ASCII.
+    """
+    if not text or any(not 32 <= ord(char) <= 126 for char in text):
+        raise ValueError(f"{text!r} cannot be encoded as Code 128 B")
+    symbols = [_CODE128_START_B] + [ord(char) - 32 for char in text]
+    checksum = (symbols[0] + sum(i * symbol for i, symbol in enumerate(symbols[1:], 1))) % 103
+    symbols += [checksum, _CODE128_STOP]
+    return [int(width) for symbol in symbols for width in _CODE128_PATTERNS[symbol]]
+
+
+def iter_label_rows(user_id, skus=None, count=COLUMNS * ROWS):
+    """Yield ``user_id``'s products a sheet (``count`` rows) at a time.
+
+    Rows are ``(sku_id, product_name, price, barcode)``, ordered by name,
+    for every product or only those in ``skus``.
+    """
+    cursor = get_connection().cursor()
+    if skus is None:
+        cursor.execute(f"""
+            SELECT {LABEL_COLUMNS} FROM products
+            WHERE user_id = ?
+            ORDER BY product_name, sku_id
+        """, (user_id,))
+        while True:
+            rows = cursor.fetchmany(count)
+            if not rows:
+                return
+            yield rows
+
+    # Labels for a list of SKUs come out in the order they were given
+    pending = []
+    skus = list(skus)
+    for start in range(0, len(skus), SKU_BATCH):
+        batch = skus[start:start + SKU_BATCH]
+        cursor.execute(f"""
+            SELECT {LABEL_COLUMNS} FROM products
+            WHERE user_id = ? AND sku_id IN ({', '.join('?' * len(batch))})
+        """, [user_id] + batch)
+        found = {row[0]: row for row in cursor.fetchall()}
+        pending.extend(found[sku] for sku in batch if sku in found)
+        while len(pending) >= count:
+            yield pending[:count]
+            pending = pending[count:]
+    if pending:
+        yield pending
+
+
+@functools.lru_cache(maxsize=None)
+def _font(size):
+    return ImageFont.load_default(size=size)
+
+
+@functools.lru_cache(maxsize=None)
+def _glyph(size, char):
+    # FreeType rasterizes every character of every string it is asked to
+    # draw, which was most of a sheet's rendering time; labels use a few
+    # dozen characters, so each is drawn once per process and pasted
+    font = _font(size)
+    left, top, right, bottom = font.getbbox(char)
+    mask = Image.new('1', (max(1, right - left), max(1, bottom - top)), 0)
+    draw = ImageDraw.Draw(mask)
+    draw.fontmode = '1'
+    draw.text((-left, -top), char, font=font, fill=1)
+    return left, top, mask, font.getlength(char)
+
+
+def _text_width(text, size):
+    return sum(_glyph(size, char)[3] for char in text)
+
+
+def _line_height(size):
+    ascent, descent = _font(size).getmetrics()
+    return ascent + descent
+
+
+def _draw_text(sheet, x, y, text, size):
+    # (x, y) is the top left of the line, as ImageDraw.text's default anchor
+    for char in text:
+        left, top, mask, advance = _glyph(size, char)
+        sheet.paste(0, (round(x) + left, y + top), mask)
+        x += advance
+
+
+def _fit(text, size, width):
+    # Cuts text to fit width, ending with an ellipsis if anything was cut
+    if _text_width(text, size) <= width:
+        return text
+    while text and _text_width(text + "…", size) > width:
+        text = text[:-1]
+    return text.rstrip() + "…"
+
+
+def _wrap(text, size, width, lines):
+    # Breaks text into at most ``lines`` lines, at spaces where possible
+    result = []
+    words = text.split()
+    while words and len(result) < lines:
+        line = words.pop(0)
+        while words and _text_width(f"{line} {words[0]}", size) <= width:
+            line = f"{line} {words.pop(0)}"
+        if len(result) == lines - 1 and words:
+            line = f"{line} {' '.join(words)}"
+            words = []
+        result.append(_fit(line, size, width))
+    return result
+
+
+def _qr_image(value, side):
+    # Any mask pattern scans; scoring all eight for the best one would
+    # take most of a sheet's rendering time
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M,
+                       box_size=1, border=_QR_BORDER, mask_pattern=_QR_MASK)
+    qr.add_data(value)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    modules = len(matrix)
+    image = Image.new('1', (modules, modules), 1)
+    image.putdata([0 if dark else 1 for row in matrix for dark in row])
+    # Whole pixels per module keep the modules square and sharp
+    scale = max(1, side // modules)
+    return image.resize((modules * scale, modules * scale), Image.NEAREST)
+
+
+def _draw_barcode(draw, value, box):
+    left, top, right, bottom = box
+    widths = code128_modules(value)
+    modules = sum(widths) + 2 * _CODE128_QUIET_ZONE
+    scale = max(1, (right - left) // modules)
+    x = left + (right - left - (modules - 2 * _CODE128_QUIET_ZONE) * scale) // 2
+    for i, width in enumerate(widths):
+        if i % 2 == 0:
+            draw.rectangle((x, top, x + width * scale - 1, bottom), fill=0)
+        x += width * scale
+
+
+def _draw_label(sheet, draw, row, code, box):
+    sku_id, product_name, price, barcode = row
+    value = barcode or sku_id
+    left, top, right, bottom = box
+    padding = _mm_to_px(2)
+    left, top, right, bottom = left + padding, top + padding, right - padding, bottom - padding
+    height = bottom - top
+    name_size, text_size, price_size = height // 9, height // 11, height // 6
+
+    if code == 'code128':
+        try:
+            code128_modules(value)
+        except ValueError:
+            code = 'qr'  # not printable ASCII; a QR code can hold it
+
+    if code == 'qr':
+        qr = _qr_image(value, height)
+        sheet.paste(qr, (left, top + (height - qr.height) // 2))
+        text_left, text_bottom = left + qr.width + padding, bottom
+    else:
+        # Barcode across the lower half, its value printed underneath
+        value_top = bottom - _line_height(text_size)
+        _draw_barcode(draw, value, (left, top + height // 2, right, value_top - padding // 2))
+        text = _fit(value, text_size, right - left)
+        _draw_text(sheet, (left + right - _text_width(text, text_size)) / 2, value_top,
+                   text, text_size)
+        text_left, text_bottom = left, top + height // 2 - padding
+
+    width = right - text_left
+    y = top
+    for line in _wrap(product_name, name_size, width, 2):
+        _draw_text(sheet, text_left, y, line, name_size)
+        y += name_size * 5 // 4
+    _draw_text(sheet, text_left, y, _fit(f"SKU: {sku_id}", text_size, width), text_size)
+    _draw_text(sheet, text_left, text_bottom - _line_height(price_size),
+               f"{price:.2f}", price_size)
+
+
+def render_sheet(rows, code, columns, rows_per_sheet, fmt):
+    """Render one sheet of labels; runs in a worker process.
+
+    Returns the sheet as PNG bytes, or for ``fmt='pdf'`` as the
+    Flate-compressed 1-bit pixels a PDF image takes.
+    """
+    width, height = (_mm_to_px(mm) for mm in PAGE_SIZE_MM)
+    margin = _mm_to_px(MARGIN_MM)
+    label_width = (width - 2 * margin) // columns
+    label_height = (height - 2 * margin) // rows_per_sheet
+    # Black and white: sharp edges for scanners, and a small page
+    sheet = Image.new('1', (width, height), 1)
+    draw = ImageDraw.Draw(sheet)
+    for i, row in enumerate(rows):
+        x = margin + i % columns * label_width
+        y = margin + i // columns * label_height
+        _draw_label(sheet, draw, row, code, (x, y, x + label_width, y + label_height))
+
+    if fmt == 'pdf':
+        return zlib.compress(sheet.tobytes(), 6)
+    output = io.BytesIO()
+    sheet.save(output, 'PNG', dpi=(DPI, DPI))
+    return output.getvalue()
+
+
+class PdfSheetWriter:
+    """Writes a PDF a page at a time, each page one full-page 1-bit image.
+
+    Pages are written as they are added; only their object offsets are
+    kept until ``close()`` writes the page tree and cross-reference table.
+    The file is written under a temporary name and renamed on close.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self.file = open(self.temp_path, 'wb')
+        self.offsets = {}
+        self.pages = []
+        self.pixels = tuple(_mm_to_px(mm) for mm in PAGE_SIZE_MM)
+        self.points = tuple(f"{mm * 72 / 25.4:.2f}" for mm in PAGE_SIZE_MM)
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        # Object 2, the page tree, is written last, once every page is known
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    def _object(self, number, body, stream=None):
+        self.offsets[number] = self.file.tell()
+        self.file.write(f"{number} 0 obj\n".encode() + body)
+        if stream is not None:
+            self.file.write(b"\nstream\n" + stream + b"\nendstream")
+        self.file.write(b"\nendobj\n")
+
+    def add_page(self, pixels):
+        image, content, page = (len(self.offsets) + 2 + i for i in range(3))
+        width, height = self.pixels
+        self._object(image, (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode "
+            f"/Length {len(pixels)} >>"
+        ).encode(), pixels)
+        drawing = f"q {self.points[0]} 0 0 {self.points[1]} 0 0 cm /Im Do Q".encode()
+        self._object(content, f"<< /Length {len(drawing)} >>".encode(), drawing)
+        self._object(page, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.points[0]} {self.points[1]}] "
+            f"/Resources << /XObject << /Im {image} 0 R >> >> /Contents {content} 0 R >>"
+        ).encode())
+        self.pages.append(page)
+
+    def close(self):
+        kids = " ".join(f"{page} 0 R" for page in self.pages)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>".encode())
+        xref = self.file.tell()
+        count = len(self.offsets) + 1
+        self.file.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode())
+        for number in range(1, count):
+            self.file.write(f"{self.offsets[number]:010d} 00000 n \n".encode())
+        self.file.write(
+            f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def discard(self):
+        self.file.close()
+        os.remove(self.temp_path)
+
+
+class PngSheetWriter:
+    """Writes each page to its own numbered PNG next to ``path``."""
+
+    def __init__(self, path):
+        self.root = os.path.splitext(path)[0]
+        self.pages = []
+
+    def add_page(self, data):
+        path = f"{self.root}-{len(self.pages) + 1:04d}.png"
+        with open(path, 'wb') as f:
+            f.write(data)
+        self.pages.append(path)
+
+    def close(self):
+        pass
+
+    def discard(self):
+        for path in self.pages:
+            os.remove(path)
+
+
+def generate_labels(user_id, output, code='qr', skus=None, columns=COLUMNS,
+                    rows=ROWS, workers=None, report=None, cancelled=None):
+    """Write label sheets for ``user_id``'s products (or ``skus``) to ``output``.
+
+    ``output`` ends in .pdf or .png. Sheets are rendered by ``workers``
+    processes (default: one per CPU). ``report(labels, sheets)`` is called
+    after each sheet is written. If ``cancelled()`` becomes true, the run
+    stops, removes what it wrote and returns None; otherwise it returns
+    ``(labels, sheets)``. Safe on a worker thread.
+    """
+    fmt = os.path.splitext(output)[1].lower().lstrip('.')
+    if fmt not in ('pdf', 'png'):
+        raise ValueError("Labels are written as .pdf or .png")
+    if code not in CODE_TYPES:
+        raise ValueError(f"Unknown code type {code!r}")
+    workers = workers or os.cpu_count() or 1
+    writer = PdfSheetWriter(output) if fmt == 'pdf' else PngSheetWriter(output)
+    labels = 0
+
+    def write(future, count):
+        nonlocal labels
+        writer.add_page(future.result())
+        labels += count
+        if report:
+            report(labels, len(writer.pages))
+
+    try:
+        # Spawned rather than forked: forking a process that is running
+        # Qt and database threads can copy a lock another thread holds
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            in_flight = deque()
+            for sheet in iter_label_rows(user_id, skus, columns * rows):
+                if cancelled and cancelled():
+                    break
+                in_flight.append((pool.submit(render_sheet, sheet, code, columns, rows, fmt),
+                                  len(sheet)))
+                if len(in_flight) >= workers * SHEETS_IN_FLIGHT_PER_WORKER:
+                    write(*in_flight.popleft())
+            while in_flight and not (cancelled and cancelled()):
+                write(*in_flight.popleft())
+            for future, _ in in_flight:
+                future.cancel()
+        if cancelled and cancelled():
+            writer.discard()
+            return None
+        writer.close()
+    except BaseException:
+        writer.discard()
+        raise
+    return labels, len(writer.pages)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Print product labels as PDF or PNG sheets")
+    parser.add_argument('output', help="labels.pdf, or labels.png for labels-0001.png, ...")
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--code', choices=CODE_TYPES, default='qr')
+    parser.add_argument('--sku', action='append', dest='skus',
+                        help="only this SKU; repeat for more (default: every product)")
+    parser.add_argument('--columns', type=int, default=COLUMNS)
+    parser.add_argument('--rows', type=int, default=ROWS)
+    parser.add_argument('--workers', type=int, help="processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    from database.db_setup import setup_database
+    setup_database()
+    result = generate_labels(
+        args.user_id, args.output, args.code, args.skus, args.columns, args.rows,
+        args.workers, report=lambda labels, sheets: print(f"\r{sheets} sheets", end='')
+    )
+    print(f"\r{result[0]} labels on {result[1]} sheets")
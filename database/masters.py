@@ -0,0 +1,20 @@
+"""Id lookups for the master tables referenced by transaction rows."""
+
+
+def _get_or_create(cursor, table, name, user_id):
+    cursor.execute(f"SELECT id FROM {table} WHERE name = ? AND user_id = ?", (name, user_id))
+    row = cursor.fetchone()
+    if row:
+        return row[0], False
+    cursor.execute(f"INSERT INTO {table} (name, user_id) VALUES (?, ?)", (name, user_id))
+    return cursor.lastrowid, True
+
+
+def get_or_create_customer(cursor, name, user_id):
+    """Return ``(customer_id, created)`` for a customer typed into a form."""
+    return _get_or_create(cursor, 'customers', name, user_id)
+
+
+def get_or_create_supplier(cursor, name, user_id):
+    """Return ``(supplier_id, created)`` for a supplier typed into a form."""
+    return _get_or_create(cursor, 'suppliers', name, user_id)
@@ -0,0 +1,598 @@
+"""Versioned schema migrations for inventory.db.
+
+The schema version lives in ``PRAGMA user_version``. Each migration runs in
+its own transaction together with the version bump, so a crash leaves the
+database at the last fully applied version. When the file is already
+current, ``migrate()`` costs a single pragma read.
+
+Add a migration by appending a function to ``MIGRATIONS``; never edit or
+reorder one that has shipped.
+
+    python -m database.migrations            # upgrade database/inventory.db
+"""
+from database.connection import get_connection, transaction
+
+# Rows processed between progress reports in backfill()
+BACKFILL_CHUNK_SIZE = 50000
+
+# SQLite VM instructions between progress callbacks in create_index()
+INDEX_PROGRESS_STEPS = 1000000
+
+
+def create_index(cursor, name, table, columns, report=None):
+    """Create an index, reporting progress while SQLite builds it.
+
+    SQLite builds an index in one statement, so progress is reported from
+    the VM progress handler rather than per row; ``total`` is 0 because the
+    number of steps is not known up front.
+    """
+    conn = cursor.connection
+    message = f"Building index {name} on {table}"
+    steps = [0]
+
+    def on_progress():
+        steps[0] += 1
+        report(message, steps[0], 0)
+        return 0
+
+    if report:
+        report(message, 0, 0)
+        conn.set_progress_handler(on_progress, INDEX_PROGRESS_STEPS)
+    try:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+    finally:
+        if report:
+            conn.set_progress_handler(None, 0)
+
+
+def backfill(cursor, table, sql, report=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Run an UPDATE over ``table`` in rowid ranges of ``chunk_size``.
+
+    ``sql`` is an UPDATE whose WHERE clause ends with
+    ``id BETWEEN ? AND ?``. Working in ranges keeps each statement's
+    journal small and lets the caller report progress on large tables.
+    """
+    cursor.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+    low, high = cursor.fetchone()
+    if low is None:
+        return
+    message = f"Backfilling {table}"
+    total = high - low + 1
+    for start in range(low, high + 1, chunk_size):
+        end = min(start + chunk_size - 1, high)
+        cursor.execute(sql, (start, end))
+        if report:
+            report(message, end - low + 1, total)
+
+
+def replace_table(cursor, table, new_table):
+    """Drop ``table`` and rename its rebuilt copy ``new_table`` into place.
+
+    An AUTOINCREMENT table's sqlite_sequence row moves with the rename, so
+    it would only remember the highest id copied across; the old table's
+    high-water mark is kept instead, so ids of deleted rows are not reused.
+    """
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+    row = cursor.fetchone()
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+    if row is None:
+        return
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+    cursor.execute(f"""
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT ?, MAX(?, IFNULL(MAX(id), 0)) FROM {table}
+    """, (table, row[0]))
+
+
+def _initial_schema(cursor, report):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sku_id TEXT NOT NULL,
+            barcode TEXT,
+            category TEXT NOT NULL,
+            subcategory TEXT,
+            product_name TEXT NOT NULL,
+            description TEXT,
+            tax_rate REAL NOT NULL,
+            price REAL NOT NULL,
+            default_unit TEXT NOT NULL,
+            image_path TEXT,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(sku_id, user_id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS suppliers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            contact_person TEXT,
+            phone TEXT,
+            email TEXT,
+            address TEXT,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(name, user_id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            contact_person TEXT,
+            phone TEXT,
+            email TEXT,
+            address TEXT,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(name, user_id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS goods_receiving (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            supplier TEXT NOT NULL,
+            product_sku TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            rate REAL NOT NULL,
+            tax_rate REAL NOT NULL,
+            total_rate REAL NOT NULL,
+            tax_amount REAL NOT NULL,
+            total_amount REAL NOT NULL,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer TEXT NOT NULL,
+            product_sku TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            rate REAL NOT NULL,
+            tax_rate REAL NOT NULL,
+            total_rate REAL NOT NULL,
+            tax_amount REAL NOT NULL,
+            total_amount REAL NOT NULL,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    # Create default admin user if it doesn't exist
+    cursor.execute("SELECT id FROM users WHERE username = 'admin'")
+    if not cursor.fetchone():
+        cursor.execute('''
+            INSERT INTO users (username, password, email, name)
+            VALUES (?, ?, ?, ?)
+        ''', ('admin', 'admin123', 'admin@example.com', 'Administrator'))
+
+
+def _list_query_indexes(cursor, report):
+    # Every index on a rowid table ends in the rowid, so (user_id) alone
+    # already serves "WHERE user_id = ? ORDER BY id DESC" without a sort
+    create_index(cursor, 'idx_sales_user', 'sales', ['user_id'], report)
+    create_index(cursor, 'idx_goods_receiving_user', 'goods_receiving', ['user_id'], report)
+
+    # Product lists ordered by name; covers the combo loads in the
+    # transaction forms without touching the table
+    create_index(cursor, 'idx_products_user_name', 'products',
+                 ['user_id', 'product_name', 'sku_id', 'tax_rate', 'price'], report)
+
+    # Covers the DISTINCT category/subcategory lookups
+    create_index(cursor, 'idx_products_user_category', 'products',
+                 ['user_id', 'category', 'subcategory'], report)
+
+    # The UNIQUE(name, user_id) constraints lead with name, which cannot
+    # serve "WHERE user_id = ? ORDER BY name"
+    create_index(cursor, 'idx_suppliers_user_name', 'suppliers', ['user_id', 'name'], report)
+    create_index(cursor, 'idx_customers_user_name', 'customers', ['user_id', 'name'], report)
+
+
+def _integer_foreign_keys(cursor, report):
+    # Transaction rows used to repeat the customer/supplier name and the
+    # product SKU as text. They now reference the master tables by id.
+    # Names and SKUs without a master row get one, so no history is lost.
+    cursor.execute("""
+        INSERT OR IGNORE INTO customers (name, user_id)
+        SELECT DISTINCT customer, user_id FROM sales
+    """)
+    cursor.execute("""
+        INSERT OR IGNORE INTO suppliers (name, user_id)
+        SELECT DISTINCT supplier, user_id FROM goods_receiving
+    """)
+    for table in ('sales', 'goods_receiving'):
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO products (
+                sku_id, category, product_name, tax_rate, price, default_unit, user_id
+            )
+            SELECT DISTINCT product_sku, 'Uncategorized', product_sku, 0, 0, 'unit', user_id
+            FROM {table}
+        """)
+
+    # SQLite cannot change a column's type in place, so both tables are
+    # rebuilt and copied across in id ranges
+    cursor.execute("""
+        CREATE TABLE sales_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            rate REAL NOT NULL,
+            tax_rate REAL NOT NULL,
+            total_rate REAL NOT NULL,
+            tax_amount REAL NOT NULL,
+            total_amount REAL NOT NULL,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES customers (id),
+            FOREIGN KEY (product_id) REFERENCES products (id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+    backfill(cursor, 'sales', """
+        INSERT INTO sales_new (
+            id, customer_id, product_id, quantity, rate, tax_rate,
+            total_rate, tax_amount, total_amount, user_id, created_at
+        )
+        SELECT s.id, c.id, p.id, s.quantity, s.rate, s.tax_rate,
+               s.total_rate, s.tax_amount, s.total_amount, s.user_id, s.created_at
+        FROM sales s
+        JOIN customers c ON c.name = s.customer AND c.user_id = s.user_id
+        JOIN products p ON p.sku_id = s.product_sku AND p.user_id = s.user_id
+        WHERE s.id BETWEEN ? AND ?
+    """, report)
+    replace_table(cursor, 'sales', 'sales_new')
+
+    cursor.execute("""
+        CREATE TABLE goods_receiving_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            supplier_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            rate REAL NOT NULL,
+            tax_rate REAL NOT NULL,
+            total_rate REAL NOT NULL,
+            tax_amount REAL NOT NULL,
+            total_amount REAL NOT NULL,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (supplier_id) REFERENCES suppliers (id),
+            FOREIGN KEY (product_id) REFERENCES products (id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+    backfill(cursor, 'goods_receiving', """
+        INSERT INTO goods_receiving_new (
+            id, supplier_id, product_id, quantity, rate, tax_rate,
+            total_rate, tax_amount, total_amount, user_id, created_at
+        )
+        SELECT g.id, s.id, p.id, g.quantity, g.rate, g.tax_rate,
+               g.total_rate, g.tax_amount, g.total_amount, g.user_id, g.created_at
+        FROM goods_receiving g
+        JOIN suppliers s ON s.name = g.supplier AND s.user_id = g.user_id
+        JOIN products p ON p.sku_id = g.product_sku AND p.user_id = g.user_id
+        WHERE g.id BETWEEN ? AND ?
+    """, report)
+    replace_table(cursor, 'goods_receiving', 'goods_receiving_new')
+
+    # The list indexes went away with the old tables
+    create_index(cursor, 'idx_sales_user', 'sales', ['user_id'], report)
+    create_index(cursor, 'idx_goods_receiving_user', 'goods_receiving', ['user_id'], report)
+
+
+def _stock_levels(cursor, report):
+    # On-hand quantity per product, kept current by the triggers below so
+    # forms can show stock without summing the whole history
+    cursor.execute("""
+        CREATE TABLE stock_levels (
+            product_id INTEGER PRIMARY KEY,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (product_id) REFERENCES products (id)
+        )
+    """)
+
+    # Receipts add to stock and sales take from it
+    for table, sign in (('goods_receiving', '+'), ('sales', '-')):
+        inverse = '-' if sign == '+' else '+'
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_stock_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO stock_levels (product_id, quantity)
+                VALUES (NEW.product_id, {sign}NEW.quantity)
+                ON CONFLICT (product_id) DO UPDATE
+                SET quantity = quantity {sign} NEW.quantity;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_stock_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO stock_levels (product_id, quantity)
+                VALUES (OLD.product_id, {inverse}OLD.quantity)
+                ON CONFLICT (product_id) DO UPDATE
+                SET quantity = quantity {inverse} OLD.quantity;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_stock_update
+            AFTER UPDATE OF product_id, quantity ON {table}
+            BEGIN
+                INSERT INTO stock_levels (product_id, quantity)
+                VALUES (OLD.product_id, {inverse}OLD.quantity)
+                ON CONFLICT (product_id) DO UPDATE
+                SET quantity = quantity {inverse} OLD.quantity;
+                INSERT INTO stock_levels (product_id, quantity)
+                VALUES (NEW.product_id, {sign}NEW.quantity)
+                ON CONFLICT (product_id) DO UPDATE
+                SET quantity = quantity {sign} NEW.quantity;
+            END
+        """)
+
+    if report:
+        report("Computing stock levels", 0, 0)
+    cursor.execute("""
+        INSERT INTO stock_levels (product_id, quantity)
+        SELECT product_id, SUM(quantity)
+        FROM (
+            SELECT product_id, quantity FROM goods_receiving
+            UNION ALL
+            SELECT product_id, -quantity FROM sales
+        )
+        GROUP BY product_id
+    """)
+
+
+
+def _product_search(cursor, report):
+    # Full-text index over the searchable product columns. It is an
+    # external-content table, so the text is not stored twice; the triggers
+    # below keep it in step with products.
+    columns = "product_name, description, category, subcategory, barcode, sku_id"
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE products_fts USING fts5(
+            {columns},
+            content='products', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    new_values = ", ".join(f"NEW.{column}" for column in columns.split(", "))
+    old_values = ", ".join(f"OLD.{column}" for column in columns.split(", "))
+    cursor.execute(f"""
+        CREATE TRIGGER trg_products_fts_insert AFTER INSERT ON products
+        BEGIN
+            INSERT INTO products_fts (rowid, {columns})
+            VALUES (NEW.id, {new_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_products_fts_delete AFTER DELETE ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, {columns})
+            VALUES ('delete', OLD.id, {old_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_products_fts_update AFTER UPDATE OF {columns} ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, {columns})
+            VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO products_fts (rowid, {columns})
+            VALUES (NEW.id, {new_values});
+        END
+    """)
+
+    if report:
+        report("Indexing products for search", 0, 0)
+    cursor.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+
+def _barcode_index(cursor, report):
+    # Scanner lookups in SalesForm; carries the columns the sales line
+    # needs so a scan is answered from the index alone
+    create_index(cursor, 'idx_products_user_barcode', 'products',
+                 ['user_id', 'barcode', 'sku_id', 'product_name', 'tax_rate', 'price'], report)
+
+
+def _created_at_indexes(cursor, report):
+    # Date-range exports stream rows in (created_at, id) order straight
+    # from these, without sorting the range first
+    for table in ('sales', 'goods_receiving', 'products'):
+        create_index(cursor, f'idx_{table}_user_created', table, ['user_id', 'created_at'], report)
+
+
+def _sales_history_indexes(cursor, report):
+    # Sales history filtered by customer or product, newest first, read
+    # straight from the index; with neither it uses idx_sales_user_created
+    create_index(cursor, 'idx_sales_user_customer', 'sales',
+                 ['user_id', 'customer_id', 'created_at'], report)
+    create_index(cursor, 'idx_sales_user_product', 'sales',
+                 ['user_id', 'product_id', 'created_at'], report)
+
+
+def _sales_rollups(cursor, report):
+    # Sales summed per user by day, month and year: in total, per product
+    # and per customer (key_id is the product or customer id, 0 for totals).
+    # Kept current by the triggers below so reports read a few rows
+    # instead of aggregating the whole history; see database/rollups.py.
+    cursor.execute("""
+        CREATE TABLE sales_rollups (
+            user_id INTEGER NOT NULL,
+            grain TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            period TEXT NOT NULL,
+            key_id INTEGER NOT NULL,
+            sales INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            total_rate REAL NOT NULL,
+            tax_amount REAL NOT NULL,
+            total_amount REAL NOT NULL,
+            PRIMARY KEY (user_id, grain, scope, period, key_id)
+        ) WITHOUT ROWID
+    """)
+
+    # Nine rows per sale: day, month and year (period is the first day of
+    # each), each in total, for the product and for the customer
+    def rollup_values(row, sign):
+        measures = (f"{sign}1, {sign}{row}.quantity, {sign}{row}.total_rate, "
+                    f"{sign}{row}.tax_amount, {sign}{row}.total_amount")
+        return ",\n".join(
+            f"({row}.user_id, '{grain}', '{scope}', {period}, {key}, {measures})"
+            for grain, period in (('day', f"date({row}.created_at)"),
+                                  ('month', f"date({row}.created_at, 'start of month')"),
+                                  ('year', f"date({row}.created_at, 'start of year')"))
+            for scope, key in (('total', '0'), ('product', f"{row}.product_id"),
+                               ('customer', f"{row}.customer_id"))
+        )
+
+    upsert = """
+        INSERT INTO sales_rollups (
+            user_id, grain, scope, period, key_id,
+            sales, quantity, total_rate, tax_amount, total_amount
+        ) VALUES {values}
+        ON CONFLICT (user_id, grain, scope, period, key_id) DO UPDATE SET
+            sales = sales + excluded.sales,
+            quantity = quantity + excluded.quantity,
+            total_rate = total_rate + excluded.total_rate,
+            tax_amount = tax_amount + excluded.tax_amount,
+            total_amount = total_amount + excluded.total_amount;
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER trg_sales_rollup_insert AFTER INSERT ON sales
+        BEGIN
+            {upsert.format(values=rollup_values('NEW', ''))}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_sales_rollup_delete AFTER DELETE ON sales
+        BEGIN
+            {upsert.format(values=rollup_values('OLD', '-'))}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_sales_rollup_update
+        AFTER UPDATE OF customer_id, product_id, quantity, total_rate, tax_amount,
+                        total_amount, user_id, created_at ON sales
+        BEGIN
+            {upsert.format(values=rollup_values('OLD', '-'))}
+            {upsert.format(values=rollup_values('NEW', ''))}
+        END
+    """)
+
+    if report:
+        report("Computing sales rollups", 0, 0)
+    cursor.execute("""
+        CREATE TEMP TABLE rollup_days AS
+        SELECT user_id, date(created_at) AS day, product_id, customer_id,
+               COUNT(*) AS sales, SUM(quantity) AS quantity, SUM(total_rate) AS total_rate,
+               SUM(tax_amount) AS tax_amount, SUM(total_amount) AS total_amount
+        FROM sales
+        GROUP BY user_id, day, product_id, customer_id
+    """)
+    for grain, period in (('day', 'day'), ('month', "date(day, 'start of month')"),
+                          ('year', "date(day, 'start of year')")):
+        for scope, key in (('total', '0'), ('product', 'product_id'),
+                           ('customer', 'customer_id')):
+            cursor.execute(f"""
+                INSERT INTO sales_rollups (
+                    user_id, grain, scope, period, key_id,
+                    sales, quantity, total_rate, tax_amount, total_amount
+                )
+                SELECT user_id, '{grain}', '{scope}', {period}, {key},
+                       SUM(sales), SUM(quantity), SUM(total_rate),
+                       SUM(tax_amount), SUM(total_amount)
+                FROM temp.rollup_days
+                GROUP BY user_id, {period}{'' if key == '0' else f', {key}'}
+            """)
+    cursor.execute("DROP TABLE temp.rollup_days")
+
+
+# Position in this list is the schema version the migration brings the
+# database to (the first entry produces version 1)
+MIGRATIONS = [
+    _initial_schema,
+    _list_query_indexes,
+    _integer_foreign_keys,
+    _stock_levels,
+    _product_search,
+    _barcode_index,
+    _created_at_indexes,
+    _sales_history_indexes,
+    _sales_rollups,
+]
+
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(report=None, target_version=LATEST_VERSION):
+    """Bring the database up to ``target_version`` (LATEST_VERSION by default).
+
+    ``report(message, done, total)`` is called as work progresses; a total
+    of 0 means the amount of work is unknown. Returns the list of versions
+    that were applied.
+    """
+    version = get_version(get_connection())
+    if version > LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} is newer than this application "
+            f"supports ({LATEST_VERSION}). Please upgrade the application."
+        )
+
+    applied = []
+    for target in range(version + 1, target_version + 1):
+        migration = MIGRATIONS[target - 1]
+        if report:
+            report(f"Applying schema version {target}", target - version - 1,
+                   target_version - version)
+        # Another terminal starting at the same time may be applying the
+        # same step: the write lock is taken before the version is read
+        # again, so one of them applies it and the other finds it done
+        with transaction(immediate=True) as cursor:
+            if get_version(cursor.connection) >= target:
+                continue
+            migration(cursor, report)
+            cursor.execute(f"PRAGMA user_version = {target}")
+        applied.append(target)
+    return applied
+
+
+def _print_progress(message, done, total):
+    if total:
+        print(f"{message}: {done}/{total}")
+    else:
+        print(f"{message}...")
+
+
+if __name__ == '__main__':
+    from database.db_setup import setup_database
+    applied = setup_database(report=_print_progress)
+    if applied:
+        print(f"Migrated to schema version {applied[-1]}")
+    else:
+        print(f"Schema already at version {LATEST_VERSION}")
@@ -0,0 +1,211 @@
+"""Daily, monthly and yearly sales totals for reports.
+
+``sales_rollups`` holds, per user and per day, month and year, the number of
+sales and the summed quantity, ``total_rate``, ``tax_amount`` and
+``total_amount``: in total, per product and per customer. Triggers on
+``sales`` keep it current as sales are saved (see schema version 9 in
+``database/migrations.py``), so a report over years of history reads a
+few hundred rows instead of the whole ``sales`` table.
+
+A date range is answered from year rows for the whole years in it,
+month rows for the whole months around them and day rows for the days
+at either end. Days, months and years are those of ``created_at``,
+which is in UTC.
+
+    python -m database.rollups --rebuild     # recompute from sales
+"""
+import argparse
+import datetime
+from database.connection import get_connection, transaction
+
+GRAINS = ('day', 'month', 'year')
+
+# Expression for each scope's key_id in a grouping over sales
+_SCOPE_KEYS = {'total': '0', 'product': 'product_id', 'customer': 'customer_id'}
+
+_MEASURES = """
+    SUM(sales) AS sales, SUM(quantity) AS quantity, SUM(total_rate) AS total_rate,
+    SUM(tax_amount) AS tax_amount, SUM(total_amount) AS total_amount
+"""
+
+
+def roll_up_sales(cursor, where="1", params=()):
+    """Add the sales matching ``where`` to the rollups.
+
+    For loads that bypass the triggers (``database/history.py``). The
+    sales are grouped by day once, and the nine rollups are summed from
+    that.
+    """
+    cursor.execute(f"""
+        CREATE TEMP TABLE rollup_days AS
+        SELECT user_id, date(created_at) AS day, product_id, customer_id,
+               COUNT(*) AS sales, SUM(quantity) AS quantity, SUM(total_rate) AS total_rate,
+               SUM(tax_amount) AS tax_amount, SUM(total_amount) AS total_amount
+        FROM sales
+        WHERE {where}
+        GROUP BY user_id, day, product_id, customer_id
+    """, params)
+    try:
+        for grain, period in (('day', 'day'), ('month', "date(day, 'start of month')"),
+                              ('year', "date(day, 'start of year')")):
+            for scope, key in _SCOPE_KEYS.items():
+                cursor.execute(f"""
+                    INSERT INTO sales_rollups (
+                        user_id, grain, scope, period, key_id,
+                        sales, quantity, total_rate, tax_amount, total_amount
+                    )
+                    SELECT user_id, '{grain}', '{scope}', {period}, {key}, {_MEASURES}
+                    FROM temp.rollup_days
+                    GROUP BY user_id, {period}{'' if key == '0' else f', {key}'}
+                    ON CONFLICT (user_id, grain, scope, period, key_id) DO UPDATE SET
+                        sales = sales + excluded.sales,
+                        quantity = quantity + excluded.quantity,
+                        total_rate = total_rate + excluded.total_rate,
+                        tax_amount = tax_amount + excluded.tax_amount,
+                        total_amount = total_amount + excluded.total_amount
+                """)
+    finally:
+        cursor.execute("DROP TABLE temp.rollup_days")
+
+
+def rebuild_sales_rollups(cursor=None):
+    """Recompute every rollup from the full sales history."""
+    if cursor is None:
+        with transaction() as cursor:
+            return rebuild_sales_rollups(cursor)
+
+    cursor.execute("DELETE FROM sales_rollups")
+    roll_up_sales(cursor)
+    cursor.execute("SELECT COUNT(*) FROM sales_rollups")
+    return cursor.fetchone()[0]
+
+
+def _date(value):
+    return value if isinstance(value, datetime.date) else datetime.date.fromisoformat(value)
+
+
+def _period_start(day, grain):
+    if grain == 'year':
+        return day.replace(month=1, day=1)
+    if grain == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(day, grain):
+    # First day of the period after the one starting on ``day``
+    if grain == 'year':
+        return day.replace(year=day.year + 1)
+    return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+
+def period_ranges(start, end, grain='year'):
+    """``(grain, first_period, last_period)`` ranges covering ``start``..``end`` exactly.
+
+    Whole periods of ``grain`` come from its rows and the days before and
+    after them from the next finer grain down to days, so a range of
+    years reads at most a few dozen rows per key.
+    """
+    start, end = _date(start), _date(end)
+    if grain == 'day':
+        return [('day', start.isoformat(), end.isoformat())]
+
+    finer = GRAINS[GRAINS.index(grain) - 1]
+    # First day of the first whole period, and the day after the last one
+    first = _period_start(start, grain)
+    if first < start:
+        first = _next_period(first, grain)
+    after = _period_start(end + datetime.timedelta(days=1), grain)
+    if first >= after:
+        return period_ranges(start, end, finer)
+
+    ranges = []
+    if start < first:
+        ranges += period_ranges(start, first - datetime.timedelta(days=1), finer)
+    last = _period_start(after - datetime.timedelta(days=1), grain)
+    ranges.append((grain, first.isoformat(), last.isoformat()))
+    if after <= end:
+        ranges += period_ranges(after, end, finer)
+    return ranges
+
+
+def _rollup_rows(user_id, scope, start, end, grain='year'):
+    # Rollup rows of one scope covering start..end, none coarser than grain,
+    # and their parameters
+    ranges = period_ranges(start, end, grain)
+    query = " UNION ALL ".join("""
+        SELECT * FROM sales_rollups
+        WHERE user_id = ? AND grain = ? AND scope = ? AND period BETWEEN ? AND ?
+    """ for _ in ranges)
+    params = [value for period_grain, first, last in ranges
+              for value in (user_id, period_grain, scope, first, last)]
+    return query, params
+
+
+def get_sales_summary(user_id, start, end):
+    """``(sales, quantity, total_rate, tax_amount, total_amount)`` for start..end."""
+    query, params = _rollup_rows(user_id, 'total', start, end)
+    cursor = get_connection().execute(f"SELECT {_MEASURES} FROM ({query})", params)
+    return tuple(value or 0 for value in cursor.fetchone())
+
+
+def get_sales_by_period(user_id, grain, start, end):
+    """One row per day, month or year from start..end that had sales, oldest first.
+
+    Rows are ``(period, sales, quantity, total_rate, tax_amount,
+    total_amount)``; periods at either end only count the days in range.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Sales are grouped by {', '.join(GRAINS)}")
+    # A coarser row cannot be split, so none are read
+    query, params = _rollup_rows(user_id, 'total', start, end, grain)
+    period = {'day': "period", 'month': "date(period, 'start of month')",
+              'year': "date(period, 'start of year')"}[grain]
+    cursor = get_connection().execute(f"""
+        SELECT {period} AS rollup_period, {_MEASURES}
+        FROM ({query})
+        GROUP BY rollup_period
+        ORDER BY rollup_period
+    """, params)
+    return cursor.fetchall()
+
+
+def get_top_sellers(user_id, scope, start, end, limit=20):
+    """Products or customers with the highest ``total_amount`` in start..end.
+
+    Rows are ``(name, sales, quantity, total_rate, tax_amount,
+    total_amount)``; a product's name is "Name (SKU)".
+    """
+    if scope == 'product':
+        name, join = "p.product_name || ' (' || p.sku_id || ')'", "products p ON p.id = r.key_id"
+    elif scope == 'customer':
+        name, join = "c.name", "customers c ON c.id = r.key_id"
+    else:
+        raise ValueError("Top sellers are products or customers")
+    query, params = _rollup_rows(user_id, scope, start, end)
+    cursor = get_connection().execute(f"""
+        SELECT {name}, r.sales, r.quantity, r.total_rate, r.tax_amount, r.total_amount
+        FROM (
+            SELECT key_id, {_MEASURES}
+            FROM ({query})
+            GROUP BY key_id
+            ORDER BY total_amount DESC, key_id
+            LIMIT ?
+        ) r
+        JOIN {join}
+        ORDER BY r.total_amount DESC, r.key_id
+    """, params + [limit])
+    return cursor.fetchall()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain the sales_rollups table")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="recompute sales_rollups from sales")
+    args = parser.parse_args()
+    if args.rebuild:
+        from database.db_setup import setup_database
+        setup_database()
+        print(f"Rebuilt sales rollups: {rebuild_sales_rollups()} rows")
+    else:
+        parser.print_help()
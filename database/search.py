@@ -0,0 +1,170 @@
+"""Ranked full-text product search.
+
+``products_fts`` is an FTS5 index over product name, description,
+category, subcategory, barcode and SKU, kept in sync with ``products`` by
+triggers (see schema version 5 in ``database/migrations.py``). The last
+word typed is matched as a prefix, so "blue sh" already finds "Blue Shirt".
+
+    python -m database.search --rebuild     # re-index every product
+    python -m database.search "blue shirt"  # try a query
+"""
+import argparse
+import re
+from database.connection import get_connection, transaction
+
+# Most results a search returns; more matches mean the text is too broad
+# to be useful anyway
+SEARCH_LIMIT = 50
+
+# Pause after the last keystroke before a search box runs its query
+SEARCH_DELAY_MS = 250
+
+_WORD = re.compile(r'\w+')
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query matching all of its words.
+
+    The last word is a prefix, as it may still be being typed; the others
+    must match whole words, which FTS5 can stream from the index instead
+    of merging every word that shares the prefix. Words are quoted, so
+    characters with a meaning in FTS5 query syntax (quotes, ``*``, ``-``,
+    ``:``, AND/OR/NOT) are searched for literally. Returns None when the
+    text has no words.
+    """
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+def _like_escape(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _prefix_range(text):
+    # Bounds of the strings starting with text, for an index range scan
+    return text, text + '\U0010ffff'
+
+
+def _case_variants(text):
+    # Index ranges compare case-sensitively, unlike LIKE and FTS5, so a
+    # prefix probe tries the ways a name or SKU is usually capitalized
+    return sorted({text, text.lower(), text.upper(), text.capitalize(), text.title()})
+
+
+def search_products(user_id, text, columns, limit=SEARCH_LIMIT):
+    """Return ``user_id``'s products matching ``text``, best match first.
+
+    ``columns`` is the SELECT list, written against the products table
+    aliased as ``p``, e.g. ``"p.id, p.sku_id, p.product_name"``.
+
+    Results are ordered by where the text matched: names starting with it,
+    then SKUs or barcodes starting with it, then names containing every
+    word, then matches in the category or description only. FTS5's bm25()
+    is not used because it counts every match of every word first, which
+    takes hundreds of milliseconds for short prefixes on a large catalog.
+    Names, SKUs and barcodes starting with the text are found with range
+    scans on idx_products_user_name, the SKU constraint's index and
+    idx_products_user_barcode, so they are ranked first however many
+    other products match; of the rest, only the first ``limit`` full-text
+    matches are ranked, so a broad search is narrowed by typing more.
+    """
+    query = build_match_query(text)
+    if query is None:
+        return []
+
+    words = _WORD.findall(text)
+    typed = text.strip()
+    prefix = _like_escape(typed) + '%'
+    name_has_words = " AND ".join(["p.product_name LIKE ? ESCAPE '\\'"] * len(words))
+
+    # One ordered range scan per spelling, each stopping after limit rows
+    probes, params = [], []
+    for variant in _case_variants(typed):
+        probes.append("""
+            SELECT id FROM (
+                SELECT p.id FROM products p
+                WHERE p.user_id = ? AND p.product_name >= ? AND p.product_name < ?
+                ORDER BY p.product_name, p.sku_id
+                LIMIT ?
+            )
+        """)
+        params += [user_id, *_prefix_range(variant), limit]
+        # The unary + keeps the planner on the UNIQUE(sku_id, user_id)
+        # index instead of walking the user's products on a user_id index
+        probes.append("""
+            SELECT id FROM (
+                SELECT p.id FROM products p
+                WHERE p.sku_id >= ? AND p.sku_id < ? AND +p.user_id = ?
+                LIMIT ?
+            )
+        """)
+        params += [*_prefix_range(variant), user_id, limit]
+    probes.append("""
+        SELECT id FROM (
+            SELECT p.id FROM products p
+            WHERE p.user_id = ? AND p.barcode >= ? AND p.barcode < ?
+            LIMIT ?
+        )
+    """)
+    params += [user_id, *_prefix_range(typed), limit]
+
+    # CROSS JOIN keeps the full-text index as the outer loop
+    probes.append("""
+        SELECT id FROM (
+            SELECT p.id
+            FROM products_fts f
+            CROSS JOIN products p ON p.id = f.rowid
+            WHERE products_fts MATCH ? AND p.user_id = ?
+            LIMIT ?
+        )
+    """)
+    params += [query, user_id, limit]
+
+    cursor = get_connection().execute(f"""
+        SELECT {columns}
+        FROM ({" UNION ".join(probes)}) m
+        JOIN products p ON p.id = m.id
+        ORDER BY
+            CASE
+                WHEN p.product_name LIKE ? ESCAPE '\\' THEN 0
+                WHEN p.sku_id LIKE ? ESCAPE '\\' OR p.barcode LIKE ? ESCAPE '\\' THEN 1
+                WHEN {name_has_words} THEN 2
+                ELSE 3
+            END,
+            p.product_name, p.sku_id
+        LIMIT ?
+    """, (*params, prefix, prefix, prefix,
+          *(f"%{_like_escape(word)}%" for word in words), limit))
+    return cursor.fetchall()
+
+
+def rebuild_search_index(cursor=None):
+    """Re-index every product, e.g. after editing the database by hand."""
+    if cursor is None:
+        with transaction() as cursor:
+            return rebuild_search_index(cursor)
+
+    cursor.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+    return cursor.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain and query the product search index")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="rebuild products_fts from the products table")
+    parser.add_argument('--user-id', type=int, default=1)
+    parser.add_argument('query', nargs='?', help="search text to try")
+    args = parser.parse_args()
+    if not args.rebuild and args.query is None:
+        parser.print_help()
+    else:
+        from database.db_setup import setup_database
+        setup_database()
+        if args.rebuild:
+            print(f"Re-indexed {rebuild_search_index()} products")
+        if args.query is not None:
+            for row in search_products(args.user_id, args.query,
+                                       "p.sku_id, p.product_name, p.category"):
+                print(*row, sep="  ")
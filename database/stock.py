@@ -0,0 +1,50 @@
+"""On-hand stock per product.
+
+``stock_levels`` is kept current by triggers on ``goods_receiving`` and
+``sales`` (see schema version 4 in ``database/migrations.py``), so reading
+a product's stock is a primary-key lookup instead of a sum over history.
+
+    python -m database.stock --rebuild     # recompute from history
+"""
+import argparse
+from database.connection import get_connection, transaction
+
+
+def get_on_hand(product_id):
+    cursor = get_connection().execute(
+        "SELECT quantity FROM stock_levels WHERE product_id = ?", (product_id,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def rebuild_stock_levels(cursor=None):
+    """Recompute every product's stock from the full transaction history."""
+    if cursor is None:
+        with transaction() as cursor:
+            return rebuild_stock_levels(cursor)
+
+    cursor.execute("DELETE FROM stock_levels")
+    cursor.execute("""
+        INSERT INTO stock_levels (product_id, quantity)
+        SELECT product_id, SUM(quantity)
+        FROM (
+            SELECT product_id, quantity FROM goods_receiving
+            UNION ALL
+            SELECT product_id, -quantity FROM sales
+        )
+        GROUP BY product_id
+    """)
+    return cursor.rowcount
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain the stock_levels table")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="recompute stock_levels from goods_receiving and sales")
+    args = parser.parse_args()
+    if args.rebuild:
+        from database.db_setup import setup_database
+        setup_database()
+        print(f"Rebuilt stock levels for {rebuild_stock_levels()} products")
+    else:
+        parser.print_help()
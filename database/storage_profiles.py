@@ -0,0 +1,73 @@
+"""Named SQLite storage profiles applied to every pooled connection.
+
+The profile is picked once at startup (``setup_database(profile=...)`` or the
+``INVENTORY_DB_PROFILE`` environment variable) and its pragmas run on each
+new connection, since most of them are per-connection settings.
+"""
+import os
+
+PROFILE_ENV_VAR = 'INVENTORY_DB_PROFILE'
+DEFAULT_PROFILE = 'terminal'
+
+STORAGE_PROFILES = {
+    # What the app ran with before profiles existed (SQLite defaults plus
+    # the 5s timeout of sqlite3.connect), kept for comparison in benchmarks
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    # Several tills sharing one file: readers never wait on the writer and
+    # a commit only fsyncs at checkpoints
+    'terminal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # Same as terminal but every commit is fsynced
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # One-off imports where the file can be rebuilt if the machine dies
+    'bulk': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -256000,
+        'mmap_size': 1024 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+    },
+}
+
+
+def get_profile(name=None):
+    if name is None:
+        name = os.environ.get(PROFILE_ENV_VAR, DEFAULT_PROFILE)
+    if name not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile '{name}'. "
+            f"Available profiles: {', '.join(sorted(STORAGE_PROFILES))}"
+        )
+    return name, STORAGE_PROFILES[name]
+
+
+def apply_profile(conn, profile):
+    # busy_timeout goes first so switching the journal mode can wait for
+    # another terminal that is mid-write
+    conn.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])}")
+    conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {profile['synchronous']}")
+    conn.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store = {profile['temp_store']}")
@@ -1,11 +1,27 @@
-import os
-import sqlite3
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QMessageBox,
-                             QTableWidget, QTableWidgetItem, QScrollArea,
+                             QTableView, QScrollArea,
                              QGroupBox)
 from PySide6.QtCore import Qt, Signal
-from styles import FORM_STYLE
+from database.connection import get_connection, transaction
+from forms.table_models import KeysetTableModel, PAGE_SIZE
+from forms.workers import QueryRunner
+
+# Keyset pagination on (name, id), following idx_customers_user_name
+CUSTOMERS_FIRST_PAGE_QUERY = """
+    SELECT name, contact_person, phone, email, address, id
+    FROM customers
+    WHERE user_id = ?
+    ORDER BY name, id
+    LIMIT ?
+"""
+CUSTOMERS_PAGE_QUERY = """
+    SELECT name, contact_person, phone, email, address, id
+    FROM customers
+    WHERE user_id = ? AND (name, id) > (?, ?)
+    ORDER BY name, id
+    LIMIT ?
+"""
 
 class CustomerMasterForm(QWidget):
     customer_added = Signal()  # Signal to notify when a customer is added
@@ -13,47 +29,34 @@ class CustomerMasterForm(QWidget):
     def __init__(self, current_user=None):
         super().__init__()
         self.current_user = current_user
+        self.queries = QueryRunner(self)
         self.setup_ui()
-        self.load_customers()
-        self.setStyleSheet(FORM_STYLE)
+        self.load_data()
+        self.setProperty("form", True)
         
-    def get_db_connection(self):
-        db_path = os.path.join('database', 'inventory.db')
-        return sqlite3.connect(db_path)
+    def load_data(self):
+        # Everything the form shows; also called when a user logs in
+        self.load_customers()
 
     def setup_ui(self):
         # Create main scroll area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #f0f0f0;
-                width: 10px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #c0c0c0;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-
-        # Create main widget and layout
+
+        outer_layout = QVBoxLayout(self)
+        outer_layout.addWidget(scroll)
+
+        # Create main widget and layout; containers are put in place before
+        # their contents (see styles.py)
         main_widget = QWidget()
-        layout = QVBoxLayout()
+        scroll.setWidget(main_widget)
+        layout = QVBoxLayout(main_widget)
         layout.setSpacing(20)
         
         # Form fields
         form_group = QGroupBox("Customer Details")
-        form_layout = QVBoxLayout()
+        layout.addWidget(form_group)
+        form_layout = QVBoxLayout(form_group)
         form_layout.setSpacing(15)
         
         # Customer Name
@@ -97,28 +100,25 @@ class CustomerMasterForm(QWidget):
         form_layout.addLayout(phone_layout)
         form_layout.addLayout(email_layout)
         form_layout.addLayout(address_layout)
-        
-        form_group.setLayout(form_layout)
-        
+
         # Customer table
         table_group = QGroupBox("Customer List")
-        table_layout = QVBoxLayout()
-        self.customer_table = QTableWidget()
-        self.customer_table.setColumnCount(5)
-        self.customer_table.setHorizontalHeaderLabels([
+        layout.addWidget(table_group)
+        table_layout = QVBoxLayout(table_group)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.hide()
+        self.queries.busy_changed.connect(self.loading_label.setVisible)
+        table_layout.addWidget(self.loading_label)
+        # Rows are fetched a page at a time as the view scrolls
+        self.customers_model = KeysetTableModel([
             "Name", "Phone", "Email", "Address", "Actions"
         ])
-        self.customer_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.customer_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.customer_table.itemDoubleClicked.connect(self.load_customer)
-        self.customer_table.setStyleSheet("""
-            QTableWidget {
-                border: none;
-                background-color: white;
-            }
-        """)
+        self.customer_table = QTableView()
+        self.customer_table.setModel(self.customers_model)
+        self.customer_table.setSelectionBehavior(QTableView.SelectRows)
+        self.customer_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.customer_table.doubleClicked.connect(self.load_customer)
         table_layout.addWidget(self.customer_table)
-        table_group.setLayout(table_layout)
         
         # Action buttons
         button_layout = QHBoxLayout()
@@ -128,20 +128,8 @@ class CustomerMasterForm(QWidget):
         self.clear_button.setMinimumHeight(40)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.clear_button)
-        
-        # Add all layouts to main layout
-        layout.addWidget(form_group)
-        layout.addWidget(table_group)
         layout.addLayout(button_layout)
-        
-        main_widget.setLayout(layout)
-        scroll.setWidget(main_widget)
-        
-        # Create outer layout for scroll area
-        outer_layout = QVBoxLayout()
-        outer_layout.addWidget(scroll)
-        self.setLayout(outer_layout)
-        
+
         # Connect signals
         self.save_button.clicked.connect(self.save_customer)
         self.clear_button.clicked.connect(self.clear_form)
@@ -149,26 +137,28 @@ class CustomerMasterForm(QWidget):
     def load_customers(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT name, contact_person, phone, email, address
-            FROM customers
-            WHERE user_id = ?
-            ORDER BY name
-        """, (self.current_user['id'],))
         
-        customers = cursor.fetchall()
-        self.customer_table.setRowCount(len(customers))
+        # The first page is read on a worker; later pages load as the view scrolls
+        self.queries.run('customers', self.fetch_customers_page, (None, PAGE_SIZE),
+                         self.show_customers, self.load_failed)
+
+    def fetch_customers_page(self, last_row, limit):
+        conn = get_connection()
+        cursor = conn.cursor()
         
-        for row, customer in enumerate(customers):
-            for col, value in enumerate(customer):
-                item = QTableWidgetItem(str(value) if value is not None else "")
-                self.customer_table.setItem(row, col, item)
+        if last_row is None:
+            cursor.execute(CUSTOMERS_FIRST_PAGE_QUERY, (self.current_user['id'], limit))
+        else:
+            cursor.execute(CUSTOMERS_PAGE_QUERY,
+                           (self.current_user['id'], last_row[0], last_row[5], limit))
         
-        conn.close()
+        return cursor.fetchall()
+
+    def show_customers(self, customers):
+        self.customers_model.reload(self.fetch_customers_page, first_page=customers)
+
+    def load_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
 
     def save_customer(self):
         if not self.current_user:
@@ -187,33 +177,43 @@ class CustomerMasterForm(QWidget):
             QMessageBox.warning(self, "Error", "Please enter customer name")
             return
         
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
+        self.save_button.setEnabled(False)
+        self.queries.submit(
+            self.insert_customer,
+            (self.current_user['id'], name, contact, phone, email, address),
+            self.customer_saved, self.save_failed
+        )
+
+    def insert_customer(self, user_id, name, contact, phone, email, address):
+        # Runs on a worker thread; returns False if the name is taken
+        with transaction() as cursor:
             # Check if customer name already exists
-            cursor.execute("SELECT id FROM customers WHERE name = ? AND user_id = ?", (name, self.current_user['id']))
+            cursor.execute("SELECT id FROM customers WHERE name = ? AND user_id = ?", (name, user_id))
             if cursor.fetchone():
-                QMessageBox.warning(self, "Error", "Customer name already exists")
-                return
+                return False
             
             # Insert new customer
             cursor.execute("""
                 INSERT INTO customers (
                     name, contact_person, phone, email, address, user_id
                 ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (name, contact, phone, email, address, self.current_user['id']))
-            
-            conn.commit()
-            QMessageBox.information(self, "Success", "Customer saved successfully")
-            self.clear_form()
-            self.load_customers()
-            self.customer_added.emit()  # Emit signal when customer is added
-            
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
-        finally:
-            conn.close()
+            """, (name, contact, phone, email, address, user_id))
+        return True
+
+    def customer_saved(self, saved):
+        self.save_button.setEnabled(True)
+        if not saved:
+            QMessageBox.warning(self, "Error", "Customer name already exists")
+            return
+        
+        QMessageBox.information(self, "Success", "Customer saved successfully")
+        self.clear_form()
+        self.load_customers()
+        self.customer_added.emit()  # Emit signal when customer is added
+
+    def save_failed(self, message):
+        self.save_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
 
     def clear_form(self):
         self.name_input.clear()
@@ -222,10 +222,11 @@ class CustomerMasterForm(QWidget):
         self.email_input.clear()
         self.address_input.clear()
 
-    def load_customer(self, item):
-        row = item.row()
-        self.name_input.setText(self.customer_table.item(row, 0).text())
-        self.contact_input.setText(self.customer_table.item(row, 1).text())
-        self.phone_input.setText(self.customer_table.item(row, 2).text())
-        self.email_input.setText(self.customer_table.item(row, 3).text())
-        self.address_input.setText(self.customer_table.item(row, 4).text()) 
\ No newline at end of file
+    def load_customer(self, index):
+        customer = self.customers_model.row_data(index.row())
+        text = [str(value) if value is not None else "" for value in customer]
+        self.name_input.setText(text[0])
+        self.contact_input.setText(text[1])
+        self.phone_input.setText(text[2])
+        self.email_input.setText(text[3])
+        self.address_input.setText(text[4])
@@ -1,63 +1,67 @@
-import sqlite3
-import os
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QComboBox, QPushButton, QMessageBox,
-                             QDoubleSpinBox, QTableWidget, QTableWidgetItem,
-                             QSpinBox, QScrollArea, QGroupBox)
+                             QDoubleSpinBox, QTableView, QSpinBox,
+                             QScrollArea, QGroupBox)
 from PySide6.QtCore import Qt
-from styles import FORM_STYLE
+from database.connection import get_connection, transaction
+from database.stock import get_on_hand
+from database.masters import get_or_create_supplier
+from database.catalog import get_products
+from forms.table_models import KeysetTableModel, RecordListModel, MAX_ROW_ID, PAGE_SIZE
+from forms.workers import QueryRunner
+
+# Receiving history rows: displayed columns followed by the record id,
+# which is the pagination key
+RECEIVING_LIST_SELECT = """
+    SELECT s.name, p.sku_id, g.quantity, g.rate, g.tax_rate,
+           g.total_rate, g.tax_amount, g.total_amount, g.id
+    FROM goods_receiving g
+    JOIN suppliers s ON s.id = g.supplier_id
+    JOIN products p ON p.id = g.product_id
+"""
+
+# Keyset pagination on the record id, newest first
+RECEIVING_PAGE_QUERY = f"""
+    {RECEIVING_LIST_SELECT}
+    WHERE g.user_id = ? AND g.id < ?
+    ORDER BY g.id DESC
+    LIMIT ?
+"""
 
 class GoodsReceivingForm(QWidget):
-    def __init__(self, product_master_form=None, current_user=None):
+    def __init__(self, current_user=None):
         super().__init__()
-        self.product_master_form = product_master_form
         self.current_user = current_user
+        self.queries = QueryRunner(self)
         self.setup_ui()
+        self.load_data()
+        self.setProperty("form", True)
+
+    def load_data(self):
+        # Everything the form shows; also called when a user logs in
         self.load_products()
         self.load_suppliers()
         self.load_receiving_list()
-        self.setStyleSheet(FORM_STYLE)
-        
-        if product_master_form:
-            product_master_form.product_added.connect(self.load_products)
-
-    def get_db_connection(self):
-        db_path = os.path.join('database', 'inventory.db')
-        return sqlite3.connect(db_path)
 
     def setup_ui(self):
         # Create main scroll area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #f0f0f0;
-                width: 10px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #c0c0c0;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
 
-        # Create main widget and layout
+        outer_layout = QVBoxLayout(self)
+        outer_layout.addWidget(scroll)
+
+        # Create main widget and layout; containers are put in place before
+        # their contents (see styles.py)
         main_widget = QWidget()
-        layout = QVBoxLayout()
+        scroll.setWidget(main_widget)
+        layout = QVBoxLayout(main_widget)
         layout.setSpacing(20)
         
         # Form fields
         form_group = QGroupBox("Goods Receiving Details")
-        form_layout = QVBoxLayout()
+        layout.addWidget(form_group)
+        form_layout = QVBoxLayout(form_group)
         form_layout.setSpacing(15)
         
         # Supplier
@@ -67,20 +71,8 @@ class GoodsReceivingForm(QWidget):
         self.supplier_combo.setEditable(True)
         self.supplier_combo.setPlaceholderText("Select or enter supplier")
         self.supplier_combo.setMinimumHeight(30)
-        self.supplier_combo.setStyleSheet("""
-            QComboBox {
-                padding-right: 20px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: url(resources/down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
+        self.supplier_combo.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.supplier_combo.setMinimumContentsLength(40)
         supplier_layout.addWidget(supplier_label)
         supplier_layout.addWidget(self.supplier_combo)
         
@@ -90,23 +82,20 @@ class GoodsReceivingForm(QWidget):
         self.product_combo = QComboBox()
         self.product_combo.setPlaceholderText("Select product")
         self.product_combo.setMinimumHeight(30)
-        self.product_combo.setStyleSheet("""
-            QComboBox {
-                padding-right: 20px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: url(resources/down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
+        # Fixed width; measuring every product's label is too slow for large catalogs
+        self.product_combo.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.product_combo.setMinimumContentsLength(40)
         product_layout.addWidget(product_label)
         product_layout.addWidget(self.product_combo)
         
+        # On-hand stock for the selected product
+        stock_layout = QHBoxLayout()
+        stock_label = QLabel("On Hand:")
+        self.stock_label = QLabel("-")
+        self.stock_label.setMinimumHeight(30)
+        stock_layout.addWidget(stock_label)
+        stock_layout.addWidget(self.stock_label)
+        
         # Quantity
         quantity_layout = QHBoxLayout()
         quantity_label = QLabel("Quantity:")
@@ -163,35 +152,33 @@ class GoodsReceivingForm(QWidget):
         # Add all layouts to form layout
         form_layout.addLayout(supplier_layout)
         form_layout.addLayout(product_layout)
+        form_layout.addLayout(stock_layout)
         form_layout.addLayout(quantity_layout)
         form_layout.addLayout(rate_layout)
         form_layout.addLayout(tax_layout)
         form_layout.addLayout(total_rate_layout)
         form_layout.addLayout(tax_amount_layout)
         form_layout.addLayout(total_amount_layout)
-        
-        form_group.setLayout(form_layout)
-        
+
         # Receiving table
         table_group = QGroupBox("Goods Receiving History")
-        table_layout = QVBoxLayout()
-        self.receiving_table = QTableWidget()
-        self.receiving_table.setColumnCount(8)
-        self.receiving_table.setHorizontalHeaderLabels([
+        layout.addWidget(table_group)
+        table_layout = QVBoxLayout(table_group)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.hide()
+        self.queries.busy_changed.connect(self.loading_label.setVisible)
+        table_layout.addWidget(self.loading_label)
+        # Newest records first; older pages load as the view scrolls
+        self.receiving_model = KeysetTableModel([
             "Supplier", "Product", "Quantity", "Rate", "Tax Rate",
             "Total Rate", "Tax Amount", "Total Amount"
         ])
-        self.receiving_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.receiving_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.receiving_table.itemDoubleClicked.connect(self.load_receiving)
-        self.receiving_table.setStyleSheet("""
-            QTableWidget {
-                border: none;
-                background-color: white;
-            }
-        """)
+        self.receiving_table = QTableView()
+        self.receiving_table.setModel(self.receiving_model)
+        self.receiving_table.setSelectionBehavior(QTableView.SelectRows)
+        self.receiving_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.receiving_table.doubleClicked.connect(self.load_receiving)
         table_layout.addWidget(self.receiving_table)
-        table_group.setLayout(table_layout)
         
         # Action buttons
         button_layout = QHBoxLayout()
@@ -201,20 +188,8 @@ class GoodsReceivingForm(QWidget):
         self.clear_button.setMinimumHeight(40)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.clear_button)
-        
-        # Add all layouts to main layout
-        layout.addWidget(form_group)
-        layout.addWidget(table_group)
         layout.addLayout(button_layout)
-        
-        main_widget.setLayout(layout)
-        scroll.setWidget(main_widget)
-        
-        # Create outer layout for scroll area
-        outer_layout = QVBoxLayout()
-        outer_layout.addWidget(scroll)
-        self.setLayout(outer_layout)
-        
+
         # Connect signals for automatic calculations
         self.quantity_input.valueChanged.connect(self.calculate_totals)
         self.rate_input.valueChanged.connect(self.calculate_totals)
@@ -226,34 +201,34 @@ class GoodsReceivingForm(QWidget):
     def load_products(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT sku_id, product_name, tax_rate, price
-            FROM products
-            WHERE user_id = ?
-            ORDER BY product_name
-        """, (self.current_user['id'],))
-        
-        products = cursor.fetchall()
-        self.product_combo.clear()
         
-        for product in products:
-            self.product_combo.addItem(f"{product[1]} ({product[0]})", {
-                'sku_id': product[0],
-                'tax_rate': product[2],
-                'price': product[3]
-            })
-        
-        conn.close()
+        self.queries.run('products', self.fetch_products, (self.current_user['id'],),
+                         self.show_products, self.load_failed)
+
+    def fetch_products(self, user_id):
+        # Runs on a worker thread; only the first form to ask queries the database
+        return get_products(user_id)
+
+    def show_products(self, result):
+        labels, records = result
+        
+        # One list model rather than an addItem per product, so large
+        # catalogs load without stalling the window
+        self.product_combo.blockSignals(True)
+        self.product_combo.setModel(RecordListModel(labels, records, self.product_combo))
+        self.product_combo.blockSignals(False)
+        self.product_combo.setCurrentIndex(-1)
 
     def load_suppliers(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
+        
+        self.queries.run('suppliers', self.fetch_suppliers, (self.current_user['id'],),
+                         self.show_suppliers, self.load_failed)
+
+    def fetch_suppliers(self, user_id):
+        # Runs on a worker thread
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -261,15 +236,19 @@ class GoodsReceivingForm(QWidget):
             FROM suppliers
             WHERE user_id = ?
             ORDER BY name
-        """, (self.current_user['id'],))
+        """, (user_id,))
         
-        suppliers = [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in cursor.fetchall()]
+
+    def show_suppliers(self, suppliers):
         self.supplier_combo.clear()
         self.supplier_combo.addItems(suppliers)
-        
-        conn.close()
+
+    def load_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
 
     def product_changed(self, index):
+        self.update_stock_label()
         if index >= 0:
             product_data = self.product_combo.itemData(index)
             if product_data:
@@ -277,6 +256,13 @@ class GoodsReceivingForm(QWidget):
                 self.rate_input.setValue(product_data['price'])
                 self.calculate_totals()
 
+    def update_stock_label(self):
+        product_data = self.product_combo.currentData()
+        if product_data:
+            self.stock_label.setText(str(get_on_hand(product_data['id'])))
+        else:
+            self.stock_label.setText("-")
+
     def calculate_totals(self):
         quantity = self.quantity_input.value()
         rate = self.rate_input.value()
@@ -312,37 +298,53 @@ class GoodsReceivingForm(QWidget):
             QMessageBox.warning(self, "Error", "Please select a supplier")
             return
         
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Insert new receiving record
+        self.save_button.setEnabled(False)
+        self.queries.submit(self.insert_receiving, (
+            self.current_user['id'],
+            supplier,
+            product_data['id'],
+            quantity,
+            rate,
+            tax_rate,
+            float(self.total_rate_label.text()),
+            float(self.tax_amount_label.text()),
+            float(self.total_amount_label.text())
+        ), self.receiving_saved, self.save_failed)
+
+    def insert_receiving(self, user_id, supplier, product_id, quantity, rate, tax_rate,
+                         total_rate, tax_amount, total_amount):
+        # Runs on a worker thread; returns the new history row and whether
+        # the supplier had to be created
+        with transaction() as cursor:
+            supplier_id, supplier_created = get_or_create_supplier(cursor, supplier, user_id)
             cursor.execute("""
                 INSERT INTO goods_receiving (
-                    supplier, product_sku, quantity, rate, tax_rate,
+                    supplier_id, product_id, quantity, rate, tax_rate,
                     total_rate, tax_amount, total_amount, user_id
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
-                supplier,
-                product_data['sku_id'],
-                quantity,
-                rate,
-                tax_rate,
-                float(self.total_rate_label.text()),
-                float(self.tax_amount_label.text()),
-                float(self.total_amount_label.text()),
-                self.current_user['id']
+                supplier_id, product_id, quantity, rate, tax_rate,
+                total_rate, tax_amount, total_amount, user_id
             ))
-            
-            conn.commit()
-            QMessageBox.information(self, "Success", "Goods receiving saved successfully")
-            self.clear_form()
-            self.load_receiving_list()
-            
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
-        finally:
-            conn.close()
+            cursor.execute(f"{RECEIVING_LIST_SELECT} WHERE g.id = ?", (cursor.lastrowid,))
+            return cursor.fetchone(), supplier_created
+
+    def receiving_saved(self, result):
+        receiving, supplier_created = result
+        self.save_button.setEnabled(True)
+        
+        # A name typed into the combo is now a supplier as well
+        if supplier_created:
+            self.load_suppliers()
+        
+        QMessageBox.information(self, "Success", "Goods receiving saved successfully")
+        self.clear_form()
+        if receiving:
+            self.receiving_model.prepend_row(receiving)
+
+    def save_failed(self, message):
+        self.save_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
 
     def clear_form(self):
         self.supplier_combo.setCurrentText("")
@@ -357,32 +359,31 @@ class GoodsReceivingForm(QWidget):
     def load_receiving_list(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT supplier, product_sku, quantity, rate, tax_rate,
-                   total_rate, tax_amount, total_amount
-            FROM goods_receiving
-            WHERE user_id = ?
-            ORDER BY id DESC
-        """, (self.current_user['id'],))
         
-        receiving_list = cursor.fetchall()
-        self.receiving_table.setRowCount(len(receiving_list))
+        # The first page is read on a worker; older pages load as the view scrolls
+        self.queries.run('receiving_list', self.query_receiving_page,
+                         (self.current_user['id'], MAX_ROW_ID, PAGE_SIZE),
+                         self.show_receiving_list, self.load_failed)
+
+    def show_receiving_list(self, records):
+        self.receiving_model.reload(self.fetch_receiving_page, first_page=records)
+
+    def fetch_receiving_page(self, last_row, limit):
+        before_id = last_row[8] if last_row else MAX_ROW_ID
+        return self.query_receiving_page(self.current_user['id'], before_id, limit)
+
+    def query_receiving_page(self, user_id, before_id, limit):
+        conn = get_connection()
+        cursor = conn.cursor()
         
-        for row, receiving in enumerate(receiving_list):
-            for col, value in enumerate(receiving):
-                item = QTableWidgetItem(str(value) if value is not None else "")
-                self.receiving_table.setItem(row, col, item)
+        cursor.execute(RECEIVING_PAGE_QUERY, (user_id, before_id, limit))
         
-        conn.close()
+        return cursor.fetchall()
 
-    def load_receiving(self, item):
-        row = item.row()
-        supplier = self.receiving_table.item(row, 0).text()
-        product_sku = self.receiving_table.item(row, 1).text()
+    def load_receiving(self, index):
+        receiving = self.receiving_model.row_data(index.row())
+        supplier = receiving[0]
+        product_sku = receiving[1]
         
         # Find supplier in combo box
         index = self.supplier_combo.findText(supplier)
@@ -390,11 +391,12 @@ class GoodsReceivingForm(QWidget):
             self.supplier_combo.setCurrentIndex(index)
         
         # Find product in combo box
-        for i in range(self.product_combo.count()):
-            if self.product_combo.itemData(i)['sku_id'] == product_sku:
-                self.product_combo.setCurrentIndex(i)
-                break
-        
-        self.quantity_input.setValue(int(self.receiving_table.item(row, 2).text()))
-        self.rate_input.setValue(float(self.receiving_table.item(row, 3).text()))
-        self.tax_input.setValue(float(self.receiving_table.item(row, 4).text())) 
\ No newline at end of file
+        model = self.product_combo.model()
+        if isinstance(model, RecordListModel):
+            row = model.find_row('sku_id', product_sku)
+            if row >= 0:
+                self.product_combo.setCurrentIndex(row)
+        
+        self.quantity_input.setValue(int(receiving[2]))
+        self.rate_input.setValue(float(receiving[3]))
+        self.tax_input.setValue(float(receiving[4]))
@@ -1,61 +1,118 @@
+import functools
 import os
-import sqlite3
+import threading
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QComboBox, QTextEdit, QPushButton,
-                             QFileDialog, QMessageBox, QTableWidget, QTableWidgetItem,
-                             QGroupBox, QFrame, QScrollArea, QDoubleSpinBox, QSpinBox)
-from PySide6.QtCore import Qt, Signal
+                             QFileDialog, QMessageBox, QTableView,
+                             QGroupBox, QFrame, QScrollArea, QDoubleSpinBox, QSpinBox,
+                             QProgressDialog)
+from PySide6.QtCore import Qt, Signal, QTimer, QSize
 from PySide6.QtGui import QPixmap, QImage, QIcon
-import qrcode
-from PIL import Image
-from styles import FORM_STYLE
+from database.connection import get_connection, transaction
+from database.search import search_products, SEARCH_DELAY_MS
+from database.catalog import add_product, add_category, get_category_tree
+from forms.table_models import KeysetTableModel, PAGE_SIZE
+from forms.thumbnails import ThumbnailLoader, ICON_SIZE
+from forms.workers import QueryRunner, get_image_thread_pool, get_job_thread_pool
+
+# Product grid columns, for search results
+PRODUCT_SEARCH_COLUMNS = """
+    p.sku_id, p.barcode, p.category, p.subcategory, p.product_name,
+    p.description, p.tax_rate, p.price, p.default_unit, p.image_path
+"""
+
+# Grid rows end with image_path; its column shows the thumbnail
+IMAGE_COLUMN = 9
+
+# Keyset pagination on (product_name, sku_id), which is unique per user and
+# follows idx_products_user_name, so no page needs OFFSET
+PRODUCTS_FIRST_PAGE_QUERY = """
+    SELECT sku_id, barcode, category, subcategory, product_name,
+           description, tax_rate, price, default_unit, image_path
+    FROM products
+    WHERE user_id = ?
+    ORDER BY product_name, sku_id
+    LIMIT ?
+"""
+PRODUCTS_PAGE_QUERY = """
+    SELECT sku_id, barcode, category, subcategory, product_name,
+           description, tax_rate, price, default_unit, image_path
+    FROM products
+    WHERE user_id = ? AND (product_name, sku_id) > (?, ?)
+    ORDER BY product_name, sku_id
+    LIMIT ?
+"""
+
+
+class ProductTableModel(KeysetTableModel):
+    def __init__(self, headers, thumbnails, parent=None):
+        super().__init__(headers, parent=parent)
+        self.thumbnails = thumbnails
+        thumbnails.loaded.connect(self.thumbnails_loaded)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and index.column() == IMAGE_COLUMN:
+            # Asked for by the view for visible rows only
+            if role == Qt.DecorationRole:
+                return self.thumbnails.pixmap(self.rows[index.row()][IMAGE_COLUMN])
+            return None
+        return super().data(index, role)
+
+    def thumbnails_loaded(self):
+        # Repaints the visible rows; rows still without a thumbnail ask again
+        if self.rows:
+            self.dataChanged.emit(self.index(0, IMAGE_COLUMN),
+                                  self.index(len(self.rows) - 1, IMAGE_COLUMN),
+                                  [Qt.DecorationRole])
 
 class ProductMasterForm(QWidget):
     # Signal to notify when a new product is added
     product_added = Signal()
+    # Percent of the file read and rows imported, from the import thread
+    import_progress = Signal(int, int)
     
     def __init__(self, current_user=None):
         super().__init__()
         self.current_user = current_user
+        self.category_tree = None
+        self.queries = QueryRunner(self)
+        # Picked images are resized and stored on their own thread
+        self.image_jobs = QueryRunner(self, get_image_thread_pool())
+        # Label sheets can take minutes; they are printed on the job thread
+        self.label_jobs = QueryRunner(self, get_job_thread_pool())
+        self.labels_cancelled = threading.Event()
+        self.import_jobs = QueryRunner(self, get_job_thread_pool())
+        self.import_cancelled = threading.Event()
+        self.import_progress_dialog = None
         self.setup_ui()
+        self.load_data()
+        self.current_image_path = None
+        self.setProperty("form", True)
+
+    def load_data(self):
+        # Everything the form shows; also called when a user logs in
         self.load_categories()
         self.load_products()
-        self.current_image_path = None
-        self.setStyleSheet(FORM_STYLE)
 
     def setup_ui(self):
         # Create main scroll area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #f0f0f0;
-                width: 10px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #c0c0c0;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-
-        # Create main widget and layout
+
+        outer_layout = QVBoxLayout(self)
+        outer_layout.addWidget(scroll)
+
+        # Create main widget and layout; containers are put in place before
+        # their contents (see styles.py)
         main_widget = QWidget()
-        layout = QVBoxLayout()
+        scroll.setWidget(main_widget)
+        layout = QVBoxLayout(main_widget)
         layout.setSpacing(20)
         
         # Product Details Section
         details_group = QGroupBox("Product Details")
-        details_layout = QVBoxLayout()
+        layout.addWidget(details_group)
+        details_layout = QVBoxLayout(details_group)
         
         # Left side - Basic details
         left_layout = QVBoxLayout()
@@ -86,20 +143,12 @@ class ProductMasterForm(QWidget):
         self.category_combo.setEditable(True)
         self.category_combo.setPlaceholderText("Select or enter category")
         self.category_combo.setMinimumHeight(30)
-        self.category_combo.setStyleSheet("""
-            QComboBox {
-                padding-right: 20px;  /* Space for the dropdown arrow */
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: url(resources/down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
+        # Subcategory choices follow the category once typing pauses
+        self.category_timer = QTimer(self)
+        self.category_timer.setSingleShot(True)
+        self.category_timer.setInterval(SEARCH_DELAY_MS)
+        self.category_timer.timeout.connect(self.update_subcategories)
+        self.category_combo.currentTextChanged.connect(self.category_timer.start)
         category_layout.addWidget(category_label)
         category_layout.addWidget(self.category_combo)
         
@@ -110,20 +159,6 @@ class ProductMasterForm(QWidget):
         self.subcategory_combo.setEditable(True)
         self.subcategory_combo.setPlaceholderText("Select or enter subcategory")
         self.subcategory_combo.setMinimumHeight(30)
-        self.subcategory_combo.setStyleSheet("""
-            QComboBox {
-                padding-right: 20px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: url(resources/down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
         subcategory_layout.addWidget(subcategory_label)
         subcategory_layout.addWidget(self.subcategory_combo)
         
@@ -181,18 +216,7 @@ class ProductMasterForm(QWidget):
         self.upload_button = QPushButton("Upload Image")
         self.upload_button.setMinimumHeight(30)
         self.upload_button.setIcon(QIcon("resources/upload.png"))
-        self.upload_button.setStyleSheet("""
-            QPushButton {
-                padding: 5px 15px;
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        self.upload_button.setObjectName("uploadButton")
         image_layout.addWidget(image_label)
         image_layout.addWidget(self.image_path_label)
         image_layout.addWidget(self.upload_button)
@@ -216,13 +240,7 @@ class ProductMasterForm(QWidget):
         self.image_label = QLabel()
         self.image_label.setFixedSize(300, 300)
         self.image_label.setAlignment(Qt.AlignCenter)
-        self.image_label.setStyleSheet("""
-            QLabel {
-                border: 2px dashed #bdc3c7;
-                border-radius: 8px;
-                background-color: white;
-            }
-        """)
+        self.image_label.setObjectName("imagePreview")
         
         # Image buttons
         image_buttons_layout = QHBoxLayout()
@@ -241,156 +259,141 @@ class ProductMasterForm(QWidget):
         # Add left and right layouts to details layout
         details_layout.addLayout(left_layout)
         details_layout.addLayout(right_layout)
-        details_group.setLayout(details_layout)
         
         # Products table
         table_group = QGroupBox("Product List")
-        table_layout = QVBoxLayout()
-        self.products_table = QTableWidget()
-        self.products_table.setColumnCount(9)
-        self.products_table.setHorizontalHeaderLabels([
+        layout.addWidget(table_group)
+        table_layout = QVBoxLayout(table_group)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.hide()
+        self.queries.busy_changed.connect(self.loading_label.setVisible)
+        table_layout.addWidget(self.loading_label)
+        # Search runs once typing pauses; an empty box lists every product
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search by name, SKU, barcode, category or description")
+        self.search_input.setMinimumHeight(30)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.load_products)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        table_layout.addWidget(self.search_input)
+        # Rows are fetched a page at a time as the view scrolls
+        self.products_model = ProductTableModel([
             "SKU ID", "Barcode", "Category", "Subcategory", "Product Name",
-            "Description", "Tax Rate", "Price", "Default Unit"
-        ])
-        self.products_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.products_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.products_table.itemDoubleClicked.connect(self.load_product)
-        self.products_table.setStyleSheet("""
-            QTableWidget {
-                border: none;
-                background-color: white;
-            }
-        """)
+            "Description", "Tax Rate", "Price", "Default Unit", "Image"
+        ], ThumbnailLoader(parent=self))
+        self.products_table = QTableView()
+        self.products_table.setModel(self.products_model)
+        # Thumbnail first, rows tall enough for it, and several rows on screen
+        self.products_table.horizontalHeader().moveSection(IMAGE_COLUMN, 0)
+        self.products_table.setIconSize(QSize(ICON_SIZE, ICON_SIZE))
+        self.products_table.verticalHeader().setDefaultSectionSize(ICON_SIZE + 12)
+        self.products_table.setMinimumHeight(8 * (ICON_SIZE + 12))
+        self.products_table.setSelectionBehavior(QTableView.SelectRows)
+        self.products_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.products_table.doubleClicked.connect(self.load_product)
         table_layout.addWidget(self.products_table)
-        table_group.setLayout(table_layout)
         
         # Action buttons
         button_layout = QHBoxLayout()
         self.save_button = QPushButton("Save Product")
         self.clear_button = QPushButton("Clear Form")
+        self.label_code_combo = QComboBox()
+        self.label_code_combo.addItem("QR Code", 'qr')
+        self.label_code_combo.addItem("Barcode", 'code128')
+        self.labels_button = QPushButton("Print Labels")
+        self.import_button = QPushButton("Import Products")
         self.save_button.setMinimumHeight(40)
         self.clear_button.setMinimumHeight(40)
+        self.labels_button.setMinimumHeight(40)
+        self.import_button.setMinimumHeight(40)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.clear_button)
-        
-        # Add all layouts to main layout
-        layout.addWidget(details_group)
-        layout.addWidget(table_group)
+        button_layout.addStretch()
+        button_layout.addWidget(self.import_button)
+        button_layout.addWidget(self.label_code_combo)
+        button_layout.addWidget(self.labels_button)
         layout.addLayout(button_layout)
-        
-        main_widget.setLayout(layout)
-        scroll.setWidget(main_widget)
-        
-        # Create outer layout for scroll area
-        outer_layout = QVBoxLayout()
-        outer_layout.addWidget(scroll)
-        self.setLayout(outer_layout)
-        
+
         # Connect signals
         self.browse_button.clicked.connect(self.upload_image)
         self.clear_image_button.clicked.connect(self.clear_image)
         self.save_button.clicked.connect(self.save_product)
         self.clear_button.clicked.connect(self.clear_form)
-
-    def get_db_connection(self):
-        db_path = os.path.join('database', 'inventory.db')
-        return sqlite3.connect(db_path)
+        self.labels_button.clicked.connect(self.print_labels)
+        self.import_button.clicked.connect(self.import_file)
+        self.import_progress.connect(self.show_import_progress)
 
     def load_categories(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        # Load categories
-        cursor.execute("SELECT DISTINCT category FROM products WHERE user_id = ?", (self.current_user['id'],))
-        categories = [row[0] for row in cursor.fetchall()]
-        self.category_combo.clear()
-        self.category_combo.addItems(categories)
         
-        # Load subcategories
-        cursor.execute("SELECT DISTINCT subcategory FROM products WHERE user_id = ? AND subcategory IS NOT NULL AND subcategory != ''", (self.current_user['id'],))
-        subcategories = [row[0] for row in cursor.fetchall()]
-        self.subcategory_combo.clear()
-        self.subcategory_combo.addItems(subcategories)
-        
-        # Connect category change signal
-        self.category_combo.currentTextChanged.connect(self.update_subcategories)
+        # Read from the database once per login, then kept in memory
+        self.queries.run('categories', get_category_tree, (self.current_user['id'],),
+                         self.show_categories, self.load_failed)
+
+    def show_categories(self, tree):
+        self.category_tree = tree
         
-        conn.close()
+        # Keep whatever is typed in the box
+        category = self.category_combo.currentText()
+        self.category_combo.clear()
+        self.category_combo.addItems(tree.categories())
+        self.category_combo.setCurrentText(category)
+        self.update_subcategories()
 
-    def update_subcategories(self, category):
-        if not self.current_user:
+    def update_subcategories(self):
+        # Subcategories used under the category typed so far, from memory
+        if self.category_tree is None:
             return
-            
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
         
-        # Load subcategories for selected category
-        cursor.execute("""
-            SELECT DISTINCT subcategory 
-            FROM products 
-            WHERE user_id = ? 
-            AND category = ? 
-            AND subcategory IS NOT NULL 
-            AND subcategory != ''
-        """, (self.current_user['id'], category))
-        
-        subcategories = [row[0] for row in cursor.fetchall()]
+        category = self.category_combo.currentText().strip()
+        subcategory = self.subcategory_combo.currentText()
         self.subcategory_combo.clear()
-        self.subcategory_combo.addItems(subcategories)
-        
-        conn.close()
+        self.subcategory_combo.addItems(self.category_tree.subcategories(category))
+        self.subcategory_combo.setCurrentText(subcategory)
 
     def load_products(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT sku_id, barcode, category, subcategory, product_name,
-                   description, tax_rate, price, default_unit
-            FROM products
-            WHERE user_id = ?
-            ORDER BY product_name
-        """, (self.current_user['id'],))
-        
-        products = cursor.fetchall()
-        self.products_table.setRowCount(len(products))
         
-        for row, product in enumerate(products):
-            for col, value in enumerate(product):
-                item = QTableWidgetItem(str(value) if value is not None else "")
-                self.products_table.setItem(row, col, item)
+        search = self.search_input.text().strip()
+        if search:
+            self.queries.run('products', search_products,
+                             (self.current_user['id'], search, PRODUCT_SEARCH_COLUMNS),
+                             self.products_model.show_rows, self.load_failed)
+            return
         
-        conn.close()
+        # The first page is read on a worker; later pages load as the view scrolls
+        self.queries.run('products', self.fetch_products_page, (None, PAGE_SIZE),
+                         self.show_products, self.load_failed)
 
-    def browse_image(self):
-        file_name, _ = QFileDialog.getOpenFileName(
-            self,
-            "Select Product Image",
-            "",
-            "Image Files (*.png *.jpg *.jpeg *.bmp)"
-        )
+    def show_products(self, products):
+        self.products_model.reload(self.fetch_products_page, first_page=products)
+
+    def load_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
+
+    def fetch_products_page(self, last_row, limit):
+        conn = get_connection()
+        cursor = conn.cursor()
         
-        if file_name:
-            self.current_image_path = file_name
-            self.image_path_label.setText(os.path.basename(file_name))
-            pixmap = QPixmap(file_name)
-            scaled_pixmap = pixmap.scaled(
-                300, 300,
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            self.image_label.setPixmap(scaled_pixmap)
+        if last_row is None:
+            cursor.execute(PRODUCTS_FIRST_PAGE_QUERY, (self.current_user['id'], limit))
+        else:
+            cursor.execute(PRODUCTS_PAGE_QUERY,
+                           (self.current_user['id'], last_row[4], last_row[0], limit))
+        
+        return cursor.fetchall()
 
     def clear_image(self):
+        if self.image_jobs.is_busy():
+            self.image_jobs.cancel('image')
+            self.save_button.setEnabled(True)
         self.current_image_path = None
         self.image_label.clear()
-        self.image_label.setStyleSheet("border: 1px solid #ccc;")
+        self.image_path_label.setText("No image selected")
 
     def clear_form(self):
         self.barcode_input.clear()
@@ -432,30 +435,22 @@ class ProductMasterForm(QWidget):
             QMessageBox.warning(self, "Error", "Tax rate and price must be valid numbers")
             return
         
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
+        self.save_button.setEnabled(False)
+        self.queries.submit(self.insert_product, (
+            self.current_user['id'], sku_id, barcode, category, subcategory, product_name,
+            description, tax_rate, price, default_unit, self.current_image_path
+        ), self.product_saved, self.save_failed)
+
+    def insert_product(self, user_id, sku_id, barcode, category, subcategory, product_name,
+                       description, tax_rate, price, default_unit, image_path):
+        # Runs on a worker thread; returns False if the SKU ID is taken
+        with transaction() as cursor:
             # Check if SKU ID already exists
-            cursor.execute("SELECT id FROM products WHERE sku_id = ? AND user_id = ?", (sku_id, self.current_user['id']))
+            cursor.execute("SELECT id FROM products WHERE sku_id = ? AND user_id = ?", (sku_id, user_id))
             if cursor.fetchone():
-                QMessageBox.warning(self, "Error", "SKU ID already exists")
-                return
-            
-            # Save image if exists
-            image_path = None
-            if self.current_image_path:
-                # Create images directory if it doesn't exist
-                os.makedirs('images', exist_ok=True)
-                
-                # Generate unique filename
-                file_ext = os.path.splitext(self.current_image_path)[1]
-                image_path = f"images/{sku_id}{file_ext}"
-                
-                # Copy image to images directory
-                import shutil
-                shutil.copy2(self.current_image_path, image_path)
+                return False
             
+            # The image, if any, was stored when it was picked (upload_image)
             # Insert new product
             cursor.execute("""
                 INSERT INTO products (
@@ -464,32 +459,43 @@ class ProductMasterForm(QWidget):
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 sku_id, barcode, category, subcategory, product_name,
-                description, tax_rate, price, default_unit, self.current_user['id'], image_path
+                description, tax_rate, price, default_unit, user_id, image_path
             ))
-            
-            conn.commit()
-            QMessageBox.information(self, "Success", "Product saved successfully")
-            self.clear_form()
-            self.load_products()
-            self.load_categories()
-            self.product_added.emit()  # Emit signal when product is added
-            
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
-        finally:
-            conn.close()
-
-    def load_product(self, item):
-        row = item.row()
-        self.sku_input.setText(self.products_table.item(row, 0).text())
-        self.barcode_input.setText(self.products_table.item(row, 1).text())
-        self.category_combo.setCurrentText(self.products_table.item(row, 2).text())
-        self.subcategory_combo.setCurrentText(self.products_table.item(row, 3).text())
-        self.name_input.setText(self.products_table.item(row, 4).text())
-        self.desc_input.setPlainText(self.products_table.item(row, 5).text())
-        self.tax_input.setText(self.products_table.item(row, 6).text())
-        self.price_input.setText(self.products_table.item(row, 7).text())
-        self.unit_input.setText(self.products_table.item(row, 8).text())
+            product_id = cursor.lastrowid
+        
+        # Committed; the pickers pick it up from the catalog on product_added
+        add_product(user_id, (product_id, sku_id, product_name, tax_rate, price, barcode))
+        add_category(user_id, category, subcategory)
+        return True
+
+    def product_saved(self, saved):
+        self.save_button.setEnabled(True)
+        if not saved:
+            QMessageBox.warning(self, "Error", "SKU ID already exists")
+            return
+        
+        QMessageBox.information(self, "Success", "Product saved successfully")
+        self.clear_form()
+        self.load_products()
+        self.show_categories(get_category_tree(self.current_user['id']))
+        self.product_added.emit()  # Emit signal when product is added
+
+    def save_failed(self, message):
+        self.save_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
+
+    def load_product(self, index):
+        product = self.products_model.row_data(index.row())
+        text = [str(value) if value is not None else "" for value in product]
+        self.sku_input.setText(text[0])
+        self.barcode_input.setText(text[1])
+        self.category_combo.setCurrentText(text[2])
+        self.subcategory_combo.setCurrentText(text[3])
+        self.name_input.setText(text[4])
+        self.desc_input.setPlainText(text[5])
+        self.tax_input.setValue(product[6])
+        self.price_input.setText(text[7])
+        self.unit_input.setText(text[8])
 
     def upload_image(self):
         file_name, _ = QFileDialog.getOpenFileName(
@@ -500,12 +506,174 @@ class ProductMasterForm(QWidget):
         )
         
         if file_name:
-            self.current_image_path = file_name
-            self.image_path_label.setText(os.path.basename(file_name))
-            pixmap = QPixmap(file_name)
-            scaled_pixmap = pixmap.scaled(
-                300, 300,
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            self.image_label.setPixmap(scaled_pixmap) 
\ No newline at end of file
+            # Imported here, not with the form: PIL is only needed once an
+            # image is picked (see startup_profile.py)
+            from database.images import ingest_image
+            
+            # Decoded, resized and stored on a worker; Save waits until it is done
+            self.current_image_path = None
+            self.image_label.clear()
+            self.image_path_label.setText(f"Processing {os.path.basename(file_name)}...")
+            self.save_button.setEnabled(False)
+            self.image_jobs.run('image', ingest_image, (file_name,),
+                                lambda result: self.show_image(file_name, result),
+                                self.image_failed)
+
+    def show_image(self, file_name, result):
+        from database.images import thumbnail_path, format_bytes, PREVIEW_SIZE
+        
+        self.save_button.setEnabled(True)
+        self.current_image_path = result['image_path']
+        if result['duplicate']:
+            stored = "already stored"
+        else:
+            stored = (f"{format_bytes(result['source_bytes'])} stored as "
+                      f"{format_bytes(result['stored_bytes'])}")
+        self.image_path_label.setText(f"{os.path.basename(file_name)} ({stored})")
+        # The preview thumbnail is already the size of the label
+        self.image_label.setPixmap(QPixmap(thumbnail_path(result['image_path'], PREVIEW_SIZE)))
+
+    def image_failed(self, message):
+        self.save_button.setEnabled(True)
+        self.image_path_label.setText("No image selected")
+        QMessageBox.warning(self, "Error", f"Could not read image: {message}")
+
+    def print_labels(self):
+        if self.label_jobs.is_busy():
+            # The button reads "Cancel Labels" while a run is going
+            self.labels_cancelled.set()
+            return
+        if not self.current_user:
+            QMessageBox.warning(self, "Error", "Please log in to print labels")
+            return
+        
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Labels",
+            "labels.pdf",
+            "PDF (*.pdf);;PNG Images (*.png)"
+        )
+        if not file_name:
+            return
+        if os.path.splitext(file_name)[1].lower() not in ('.pdf', '.png'):
+            file_name += '.pdf'
+        
+        # qrcode and PIL are imported on the first print, not with the form
+        from database.labels import generate_labels
+        
+        # A search prints labels for its results; otherwise every product
+        skus = None
+        if self.search_input.text().strip():
+            skus = [row[0] for row in self.products_model.rows]
+            if not skus:
+                QMessageBox.warning(self, "Error", "No products match the search")
+                return
+        
+        self.labels_cancelled.clear()
+        self.labels_button.setText("Cancel Labels")
+        self.label_jobs.run('labels',
+                            functools.partial(generate_labels,
+                                              cancelled=self.labels_cancelled.is_set),
+                            (self.current_user['id'], file_name,
+                             self.label_code_combo.currentData(), skus),
+                            lambda result: self.labels_printed(file_name, result),
+                            self.labels_failed)
+
+    def labels_printed(self, file_name, result):
+        self.labels_button.setText("Print Labels")
+        if result is None:
+            return  # cancelled
+        labels, sheets = result
+        QMessageBox.information(self, "Success",
+                                f"Saved {labels} labels on {sheets} sheets to "
+                                f"{os.path.basename(file_name)}")
+
+    def labels_failed(self, message):
+        self.labels_button.setText("Print Labels")
+        QMessageBox.critical(self, "Error", f"Could not print labels: {message}")
+
+    def import_file(self):
+        if not self.current_user:
+            QMessageBox.warning(self, "Error", "Please log in to import products")
+            return
+        
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import Products",
+            "",
+            "Product Files (*.csv *.jsonl *.ndjson)"
+        )
+        if not file_name:
+            return
+        
+        from database.importer import import_products
+        
+        # Read and written in batches on the job thread; the grid, pickers
+        # and categories are refreshed once, when it is done
+        self.import_cancelled.clear()
+        self.import_progress_dialog = QProgressDialog(
+            f"Importing {os.path.basename(file_name)}...", "Cancel", 0, 100, self)
+        self.import_progress_dialog.setWindowTitle("Import Products")
+        self.import_progress_dialog.setWindowModality(Qt.WindowModal)
+        self.import_progress_dialog.setMinimumDuration(0)
+        self.import_progress_dialog.setAutoClose(False)
+        self.import_progress_dialog.canceled.connect(self.import_cancelled.set)
+        self.import_progress_dialog.setValue(0)
+        self.import_button.setEnabled(False)
+        self.import_jobs.run('import',
+                             functools.partial(
+                                 import_products,
+                                 report=lambda done, total, imported: self.import_progress.emit(
+                                     done * 100 // max(total, 1), imported),
+                                 cancelled=self.import_cancelled.is_set),
+                             (self.current_user['id'], file_name),
+                             self.products_imported, self.import_failed)
+
+    def show_import_progress(self, percent, imported):
+        if self.import_progress_dialog is not None and not self.import_cancelled.is_set():
+            self.import_progress_dialog.setLabelText(f"Imported {imported} products...")
+            self.import_progress_dialog.setValue(percent)
+
+    def close_import_progress(self):
+        self.import_button.setEnabled(True)
+        if self.import_progress_dialog is not None:
+            self.import_progress_dialog.close()
+            self.import_progress_dialog.deleteLater()
+            self.import_progress_dialog = None
+
+    def reload_after_import(self):
+        # One refresh for the whole file, however many batches it took
+        self.load_products()
+        self.load_categories()
+        self.product_added.emit()
+
+    def products_imported(self, result):
+        from database.importer import MAX_REPORTED_ERRORS
+        
+        self.close_import_progress()
+        if result['imported']:
+            self.reload_after_import()
+        
+        text = (f"Imported {result['imported']} products "
+                f"({result['added']} new)")
+        if result['cancelled']:
+            text = f"Import cancelled. {text} before it stopped"
+        if not result['error_count']:
+            QMessageBox.information(self, "Import Products", text)
+            return
+        
+        # Rows with errors were skipped; the details list them by line
+        box = QMessageBox(QMessageBox.Warning, "Import Products",
+                          f"{text}. Skipped {result['error_count']} rows with errors.",
+                          QMessageBox.Ok, self)
+        details = [f"Line {line}: {message}" for line, message in result['errors']]
+        if result['error_count'] > MAX_REPORTED_ERRORS:
+            details.append(f"... and {result['error_count'] - MAX_REPORTED_ERRORS} more")
+        box.setDetailedText("\n".join(details))
+        box.exec()
+
+    def import_failed(self, message):
+        # Batches committed before the error are kept
+        self.close_import_progress()
+        self.reload_after_import()
+        QMessageBox.critical(self, "Error", f"Could not import products: {message}")
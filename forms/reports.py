@@ -0,0 +1,211 @@
+import datetime
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                             QLineEdit, QComboBox, QPushButton, QMessageBox,
+                             QTableView, QScrollArea, QGroupBox)
+from PySide6.QtCore import QTimer
+from database.rollups import get_sales_summary, get_sales_by_period, get_top_sellers
+from database.search import SEARCH_DELAY_MS
+from forms.table_models import KeysetTableModel
+from forms.workers import QueryRunner
+
+# Entries in the top products and top customers tables
+TOP_SELLERS = 20
+
+MEASURE_HEADERS = ["Sales", "Quantity", "Total Rate", "Tax Amount", "Total Amount"]
+
+
+class ReportTableModel(KeysetTableModel):
+    def format_value(self, column, value):
+        # Amounts to 2 decimal places; counts as they are
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        return super().format_value(column, value)
+
+
+def fetch_report(user_id, start, end, grain):
+    # Runs on a worker thread; every query reads sales_rollups only
+    return {
+        'summary': get_sales_summary(user_id, start, end),
+        'periods': get_sales_by_period(user_id, grain, start, end),
+        'products': get_top_sellers(user_id, 'product', start, end, TOP_SELLERS),
+        'customers': get_top_sellers(user_id, 'customer', start, end, TOP_SELLERS),
+    }
+
+
+class ReportsForm(QWidget):
+    def __init__(self, current_user=None):
+        super().__init__()
+        self.current_user = current_user
+        self.queries = QueryRunner(self)
+        self.setup_ui()
+        self.load_data()
+        self.setProperty("form", True)
+
+    def load_data(self):
+        # Everything the form shows; also called when a user logs in
+        self.load_report()
+
+    def showEvent(self, event):
+        # Sales saved on the other pages since the last look are included
+        super().showEvent(event)
+        self.load_report()
+
+    def setup_ui(self):
+        # Create main scroll area
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+
+        outer_layout = QVBoxLayout(self)
+        outer_layout.addWidget(scroll)
+
+        # Create main widget and layout; containers are put in place before
+        # their contents (see styles.py)
+        main_widget = QWidget()
+        scroll.setWidget(main_widget)
+        layout = QVBoxLayout(main_widget)
+        layout.setSpacing(20)
+
+        # Report period, this year so far to begin with
+        period_group = QGroupBox("Report Period")
+        layout.addWidget(period_group)
+        period_layout = QVBoxLayout(period_group)
+        period_layout.setSpacing(15)
+
+        today = datetime.date.today()
+        date_layout = QHBoxLayout()
+        from_date_label = QLabel("From Date:")
+        self.from_date_input = QLineEdit(today.replace(month=1, day=1).isoformat())
+        self.from_date_input.setPlaceholderText("YYYY-MM-DD")
+        self.from_date_input.setMinimumHeight(30)
+        to_date_label = QLabel("To Date:")
+        self.to_date_input = QLineEdit(today.isoformat())
+        self.to_date_input.setPlaceholderText("YYYY-MM-DD")
+        self.to_date_input.setMinimumHeight(30)
+        grain_label = QLabel("Group By:")
+        self.grain_combo = QComboBox()
+        self.grain_combo.addItem("Month", 'month')
+        self.grain_combo.addItem("Day", 'day')
+        self.grain_combo.addItem("Year", 'year')
+        self.grain_combo.setMinimumHeight(30)
+        date_layout.addWidget(from_date_label)
+        date_layout.addWidget(self.from_date_input)
+        date_layout.addWidget(to_date_label)
+        date_layout.addWidget(self.to_date_input)
+        date_layout.addWidget(grain_label)
+        date_layout.addWidget(self.grain_combo)
+
+        # Shown instead of reloading while a date cannot be read
+        self.period_status = QLabel("")
+
+        period_layout.addLayout(date_layout)
+        period_layout.addWidget(self.period_status)
+
+        # Totals for the whole period
+        summary_group = QGroupBox("Summary")
+        layout.addWidget(summary_group)
+        summary_layout = QHBoxLayout(summary_group)
+        self.summary_labels = []
+        for header in MEASURE_HEADERS:
+            label = QLabel(f"{header}: -")
+            summary_layout.addWidget(label)
+            self.summary_labels.append(label)
+
+        # Sales per day or month
+        period_table_group = QGroupBox("Sales by Period")
+        layout.addWidget(period_table_group)
+        period_table_layout = QVBoxLayout(period_table_group)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.hide()
+        self.queries.busy_changed.connect(self.loading_label.setVisible)
+        period_table_layout.addWidget(self.loading_label)
+        self.period_model = ReportTableModel(["Period"] + MEASURE_HEADERS)
+        self.period_table = self.report_table(self.period_model)
+        period_table_layout.addWidget(self.period_table)
+
+        # Best sellers side by side
+        top_layout = QHBoxLayout()
+        products_group = QGroupBox(f"Top {TOP_SELLERS} Products")
+        top_layout.addWidget(products_group)
+        products_layout = QVBoxLayout(products_group)
+        self.products_model = ReportTableModel(["Product"] + MEASURE_HEADERS)
+        self.products_table = self.report_table(self.products_model)
+        products_layout.addWidget(self.products_table)
+        customers_group = QGroupBox(f"Top {TOP_SELLERS} Customers")
+        top_layout.addWidget(customers_group)
+        customers_layout = QVBoxLayout(customers_group)
+        self.customers_model = ReportTableModel(["Customer"] + MEASURE_HEADERS)
+        self.customers_table = self.report_table(self.customers_model)
+        customers_layout.addWidget(self.customers_table)
+        layout.addLayout(top_layout)
+
+        # Action buttons
+        button_layout = QHBoxLayout()
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.setMinimumHeight(40)
+        button_layout.addWidget(self.refresh_button)
+        layout.addLayout(button_layout)
+
+        # The report follows the period as it is edited
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(SEARCH_DELAY_MS)
+        self.reload_timer.timeout.connect(self.load_report)
+        self.from_date_input.textChanged.connect(self.reload_timer.start)
+        self.to_date_input.textChanged.connect(self.reload_timer.start)
+        self.grain_combo.currentIndexChanged.connect(self.reload_timer.start)
+
+        # Connect signals
+        self.refresh_button.clicked.connect(self.load_report)
+
+    def report_table(self, model):
+        table = QTableView()
+        table.setModel(model)
+        table.setSelectionBehavior(QTableView.SelectRows)
+        table.setEditTriggers(QTableView.NoEditTriggers)
+        return table
+
+    def read_period(self):
+        # (start, end) as ISO dates; ValueError for a bad or reversed range
+        dates = []
+        for field in (self.from_date_input, self.to_date_input):
+            text = field.text().strip()
+            try:
+                dates.append(datetime.date.fromisoformat(text))
+            except ValueError:
+                raise ValueError(f"{text or 'A blank date'} is not a date (YYYY-MM-DD)") from None
+        if dates[0] > dates[1]:
+            raise ValueError("From Date is after To Date")
+        return dates[0].isoformat(), dates[1].isoformat()
+
+    def load_report(self):
+        self.reload_timer.stop()
+        if not self.current_user:
+            return
+
+        try:
+            start, end = self.read_period()
+        except ValueError as e:
+            self.period_status.setText(str(e))
+            return
+        self.period_status.setText("")
+
+        self.queries.run('report', fetch_report,
+                         (self.current_user['id'], start, end, self.grain_combo.currentData()),
+                         self.show_report, self.load_failed)
+
+    def show_report(self, report):
+        # Sales and quantity are counts; the rest are amounts, 0 when no sales
+        sales, quantity, *amounts = report['summary']
+        for label, header, value in zip(self.summary_labels, MEASURE_HEADERS,
+                                        [str(sales), str(quantity)]
+                                        + [f"{amount:.2f}" for amount in amounts]):
+            label.setText(f"{header}: {value}")
+        for model, table, rows in ((self.period_model, self.period_table, report['periods']),
+                                   (self.products_model, self.products_table, report['products']),
+                                   (self.customers_model, self.customers_table,
+                                    report['customers'])):
+            model.show_rows(rows)
+            table.resizeColumnsToContents()
+
+    def load_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
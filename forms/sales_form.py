@@ -1,65 +1,97 @@
-import sqlite3
-import os
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QComboBox, QPushButton, QMessageBox,
-                             QDoubleSpinBox, QTableWidget, QTableWidgetItem,
-                             QSpinBox, QScrollArea, QGroupBox)
-from PySide6.QtCore import Qt
-from styles import FORM_STYLE
+                             QDoubleSpinBox, QTableView, QSpinBox,
+                             QScrollArea, QGroupBox, QApplication)
+from PySide6.QtCore import Qt, QTimer
+from database.connection import get_connection, transaction
+from database.stock import get_on_hand
+from database.masters import get_or_create_customer
+from database.search import search_products, SEARCH_DELAY_MS
+from database.catalog import get_products, find_barcode, product_entries
+from forms.table_models import KeysetTableModel, RecordListModel, MAX_ROW_ID, PAGE_SIZE
+from forms.workers import QueryRunner
+
+# Sales history rows: displayed columns followed by the sale id, which is
+# the pagination key, and the product's SKU for recalling a sale
+SALES_LIST_SELECT = """
+    SELECT c.name, p.product_name, s.quantity, s.rate, s.tax_rate,
+           s.total_rate, s.tax_amount, s.total_amount, s.id, p.sku_id
+    FROM sales s
+    JOIN customers c ON c.id = s.customer_id
+    JOIN products p ON p.id = s.product_id
+"""
+
+# Keyset pagination on the sale id, newest first
+SALES_PAGE_QUERY = f"""
+    {SALES_LIST_SELECT}
+    WHERE s.user_id = ? AND s.id < ?
+    ORDER BY s.id DESC
+    LIMIT ?
+"""
+
+# Product picker columns for search results, in product_entries order
+PRODUCT_PICKER_COLUMNS = "p.id, p.sku_id, p.product_name, p.tax_rate, p.price"
+
+class SalesTableModel(KeysetTableModel):
+    def format_value(self, column, value):
+        # Format numeric values to 2 decimal places
+        if isinstance(value, (int, float)):
+            return f"{value:.2f}"
+        return super().format_value(column, value)
 
 class SalesForm(QWidget):
-    def __init__(self, product_master_form=None, current_user=None):
+    def __init__(self, current_user=None):
         super().__init__()
-        self.product_master_form = product_master_form
         self.current_user = current_user
+        self.all_products = None
+        # True while the current line came from the scanner and is not saved yet
+        self.scan_pending = False
+        # Scanned lines whose save failed, as (label, insert_sale arguments);
+        # kept until Save Sale gets them saved
+        self.unsaved_lines = []
+        self.queries = QueryRunner(self)
         self.setup_ui()
+        self.load_data()
+        self.setProperty("form", True)
+
+    def load_data(self):
+        # Everything the form shows; also called when a user logs in
         self.load_products()
         self.load_customers()
         self.load_sales_list()
-        self.setStyleSheet(FORM_STYLE)
-        
-        if product_master_form:
-            product_master_form.product_added.connect(self.load_products)
-
-    def get_db_connection(self):
-        db_path = os.path.join('database', 'inventory.db')
-        return sqlite3.connect(db_path)
 
     def setup_ui(self):
         # Create main scroll area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #f0f0f0;
-                width: 10px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #c0c0c0;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-
-        # Create main widget and layout
+
+        outer_layout = QVBoxLayout(self)
+        outer_layout.addWidget(scroll)
+
+        # Create main widget and layout; containers are put in place before
+        # their contents (see styles.py)
         main_widget = QWidget()
-        layout = QVBoxLayout()
+        scroll.setWidget(main_widget)
+        layout = QVBoxLayout(main_widget)
         layout.setSpacing(20)
         
         # Form fields
         form_group = QGroupBox("Sales Details")
-        form_layout = QVBoxLayout()
+        layout.addWidget(form_group)
+        form_layout = QVBoxLayout(form_group)
         form_layout.setSpacing(15)
         
+        # Barcode scanner input; scanners type the code and press Enter
+        scan_layout = QHBoxLayout()
+        scan_label = QLabel("Scan Barcode:")
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan or type a barcode and press Enter")
+        self.scan_input.setMinimumHeight(30)
+        self.scan_status = QLabel("")
+        scan_layout.addWidget(scan_label)
+        scan_layout.addWidget(self.scan_input)
+        scan_layout.addWidget(self.scan_status)
+        
         # Customer
         customer_layout = QHBoxLayout()
         customer_label = QLabel("Customer:")
@@ -67,46 +99,45 @@ class SalesForm(QWidget):
         self.customer_combo.setEditable(True)
         self.customer_combo.setPlaceholderText("Select or enter customer")
         self.customer_combo.setMinimumHeight(30)
-        self.customer_combo.setStyleSheet("""
-            QComboBox {
-                padding-right: 20px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: url(resources/down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
+        self.customer_combo.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.customer_combo.setMinimumContentsLength(40)
         customer_layout.addWidget(customer_label)
         customer_layout.addWidget(self.customer_combo)
         
+        # Product search; narrows the product list once typing pauses
+        search_layout = QHBoxLayout()
+        search_label = QLabel("Find Product:")
+        self.product_search_input = QLineEdit()
+        self.product_search_input.setPlaceholderText("Search by name, SKU, barcode or category")
+        self.product_search_input.setMinimumHeight(30)
+        self.product_search_timer = QTimer(self)
+        self.product_search_timer.setSingleShot(True)
+        self.product_search_timer.setInterval(SEARCH_DELAY_MS)
+        self.product_search_timer.timeout.connect(self.filter_products)
+        self.product_search_input.textChanged.connect(self.product_search_timer.start)
+        search_layout.addWidget(search_label)
+        search_layout.addWidget(self.product_search_input)
+        
         # Product
         product_layout = QHBoxLayout()
         product_label = QLabel("Product:")
         self.product_combo = QComboBox()
         self.product_combo.setPlaceholderText("Select product")
         self.product_combo.setMinimumHeight(30)
-        self.product_combo.setStyleSheet("""
-            QComboBox {
-                padding-right: 20px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: url(resources/down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
+        # Fixed width; measuring every product's label is too slow for large catalogs
+        self.product_combo.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.product_combo.setMinimumContentsLength(40)
         product_layout.addWidget(product_label)
         product_layout.addWidget(self.product_combo)
         
+        # On-hand stock for the selected product
+        stock_layout = QHBoxLayout()
+        stock_label = QLabel("On Hand:")
+        self.stock_label = QLabel("-")
+        self.stock_label.setMinimumHeight(30)
+        stock_layout.addWidget(stock_label)
+        stock_layout.addWidget(self.stock_label)
+        
         # Quantity
         quantity_layout = QHBoxLayout()
         quantity_label = QLabel("Quantity:")
@@ -161,37 +192,39 @@ class SalesForm(QWidget):
         total_amount_layout.addWidget(self.total_amount_label)
         
         # Add all layouts to form layout
+        form_layout.addLayout(scan_layout)
         form_layout.addLayout(customer_layout)
+        form_layout.addLayout(search_layout)
         form_layout.addLayout(product_layout)
+        form_layout.addLayout(stock_layout)
         form_layout.addLayout(quantity_layout)
         form_layout.addLayout(rate_layout)
         form_layout.addLayout(tax_layout)
         form_layout.addLayout(total_rate_layout)
         form_layout.addLayout(tax_amount_layout)
         form_layout.addLayout(total_amount_layout)
-        
-        form_group.setLayout(form_layout)
-        
+
         # Sales table
         table_group = QGroupBox("Sales History")
-        table_layout = QVBoxLayout()
-        self.sales_table = QTableWidget()
-        self.sales_table.setColumnCount(8)
-        self.sales_table.setHorizontalHeaderLabels([
+        layout.addWidget(table_group)
+        table_layout = QVBoxLayout(table_group)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.hide()
+        self.queries.busy_changed.connect(self.loading_label.setVisible)
+        table_layout.addWidget(self.loading_label)
+        # Newest sales first; older pages load as the view scrolls
+        self.sales_model = SalesTableModel([
             "Customer", "Product", "Quantity", "Rate", "Tax Rate",
             "Total Rate", "Tax Amount", "Total Amount"
         ])
-        self.sales_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.sales_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.sales_table.itemDoubleClicked.connect(self.load_sale)
-        self.sales_table.setStyleSheet("""
-            QTableWidget {
-                border: none;
-                background-color: white;
-            }
-        """)
+        self.sales_table = QTableView()
+        self.sales_table.setModel(self.sales_model)
+        # Column widths are measured on the first rows only
+        self.sales_table.horizontalHeader().setResizeContentsPrecision(50)
+        self.sales_table.setSelectionBehavior(QTableView.SelectRows)
+        self.sales_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.sales_table.doubleClicked.connect(self.load_sale)
         table_layout.addWidget(self.sales_table)
-        table_group.setLayout(table_layout)
         
         # Action buttons
         button_layout = QHBoxLayout()
@@ -201,59 +234,93 @@ class SalesForm(QWidget):
         self.clear_button.setMinimumHeight(40)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.clear_button)
-        
-        # Add all layouts to main layout
-        layout.addWidget(form_group)
-        layout.addWidget(table_group)
         layout.addLayout(button_layout)
-        
-        main_widget.setLayout(layout)
-        scroll.setWidget(main_widget)
-        
-        # Create outer layout for scroll area
-        outer_layout = QVBoxLayout()
-        outer_layout.addWidget(scroll)
-        self.setLayout(outer_layout)
-        
+
         # Connect signals for automatic calculations
         self.quantity_input.valueChanged.connect(self.calculate_totals)
         self.rate_input.valueChanged.connect(self.calculate_totals)
         self.tax_input.valueChanged.connect(self.calculate_totals)
         self.product_combo.currentIndexChanged.connect(self.product_changed)
+        # Searching or choosing from the list by hand ends a scanned line
+        self.product_search_input.textEdited.connect(self.picked_by_hand)
+        self.product_combo.activated.connect(self.picked_by_hand)
+        self.scan_input.returnPressed.connect(self.scan_barcode)
         self.save_button.clicked.connect(self.save_sale)
         self.clear_button.clicked.connect(self.clear_form)
 
     def load_products(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT sku_id, product_name, tax_rate, price
-            FROM products
-            WHERE user_id = ?
-            ORDER BY product_name
-        """, (self.current_user['id'],))
+        self.queries.run('products', self.fetch_products, (self.current_user['id'],),
+                         self.show_products, self.load_failed)
+
+    def fetch_products(self, user_id):
+        # Runs on a worker thread; only the first form to ask queries the database
+        return get_products(user_id)
+
+    def show_products(self, result):
+        # Kept so clearing the search box restores the full list at once
+        self.all_products = result
+        if self.product_search_input.text().strip():
+            self.filter_products()
+        else:
+            self.set_product_list(*result)
+
+    def filter_products(self):
+        if not self.current_user:
+            return
         
-        products = cursor.fetchall()
-        self.product_combo.clear()
+        search = self.product_search_input.text().strip()
+        if not search:
+            self.queries.cancel('product_search')
+            self.restore_product_list()
+            return
         
-        for product in products:
-            self.product_combo.addItem(f"{product[1]} ({product[0]})", {
-                'sku_id': product[0],
-                'tax_rate': product[2],
-                'price': product[3]
-            })
+        self.queries.run('product_search', self.fetch_product_matches,
+                         (self.current_user['id'], search),
+                         self.show_product_matches, self.load_failed)
+
+    def fetch_product_matches(self, user_id, search):
+        # Runs on a worker thread
+        return product_entries(search_products(user_id, search, PRODUCT_PICKER_COLUMNS))
+
+    def show_product_matches(self, result):
+        self.set_product_list(*result)
         
-        conn.close()
+        # Preselect the best match
+        if self.product_combo.count():
+            self.product_combo.setCurrentIndex(0)
+
+    def set_product_list(self, labels, records):
+        # One list model rather than an addItem per product, so large
+        # catalogs load without stalling the window
+        self.product_combo.blockSignals(True)
+        self.product_combo.setModel(RecordListModel(labels, records, self.product_combo))
+        self.product_combo.blockSignals(False)
+        self.product_combo.setCurrentIndex(-1)
+
+    def restore_product_list(self):
+        # Back to the full catalog after a search or a scan narrowed the list
+        if self.all_products is not None:
+            self.set_product_list(*self.all_products)
+
+    def find_product_row(self, sku_id):
+        model = self.product_combo.model()
+        if isinstance(model, RecordListModel):
+            return model.find_row('sku_id', sku_id)
+        return -1
 
     def load_customers(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
+        
+        self.queries.run('customers', self.fetch_customers, (self.current_user['id'],),
+                         self.show_customers, self.load_failed)
+
+    def fetch_customers(self, user_id):
+        # Runs on a worker thread
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -261,15 +328,26 @@ class SalesForm(QWidget):
             FROM customers
             WHERE user_id = ?
             ORDER BY name
-        """, (self.current_user['id'],))
+        """, (user_id,))
         
-        customers = [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in cursor.fetchall()]
+
+    def show_customers(self, customers):
+        # Keep a name typed while the list was reloading
+        customer = self.customer_combo.currentText()
         self.customer_combo.clear()
         self.customer_combo.addItems(customers)
-        
-        conn.close()
+        self.customer_combo.setCurrentText(customer)
+
+    def load_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
+
+    def picked_by_hand(self, *args):
+        # The next scan starts a new line instead of saving this one
+        self.scan_pending = False
 
     def product_changed(self, index):
+        self.update_stock_label()
         if index >= 0:
             product_data = self.product_combo.itemData(index)
             if product_data:
@@ -277,6 +355,13 @@ class SalesForm(QWidget):
                 self.rate_input.setValue(product_data['price'])
                 self.calculate_totals()
 
+    def update_stock_label(self):
+        product_data = self.product_combo.currentData()
+        if product_data:
+            self.stock_label.setText(str(get_on_hand(product_data['id'])))
+        else:
+            self.stock_label.setText("-")
+
     def calculate_totals(self):
         quantity = self.quantity_input.value()
         rate = self.rate_input.value()
@@ -295,57 +380,154 @@ class SalesForm(QWidget):
             QMessageBox.warning(self, "Error", "Please log in to save sales")
             return
             
+        # Scanned lines that failed to save are tried again first
+        retried = bool(self.unsaved_lines)
+        while self.unsaved_lines:
+            self.submit_scanned_line(*self.unsaved_lines.pop(0))
+        
         # Get values from form
         customer = self.customer_combo.currentText().strip()
         product_index = self.product_combo.currentIndex()
+        if product_index < 0 and retried:
+            return
         if product_index < 0:
             QMessageBox.warning(self, "Error", "Please select a product")
             return
             
         product_data = self.product_combo.itemData(product_index)
-        quantity = self.quantity_input.value()
-        rate = self.rate_input.value()
-        tax_rate = self.tax_input.value()
         
         # Validate required fields
         if not customer:
             QMessageBox.warning(self, "Error", "Please select a customer")
             return
         
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Insert new sale record
+        self.save_button.setEnabled(False)
+        self.scan_pending = False
+        self.queries.submit(self.insert_sale, self.sale_values(customer, product_data),
+                            self.sale_saved, self.save_failed)
+
+    def sale_values(self, customer, product_data):
+        # Arguments for insert_sale from the line currently on the form
+        return (
+            self.current_user['id'],
+            customer,
+            product_data['id'],
+            self.quantity_input.value(),
+            self.rate_input.value(),
+            self.tax_input.value(),
+            float(self.total_rate_label.text()),
+            float(self.tax_amount_label.text()),
+            float(self.total_amount_label.text())
+        )
+
+    def insert_sale(self, user_id, customer, product_id, quantity, rate, tax_rate,
+                    total_rate, tax_amount, total_amount):
+        # Runs on a worker thread; returns the new history row and whether
+        # the customer had to be created
+        with transaction() as cursor:
+            customer_id, customer_created = get_or_create_customer(cursor, customer, user_id)
             cursor.execute("""
                 INSERT INTO sales (
-                    customer, product_sku, quantity, rate, tax_rate,
+                    customer_id, product_id, quantity, rate, tax_rate,
                     total_rate, tax_amount, total_amount, user_id
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
-                customer,
-                product_data['sku_id'],
-                quantity,
-                rate,
-                tax_rate,
-                float(self.total_rate_label.text()),
-                float(self.tax_amount_label.text()),
-                float(self.total_amount_label.text()),
-                self.current_user['id']
+                customer_id, product_id, quantity, rate, tax_rate,
+                total_rate, tax_amount, total_amount, user_id
             ))
+            cursor.execute(f"{SALES_LIST_SELECT} WHERE s.id = ?", (cursor.lastrowid,))
+            return cursor.fetchone(), customer_created
+
+    def sale_saved(self, result):
+        sale, customer_created = result
+        self.save_button.setEnabled(True)
+        
+        # A name typed into the combo is now a customer as well
+        if customer_created:
+            self.load_customers()
+        
+        QMessageBox.information(self, "Success", "Sale saved successfully")
+        self.clear_form()
+        if sale:
+            self.sales_model.prepend_row(sale)
+
+    def save_failed(self, message):
+        self.save_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
+
+    def scan_barcode(self):
+        # Runs on the GUI thread: the lookup is a catalog dict hit or one index
+        # probe, and handling each Enter before the next keeps scans in order
+        # during a burst
+        barcode = self.scan_input.text().strip()
+        self.scan_input.clear()
+        if not barcode or not self.current_user:
+            return
+        
+        entry = find_barcode(self.current_user['id'], barcode)
+        if entry is None:
+            self.scan_status.setText(f"Unknown barcode {barcode}")
+            QApplication.beep()
+            return
+        label, record = entry
+        
+        current = self.product_combo.currentData()
+        if self.scan_pending and current:
+            # Scanning the same product again adds one to the line
+            if current['id'] == record['id']:
+                self.quantity_input.setValue(self.quantity_input.value() + 1)
+                self.scan_status.setText(f"{label} x {self.quantity_input.value()}")
+                return
             
-            conn.commit()
-            QMessageBox.information(self, "Success", "Sale saved successfully")
-            self.clear_form()
-            self.load_sales_list()
-            
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
-        finally:
-            conn.close()
+            # A different product saves the previous line first
+            customer = self.customer_combo.currentText().strip()
+            if not customer:
+                self.scan_status.setText("Select a customer before scanning the next product")
+                QApplication.beep()
+                return
+            self.submit_scanned_line(self.product_combo.currentText(),
+                                     self.sale_values(customer, current))
+        
+        self.set_product_list([label], [record])
+        self.product_combo.setCurrentIndex(0)
+        self.quantity_input.setValue(1)
+        self.scan_pending = True
+        self.scan_status.setText(label)
+
+    def submit_scanned_line(self, label, values):
+        self.queries.submit(self.insert_sale, values, self.scanned_sale_saved,
+                            lambda message: self.scanned_sale_failed(label, values, message))
+
+    def scanned_sale_saved(self, result):
+        # Lines saved while scanning keep the customer and need no confirmation
+        sale, customer_created = result
+        if customer_created:
+            self.load_customers()
+        if sale:
+            self.sales_model.prepend_row(sale)
+
+    def scanned_sale_failed(self, label, values, message):
+        # The form has moved on to the next product, so the line is kept
+        # for Save Sale to try again rather than lost
+        self.unsaved_lines.append((label, values))
+        self.show_unsaved_lines()
+        QMessageBox.critical(self, "Error", f"Database error: {message}\n\n"
+                             f"{label} was not saved; press Save Sale to try again.")
+
+    def show_unsaved_lines(self):
+        if self.unsaved_lines:
+            self.scan_status.setText(f"{len(self.unsaved_lines)} scanned line(s) not saved")
+        else:
+            self.scan_status.setText("")
 
     def clear_form(self):
+        self.scan_pending = False
+        self.show_unsaved_lines()
         self.customer_combo.setCurrentText("")
+        # Clearing an empty search box signals nothing, so the list a scan
+        # narrowed is put back here
+        self.product_search_input.clear()
+        self.restore_product_list()
         self.product_combo.setCurrentIndex(-1)
         self.quantity_input.setValue(1)
         self.rate_input.setValue(0)
@@ -357,54 +539,50 @@ class SalesForm(QWidget):
     def load_sales_list(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
         
-        # Join with products table to get product names
-        cursor.execute("""
-            SELECT s.customer, p.product_name, s.quantity, s.rate, s.tax_rate,
-                   s.total_rate, s.tax_amount, s.total_amount
-            FROM sales s
-            LEFT JOIN products p ON s.product_sku = p.sku_id AND s.user_id = p.user_id
-            WHERE s.user_id = ?
-            ORDER BY s.id DESC
-        """, (self.current_user['id'],))
-        
-        sales = cursor.fetchall()
-        self.sales_table.setRowCount(len(sales))
-        
-        for row, sale in enumerate(sales):
-            for col, value in enumerate(sale):
-                # Format numeric values to 2 decimal places
-                if isinstance(value, (int, float)):
-                    display_value = f"{value:.2f}"
-                else:
-                    display_value = str(value) if value is not None else ""
-                item = QTableWidgetItem(display_value)
-                self.sales_table.setItem(row, col, item)
-        
-        # Resize columns to content
+        # The first page is read on a worker; older pages load as the view scrolls
+        self.queries.run('sales_list', self.query_sales_page,
+                         (self.current_user['id'], MAX_ROW_ID, PAGE_SIZE),
+                         self.show_sales_list, self.load_failed)
+
+    def show_sales_list(self, sales):
+        self.sales_model.reload(self.fetch_sales_page, first_page=sales)
+        
         self.sales_table.resizeColumnsToContents()
+
+    def fetch_sales_page(self, last_row, limit):
+        before_id = last_row[8] if last_row else MAX_ROW_ID
+        return self.query_sales_page(self.current_user['id'], before_id, limit)
+
+    def query_sales_page(self, user_id, before_id, limit):
+        conn = get_connection()
+        cursor = conn.cursor()
         
-        conn.close()
+        cursor.execute(SALES_PAGE_QUERY, (user_id, before_id, limit))
+        
+        return cursor.fetchall()
 
-    def load_sale(self, item):
-        row = item.row()
-        customer = self.sales_table.item(row, 0).text()
-        product_sku = self.sales_table.item(row, 1).text()
+    def load_sale(self, index):
+        sale = self.sales_model.row_data(index.row())
+        customer = sale[0]
+        product_sku = sale[9]
         
         # Find customer in combo box
         index = self.customer_combo.findText(customer)
         if index >= 0:
             self.customer_combo.setCurrentIndex(index)
         
-        # Find product in combo box
-        for i in range(self.product_combo.count()):
-            if self.product_combo.itemData(i)['sku_id'] == product_sku:
-                self.product_combo.setCurrentIndex(i)
-                break
-        
-        self.quantity_input.setValue(int(self.sales_table.item(row, 2).text()))
-        self.rate_input.setValue(float(self.sales_table.item(row, 3).text()))
-        self.tax_input.setValue(float(self.sales_table.item(row, 4).text())) 
\ No newline at end of file
+        # Find product in combo box; the list may be narrowed by a search
+        # or a scan, in which case go back to the full list
+        self.scan_pending = False
+        row = self.find_product_row(product_sku)
+        if row < 0 and self.all_products is not None:
+            self.product_search_input.clear()
+            self.restore_product_list()
+            row = self.find_product_row(product_sku)
+        if row >= 0:
+            self.product_combo.setCurrentIndex(row)
+        
+        self.quantity_input.setValue(int(sale[2]))
+        self.rate_input.setValue(float(sale[3]))
+        self.tax_input.setValue(float(sale[4]))
@@ -1,53 +1,113 @@
-import sqlite3
+import datetime
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QComboBox, QPushButton, QMessageBox,
-                             QTableWidget, QTableWidgetItem, QScrollArea,
-                             QGroupBox)
-from PySide6.QtCore import Qt
-from styles import FORM_STYLE
+                             QTableView, QScrollArea, QGroupBox)
+from PySide6.QtCore import QTimer
+from database.connection import get_connection
+from database.catalog import get_products
+from database.search import SEARCH_DELAY_MS
+from forms.sales_form import SalesTableModel
+from forms.table_models import RecordListModel, PAGE_SIZE
+from forms.workers import QueryRunner
+
+# Displayed columns followed by the sale id; the date and the id are the
+# pagination key. {index} is filled in by history_filters.
+HISTORY_SELECT = """
+    SELECT s.created_at, c.name, p.product_name, s.quantity, s.rate,
+           s.tax_rate, s.tax_amount, s.total_amount, s.id
+    FROM sales s INDEXED BY {index}
+    JOIN customers c ON c.id = s.customer_id
+    JOIN products p ON p.id = s.product_id
+"""
+
+
+def history_filters(user_id, start=None, end=None, customer_id=None, product_id=None):
+    """Index, WHERE clause and parameters for the sales history filters.
+
+    ``start`` and ``end`` are ISO dates, both included. Every combination
+    is served by an index that returns rows newest first:
+    idx_sales_user_customer or idx_sales_user_product when a customer or
+    product is picked, idx_sales_user_created otherwise. The index is
+    named in the query because without statistics SQLite would rather
+    scan a whole date range than one customer's sales in it.
+    """
+    if customer_id is not None:
+        index = 'idx_sales_user_customer'
+    elif product_id is not None:
+        index = 'idx_sales_user_product'
+    else:
+        index = 'idx_sales_user_created'
+    conditions, params = ["s.user_id = ?"], [user_id]
+    if customer_id is not None:
+        conditions.append("s.customer_id = ?")
+        params.append(customer_id)
+    if product_id is not None:
+        conditions.append("s.product_id = ?")
+        params.append(product_id)
+    if start:
+        conditions.append("s.created_at >= ?")
+        params.append(start)
+    if end:
+        conditions.append("s.created_at < date(?, '+1 day')")
+        params.append(end)
+    return index, " AND ".join(conditions), params
+
+
+def query_history_page(user_id, filters, last_row, limit):
+    """Up to ``limit`` sales matching ``filters`` that come after ``last_row``."""
+    index, where, params = history_filters(user_id, **filters)
+
+    # Keyset pagination on (date, id), newest first
+    if last_row is not None:
+        where += " AND (s.created_at, s.id) < (?, ?)"
+        params += [last_row[0], last_row[8]]
+
+    cursor = get_connection().cursor()
+    cursor.execute(f"""
+        {HISTORY_SELECT.format(index=index)}
+        WHERE {where}
+        ORDER BY s.created_at DESC, s.id DESC
+        LIMIT ?
+    """, params + [limit])
+    return cursor.fetchall()
+
 
 class SalesHistoryForm(QWidget):
-    def __init__(self):
+    def __init__(self, current_user=None):
         super().__init__()
+        self.current_user = current_user
+        self.queries = QueryRunner(self)
         self.setup_ui()
+        self.load_data()
+        self.setProperty("form", True)
+
+    def load_data(self):
+        # Everything the form shows; also called when a user logs in
+        self.load_products()
+        self.load_customers()
         self.load_sales_history()
-        self.setStyleSheet(FORM_STYLE)
 
     def setup_ui(self):
         # Create main scroll area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #f0f0f0;
-                width: 10px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #c0c0c0;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-
-        # Create main widget and layout
+
+        outer_layout = QVBoxLayout(self)
+        outer_layout.addWidget(scroll)
+
+        # Create main widget and layout; containers are put in place before
+        # their contents (see styles.py)
         main_widget = QWidget()
-        layout = QVBoxLayout()
+        scroll.setWidget(main_widget)
+        layout = QVBoxLayout(main_widget)
         layout.setSpacing(20)
-        
+
         # Search filters
         filter_group = QGroupBox("Search Filters")
-        filter_layout = QVBoxLayout()
+        layout.addWidget(filter_group)
+        filter_layout = QVBoxLayout(filter_group)
         filter_layout.setSpacing(15)
-        
+
         # Date range
         date_layout = QHBoxLayout()
         from_date_label = QLabel("From Date:")
@@ -62,79 +122,60 @@ class SalesHistoryForm(QWidget):
         date_layout.addWidget(self.from_date_input)
         date_layout.addWidget(to_date_label)
         date_layout.addWidget(self.to_date_input)
-        
+
         # Product filter
         product_layout = QHBoxLayout()
         product_label = QLabel("Product:")
         self.product_combo = QComboBox()
         self.product_combo.setPlaceholderText("Select product")
         self.product_combo.setMinimumHeight(30)
-        self.product_combo.setStyleSheet("""
-            QComboBox {
-                padding-right: 20px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: url(resources/down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
+        # Fixed width; measuring every product's label is too slow for large catalogs
+        self.product_combo.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.product_combo.setMinimumContentsLength(40)
         product_layout.addWidget(product_label)
         product_layout.addWidget(self.product_combo)
-        
+
         # Customer filter
         customer_layout = QHBoxLayout()
         customer_label = QLabel("Customer:")
         self.customer_combo = QComboBox()
         self.customer_combo.setPlaceholderText("Select customer")
         self.customer_combo.setMinimumHeight(30)
-        self.customer_combo.setStyleSheet("""
-            QComboBox {
-                padding-right: 20px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox::down-arrow {
-                image: url(resources/down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }
-        """)
+        self.customer_combo.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.customer_combo.setMinimumContentsLength(40)
         customer_layout.addWidget(customer_label)
         customer_layout.addWidget(self.customer_combo)
-        
+
+        # Shown instead of searching while a date cannot be read
+        self.filter_status = QLabel("")
+
         # Add layouts to filter group
         filter_layout.addLayout(date_layout)
         filter_layout.addLayout(product_layout)
         filter_layout.addLayout(customer_layout)
-        filter_group.setLayout(filter_layout)
-        
+        filter_layout.addWidget(self.filter_status)
+
         # Sales history table
         table_group = QGroupBox("Sales History")
-        table_layout = QVBoxLayout()
-        self.sales_table = QTableWidget()
-        self.sales_table.setColumnCount(8)
-        self.sales_table.setHorizontalHeaderLabels([
+        layout.addWidget(table_group)
+        table_layout = QVBoxLayout(table_group)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.hide()
+        self.queries.busy_changed.connect(self.loading_label.setVisible)
+        table_layout.addWidget(self.loading_label)
+        # Newest sales first; older pages load as the view scrolls
+        self.history_model = SalesTableModel([
             "Date", "Customer", "Product", "Quantity", "Rate",
             "Tax Rate", "Tax Amount", "Total Amount"
         ])
-        self.sales_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.sales_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.sales_table.setStyleSheet("""
-            QTableWidget {
-                border: none;
-                background-color: white;
-            }
-        """)
+        self.sales_table = QTableView()
+        self.sales_table.setModel(self.history_model)
+        # Column widths are measured on the first rows only
+        self.sales_table.horizontalHeader().setResizeContentsPrecision(50)
+        self.sales_table.setSelectionBehavior(QTableView.SelectRows)
+        self.sales_table.setEditTriggers(QTableView.NoEditTriggers)
         table_layout.addWidget(self.sales_table)
-        table_group.setLayout(table_layout)
-        
+
         # Action buttons
         button_layout = QHBoxLayout()
         self.search_button = QPushButton("Search")
@@ -143,40 +184,128 @@ class SalesHistoryForm(QWidget):
         self.clear_button.setMinimumHeight(40)
         button_layout.addWidget(self.search_button)
         button_layout.addWidget(self.clear_button)
-        
-        # Add all layouts to main layout
-        layout.addWidget(filter_group)
-        layout.addWidget(table_group)
         layout.addLayout(button_layout)
-        
-        main_widget.setLayout(layout)
-        scroll.setWidget(main_widget)
-        
-        # Create outer layout for scroll area
-        outer_layout = QVBoxLayout()
-        outer_layout.addWidget(scroll)
-        self.setLayout(outer_layout)
-        
+
+        # Filters apply once typing pauses; a new search cancels the one
+        # still running
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search_sales)
+        self.from_date_input.textChanged.connect(self.search_timer.start)
+        self.to_date_input.textChanged.connect(self.search_timer.start)
+        self.product_combo.currentIndexChanged.connect(self.search_timer.start)
+        self.customer_combo.currentIndexChanged.connect(self.search_timer.start)
+
         # Connect signals
         self.search_button.clicked.connect(self.search_sales)
         self.clear_button.clicked.connect(self.clear_filters)
 
+    def load_products(self):
+        if not self.current_user:
+            return
+
+        self.queries.run('products', self.fetch_products, (self.current_user['id'],),
+                         self.show_products, self.load_failed)
+
+    def fetch_products(self, user_id):
+        # Runs on a worker thread; shares the catalog with the other forms
+        return get_products(user_id)
+
+    def show_products(self, result):
+        self.set_filter_list(self.product_combo, *result)
+
+    def load_customers(self):
+        if not self.current_user:
+            return
+
+        self.queries.run('customers', self.fetch_customers, (self.current_user['id'],),
+                         self.show_customers, self.load_failed)
+
+    def fetch_customers(self, user_id):
+        # Runs on a worker thread
+        cursor = get_connection().cursor()
+        cursor.execute("""
+            SELECT id, name
+            FROM customers
+            WHERE user_id = ?
+            ORDER BY name
+        """, (user_id,))
+
+        rows = cursor.fetchall()
+        return [row[1] for row in rows], [{'id': row[0], 'name': row[1]} for row in rows]
+
+    def show_customers(self, result):
+        self.set_filter_list(self.customer_combo, *result)
+
+    def set_filter_list(self, combo, labels, records):
+        # Keeps the selection across reloads without searching again
+        selected = combo.currentData()
+        combo.blockSignals(True)
+        model = RecordListModel(labels, records, combo)
+        combo.setModel(model)
+        combo.setCurrentIndex(model.find_row('id', selected['id']) if selected else -1)
+        combo.blockSignals(False)
+
+    def read_filters(self):
+        # Keyword arguments for history_filters; ValueError for a bad date
+        filters = {}
+        for key, field in (('start', self.from_date_input), ('end', self.to_date_input)):
+            text = field.text().strip()
+            if text:
+                try:
+                    filters[key] = datetime.date.fromisoformat(text).isoformat()
+                except ValueError:
+                    raise ValueError(f"{text} is not a date (YYYY-MM-DD)") from None
+        for key, combo in (('customer_id', self.customer_combo),
+                           ('product_id', self.product_combo)):
+            record = combo.currentData()
+            if record:
+                filters[key] = record['id']
+        return filters
+
     def load_sales_history(self):
-        # Implementation of load_sales_history method
-        pass
+        self.search_sales()
 
     def search_sales(self):
-        # Implementation of search_sales method
-        pass
+        self.search_timer.stop()
+        if not self.current_user:
+            return
 
-    def clear_filters(self):
-        # Implementation of clear_filters method
-        pass
+        try:
+            filters = self.read_filters()
+        except ValueError as e:
+            self.filter_status.setText(str(e))
+            return
+        self.filter_status.setText("")
 
-    def search_sales(self):
-        # Implementation of search_sales method
-        pass
+        # The first page is read on a worker; older pages load as the view scrolls
+        self.queries.run('history', query_history_page,
+                         (self.current_user['id'], filters, None, PAGE_SIZE),
+                         lambda rows: self.show_sales_history(filters, rows),
+                         self.load_failed)
+
+    def show_sales_history(self, filters, rows):
+        user_id = self.current_user['id']
+        self.history_model.reload(
+            lambda last_row, limit: query_history_page(user_id, filters, last_row, limit),
+            first_page=rows
+        )
+
+        self.sales_table.resizeColumnsToContents()
 
     def clear_filters(self):
-        # Implementation of clear_filters method
-        pass 
\ No newline at end of file
+        for widget in (self.from_date_input, self.to_date_input,
+                       self.product_combo, self.customer_combo):
+            widget.blockSignals(True)
+        self.from_date_input.clear()
+        self.to_date_input.clear()
+        self.product_combo.setCurrentIndex(-1)
+        self.customer_combo.setCurrentIndex(-1)
+        for widget in (self.from_date_input, self.to_date_input,
+                       self.product_combo, self.customer_combo):
+            widget.blockSignals(False)
+        self.search_sales()
+
+    def load_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
@@ -1,8 +1,8 @@
 import sqlite3
-import os
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QMessageBox)
 from PySide6.QtCore import Qt
+from database.connection import get_connection, transaction
 
 class SignupWindow(QWidget):
     def __init__(self, login_window):
@@ -10,10 +10,6 @@ class SignupWindow(QWidget):
         self.login_window = login_window
         self.setup_ui()
 
-    def get_db_connection(self):
-        db_path = os.path.join('database', 'inventory.db')
-        return sqlite3.connect(db_path)
-
     def setup_ui(self):
         layout = QVBoxLayout()
         
@@ -103,7 +99,7 @@ class SignupWindow(QWidget):
             return
         
         try:
-            conn = self.get_db_connection()
+            conn = get_connection()
             cursor = conn.cursor()
             
             # Check if username or email already exists
@@ -113,12 +109,12 @@ class SignupWindow(QWidget):
                 return
             
             # Insert new user
-            cursor.execute('''
-                INSERT INTO users (username, password, email, name)
-                VALUES (?, ?, ?, ?)
-            ''', (username, password, email, name))
+            with transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO users (username, password, email, name)
+                    VALUES (?, ?, ?, ?)
+                ''', (username, password, email, name))
             
-            conn.commit()
             QMessageBox.information(self, "Success", "Account created successfully. Please log in.")
             self.close()
             self.login_window.show()
@@ -131,9 +127,6 @@ class SignupWindow(QWidget):
                 QMessageBox.critical(self, "Error", f"Database error: {error_msg}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Unexpected error: {str(e)}")
-        finally:
-            if 'conn' in locals():
-                conn.close()
 
     def cancel(self):
         self.close()
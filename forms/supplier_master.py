@@ -1,9 +1,26 @@
-import os
-import sqlite3
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QMessageBox,
-                             QTableWidget, QTableWidgetItem, QScrollArea, QGroupBox)
+                             QTableView, QScrollArea, QGroupBox)
 from PySide6.QtCore import Qt, Signal
+from database.connection import get_connection, transaction
+from forms.table_models import KeysetTableModel, PAGE_SIZE
+from forms.workers import QueryRunner
+
+# Keyset pagination on (name, id), following idx_suppliers_user_name
+SUPPLIERS_FIRST_PAGE_QUERY = """
+    SELECT name, contact_person, phone, email, address, id
+    FROM suppliers
+    WHERE user_id = ?
+    ORDER BY name, id
+    LIMIT ?
+"""
+SUPPLIERS_PAGE_QUERY = """
+    SELECT name, contact_person, phone, email, address, id
+    FROM suppliers
+    WHERE user_id = ? AND (name, id) > (?, ?)
+    ORDER BY name, id
+    LIMIT ?
+"""
 
 class SupplierMasterForm(QWidget):
     supplier_added = Signal()  # Signal to notify when a supplier is added
@@ -11,46 +28,33 @@ class SupplierMasterForm(QWidget):
     def __init__(self, current_user=None):
         super().__init__()
         self.current_user = current_user
+        self.queries = QueryRunner(self)
         self.setup_ui()
-        self.load_suppliers()
+        self.load_data()
         
-    def get_db_connection(self):
-        db_path = os.path.join('database', 'inventory.db')
-        return sqlite3.connect(db_path)
+    def load_data(self):
+        # Everything the form shows; also called when a user logs in
+        self.load_suppliers()
 
     def setup_ui(self):
         # Create main scroll area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #f0f0f0;
-                width: 10px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #c0c0c0;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-
-        # Create main widget and layout
+
+        outer_layout = QVBoxLayout(self)
+        outer_layout.addWidget(scroll)
+
+        # Create main widget and layout; containers are put in place before
+        # their contents (see styles.py)
         main_widget = QWidget()
-        layout = QVBoxLayout()
+        scroll.setWidget(main_widget)
+        layout = QVBoxLayout(main_widget)
         layout.setSpacing(20)
         
         # Form fields
         form_group = QGroupBox("Supplier Details")
-        form_layout = QVBoxLayout()
+        layout.addWidget(form_group)
+        form_layout = QVBoxLayout(form_group)
         form_layout.setSpacing(15)
         
         # Name
@@ -104,28 +108,25 @@ class SupplierMasterForm(QWidget):
         form_layout.addLayout(phone_layout)
         form_layout.addLayout(email_layout)
         form_layout.addLayout(address_layout)
-        
-        form_group.setLayout(form_layout)
-        
+
         # Suppliers table
         table_group = QGroupBox("Supplier List")
-        table_layout = QVBoxLayout()
-        self.suppliers_table = QTableWidget()
-        self.suppliers_table.setColumnCount(5)
-        self.suppliers_table.setHorizontalHeaderLabels([
+        layout.addWidget(table_group)
+        table_layout = QVBoxLayout(table_group)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.hide()
+        self.queries.busy_changed.connect(self.loading_label.setVisible)
+        table_layout.addWidget(self.loading_label)
+        # Rows are fetched a page at a time as the view scrolls
+        self.suppliers_model = KeysetTableModel([
             "Name", "Contact Person", "Phone", "Email", "Address"
         ])
-        self.suppliers_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.suppliers_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.suppliers_table.itemDoubleClicked.connect(self.load_supplier)
-        self.suppliers_table.setStyleSheet("""
-            QTableWidget {
-                border: none;
-                background-color: white;
-            }
-        """)
+        self.suppliers_table = QTableView()
+        self.suppliers_table.setModel(self.suppliers_model)
+        self.suppliers_table.setSelectionBehavior(QTableView.SelectRows)
+        self.suppliers_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.suppliers_table.doubleClicked.connect(self.load_supplier)
         table_layout.addWidget(self.suppliers_table)
-        table_group.setLayout(table_layout)
         
         # Action buttons
         button_layout = QHBoxLayout()
@@ -135,20 +136,8 @@ class SupplierMasterForm(QWidget):
         self.clear_button.setMinimumHeight(40)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.clear_button)
-        
-        # Add all layouts to main layout
-        layout.addWidget(form_group)
-        layout.addWidget(table_group)
         layout.addLayout(button_layout)
-        
-        main_widget.setLayout(layout)
-        scroll.setWidget(main_widget)
-        
-        # Create outer layout for scroll area
-        outer_layout = QVBoxLayout()
-        outer_layout.addWidget(scroll)
-        self.setLayout(outer_layout)
-        
+
         # Connect signals
         self.save_button.clicked.connect(self.save_supplier)
         self.clear_button.clicked.connect(self.clear_form)
@@ -156,26 +145,28 @@ class SupplierMasterForm(QWidget):
     def load_suppliers(self):
         if not self.current_user:
             return
-            
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT name, contact_person, phone, email, address
-            FROM suppliers
-            WHERE user_id = ?
-            ORDER BY name
-        """, (self.current_user['id'],))
         
-        suppliers = cursor.fetchall()
-        self.suppliers_table.setRowCount(len(suppliers))
+        # The first page is read on a worker; later pages load as the view scrolls
+        self.queries.run('suppliers', self.fetch_suppliers_page, (None, PAGE_SIZE),
+                         self.show_suppliers, self.load_failed)
+
+    def fetch_suppliers_page(self, last_row, limit):
+        conn = get_connection()
+        cursor = conn.cursor()
         
-        for row, supplier in enumerate(suppliers):
-            for col, value in enumerate(supplier):
-                item = QTableWidgetItem(str(value) if value is not None else "")
-                self.suppliers_table.setItem(row, col, item)
+        if last_row is None:
+            cursor.execute(SUPPLIERS_FIRST_PAGE_QUERY, (self.current_user['id'], limit))
+        else:
+            cursor.execute(SUPPLIERS_PAGE_QUERY,
+                           (self.current_user['id'], last_row[0], last_row[5], limit))
         
-        conn.close()
+        return cursor.fetchall()
+
+    def show_suppliers(self, suppliers):
+        self.suppliers_model.reload(self.fetch_suppliers_page, first_page=suppliers)
+
+    def load_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
 
     def save_supplier(self):
         if not self.current_user:
@@ -194,33 +185,43 @@ class SupplierMasterForm(QWidget):
             QMessageBox.warning(self, "Error", "Please enter supplier name")
             return
         
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
+        self.save_button.setEnabled(False)
+        self.queries.submit(
+            self.insert_supplier,
+            (self.current_user['id'], name, contact, phone, email, address),
+            self.supplier_saved, self.save_failed
+        )
+
+    def insert_supplier(self, user_id, name, contact, phone, email, address):
+        # Runs on a worker thread; returns False if the name is taken
+        with transaction() as cursor:
             # Check if supplier name already exists
-            cursor.execute("SELECT id FROM suppliers WHERE name = ? AND user_id = ?", (name, self.current_user['id']))
+            cursor.execute("SELECT id FROM suppliers WHERE name = ? AND user_id = ?", (name, user_id))
             if cursor.fetchone():
-                QMessageBox.warning(self, "Error", "Supplier name already exists")
-                return
+                return False
             
             # Insert new supplier
             cursor.execute("""
                 INSERT INTO suppliers (
                     name, contact_person, phone, email, address, user_id
                 ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (name, contact, phone, email, address, self.current_user['id']))
-            
-            conn.commit()
-            QMessageBox.information(self, "Success", "Supplier saved successfully")
-            self.clear_form()
-            self.load_suppliers()
-            self.supplier_added.emit()  # Emit signal when supplier is added
-            
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
-        finally:
-            conn.close()
+            """, (name, contact, phone, email, address, user_id))
+        return True
+
+    def supplier_saved(self, saved):
+        self.save_button.setEnabled(True)
+        if not saved:
+            QMessageBox.warning(self, "Error", "Supplier name already exists")
+            return
+        
+        QMessageBox.information(self, "Success", "Supplier saved successfully")
+        self.clear_form()
+        self.load_suppliers()
+        self.supplier_added.emit()  # Emit signal when supplier is added
+
+    def save_failed(self, message):
+        self.save_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Database error: {message}")
 
     def clear_form(self):
         self.name_input.clear()
@@ -229,10 +230,11 @@ class SupplierMasterForm(QWidget):
         self.email_input.clear()
         self.address_input.clear()
 
-    def load_supplier(self, item):
-        row = item.row()
-        self.name_input.setText(self.suppliers_table.item(row, 0).text())
-        self.contact_input.setText(self.suppliers_table.item(row, 1).text())
-        self.phone_input.setText(self.suppliers_table.item(row, 2).text())
-        self.email_input.setText(self.suppliers_table.item(row, 3).text())
-        self.address_input.setText(self.suppliers_table.item(row, 4).text()) 
\ No newline at end of file
+    def load_supplier(self, index):
+        supplier = self.suppliers_model.row_data(index.row())
+        text = [str(value) if value is not None else "" for value in supplier]
+        self.name_input.setText(text[0])
+        self.contact_input.setText(text[1])
+        self.phone_input.setText(text[2])
+        self.email_input.setText(text[3])
+        self.address_input.setText(text[4])
@@ -0,0 +1,153 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex
+
+# Rows fetched per page; Qt asks for the next page as the view scrolls
+PAGE_SIZE = 200
+
+# Largest SQLite rowid; "id < MAX_ROW_ID" selects the newest-first first page
+MAX_ROW_ID = 2 ** 63 - 1
+
+
+class KeysetTableModel(QAbstractTableModel):
+    """Read-only table model that loads its rows one page at a time.
+
+    ``fetch_page(last_row, limit)`` must return up to ``limit`` rows that
+    come after ``last_row`` in display order (``last_row`` is None for the
+    first page). Implementations use keyset pagination, i.e.
+    ``WHERE (sort_col, unique_col) > (?, ?) ... LIMIT ?``, so every page
+    costs the same no matter how far down the list it is.
+
+    Rows may carry extra trailing values, such as the row id used as the
+    pagination key, beyond the columns named in ``headers``; only the
+    named columns are displayed.
+    """
+
+    def __init__(self, headers, fetch_page=None, page_size=PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.rows = []
+        self.exhausted = fetch_page is None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        value = self.rows[index.row()][index.column()]
+        return self.format_value(index.column(), value)
+
+    def format_value(self, column, value):
+        return str(value) if value is not None else ""
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        last_row = self.rows[-1] if self.rows else None
+        self.append_page(self.fetch_page(last_row, self.page_size))
+
+    def append_page(self, page):
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if not page:
+            return
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def reload(self, fetch_page=None, first_page=None):
+        """Drop everything loaded so far and show the first page again.
+
+        Pass ``first_page`` when it was already fetched, e.g. on a worker
+        thread; otherwise it is fetched here.
+        """
+        self.beginResetModel()
+        if fetch_page is not None:
+            self.fetch_page = fetch_page
+        self.rows = []
+        self.exhausted = self.fetch_page is None
+        self.endResetModel()
+        if first_page is None:
+            self.fetchMore()
+        else:
+            self.append_page(first_page)
+
+    def show_rows(self, rows):
+        """Show ``rows`` as the complete contents, e.g. search results.
+
+        Paging stops until the next ``reload()``.
+        """
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.exhausted = True
+        self.endResetModel()
+
+    def prepend_row(self, row):
+        """Show a newly saved record at the top without reloading."""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.rows.insert(0, row)
+        self.endInsertRows()
+
+    def row_data(self, row):
+        return self.rows[row]
+
+
+class RecordListModel(QAbstractListModel):
+    """Read-only list model for combo boxes with many entries.
+
+    Shows ``labels[row]`` and returns ``records[row]`` as the item data, so
+    ``QComboBox.itemData``/``currentData`` work as with ``addItem``, but
+    nothing is created per entry when the list is loaded. ``find_row``
+    replaces ``findData`` for dict records.
+    """
+
+    def __init__(self, labels, records, parent=None):
+        super().__init__(parent)
+        self.labels = labels
+        self.records = records
+        self.rows_by_key = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.labels)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.labels[index.row()]
+        if role == Qt.UserRole:
+            return self.records[index.row()]
+        return None
+
+    def find_row(self, key, value):
+        """Row of the record whose ``key`` field equals ``value``, or -1.
+
+        The lookup table for ``key`` is built on first use and kept; the
+        lists are never changed in place, so it stays valid.
+        """
+        rows = self.rows_by_key.get(key)
+        if rows is None:
+            rows = {record[key]: row for row, record in enumerate(self.records)}
+            self.rows_by_key[key] = rows
+        return rows.get(value, -1)
@@ -0,0 +1,90 @@
+import os
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+from PySide6.QtGui import QImage, QPixmap, QPixmapCache
+from forms.workers import QueryRunner, get_image_thread_pool
+
+# Memory for thumbnails in grids, in KB. QPixmapCache is shared by the
+# whole application and drops the least recently used pixmaps past it.
+THUMBNAIL_CACHE_KB = int(os.environ.get('INVENTORY_THUMBNAIL_CACHE_KB', 10 * 1024))
+
+# Side of the thumbnails shown in grids, in pixels
+ICON_SIZE = 48
+
+# Thumbnails read per job on the image thread
+THUMBNAIL_BATCH = 16
+
+
+def load_thumbnails(image_paths, size):
+    # Runs on the image thread, so QImage; QPixmap is GUI-thread only.
+    # database.images (and PIL) is imported here, off the page's startup path
+    from database.images import grid_thumbnail
+    thumbnails = []
+    for image_path in image_paths:
+        path = grid_thumbnail(image_path)
+        image = QImage(path) if path else QImage()
+        if not image.isNull():
+            image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        thumbnails.append((image_path, image))
+    return thumbnails
+
+
+class ThumbnailLoader(QObject):
+    """Product image thumbnails for item views, read off the GUI thread.
+
+    ``pixmap(image_path)`` returns the thumbnail if it is in memory, and
+    otherwise queues it and returns None. ``loaded`` is emitted as queued
+    thumbnails arrive; the view then repaints and asks again for the ones
+    still on screen. Each job takes only the most recently asked-for paths
+    and forgets the rest, so scrolling past thousands of rows reads just
+    the thumbnails of rows that stay visible.
+    """
+
+    loaded = Signal()
+
+    def __init__(self, size=ICON_SIZE, parent=None):
+        super().__init__(parent)
+        QPixmapCache.setCacheLimit(THUMBNAIL_CACHE_KB)
+        self.size = size
+        self.wanted = {}     # image paths asked for, oldest first
+        self.missing = set()  # unreadable or deleted images, not asked for again
+        self.jobs = QueryRunner(self, get_image_thread_pool())
+        # Collects everything one paint asks for into one job
+        self.load_timer = QTimer(self)
+        self.load_timer.setSingleShot(True)
+        self.load_timer.setInterval(0)
+        self.load_timer.timeout.connect(self.load_next)
+
+    def cache_key(self, image_path):
+        return f"thumbnail:{self.size}:{image_path}"
+
+    def pixmap(self, image_path):
+        if not image_path or image_path in self.missing:
+            return None
+        pixmap = QPixmapCache.find(self.cache_key(image_path))
+        if pixmap is not None:
+            return pixmap
+        self.wanted.pop(image_path, None)
+        self.wanted[image_path] = True
+        if not self.jobs.is_busy():
+            self.load_timer.start()
+        return None
+
+    def load_next(self):
+        batch = [image_path for image_path in self.wanted
+                 if QPixmapCache.find(self.cache_key(image_path)) is None]
+        self.wanted.clear()
+        if not batch:
+            return
+        batch = batch[-THUMBNAIL_BATCH:]
+        self.jobs.run('thumbnails', load_thumbnails, (batch, self.size),
+                      self.show_thumbnails)
+
+    def show_thumbnails(self, thumbnails):
+        for image_path, image in thumbnails:
+            if image.isNull():
+                self.missing.add(image_path)
+            else:
+                QPixmapCache.insert(self.cache_key(image_path), QPixmap.fromImage(image))
+        self.loaded.emit()
+        # Paths asked for while this job ran; the repaint adds any others
+        self.load_next()
@@ -0,0 +1,208 @@
+import sqlite3
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, Signal, Slot
+from database.connection import get_connection
+
+# Worker threads for database calls. Threads never expire, so each keeps
+# its pooled connection warm for the life of the application. Rows are
+# converted to Python objects under the GIL, so a second thread mostly
+# competes with the GUI thread rather than finishing loads sooner.
+DB_THREAD_COUNT = 1
+
+# Image decoding and encoding (database/images.py) gets its own thread, so
+# a large photo never holds up the database thread. Pillow releases the GIL
+# while it works.
+IMAGE_THREAD_COUNT = 1
+
+# Long jobs (printing label sheets) get a thread of their own, so they
+# hold up neither queries nor images while they run
+JOB_THREAD_COUNT = 1
+
+_thread_pool = None
+_image_thread_pool = None
+_job_thread_pool = None
+
+
+def get_thread_pool():
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setMaxThreadCount(DB_THREAD_COUNT)
+        _thread_pool.setExpiryTimeout(-1)
+    return _thread_pool
+
+
+def get_image_thread_pool():
+    global _image_thread_pool
+    if _image_thread_pool is None:
+        _image_thread_pool = QThreadPool()
+        _image_thread_pool.setMaxThreadCount(IMAGE_THREAD_COUNT)
+        # QueryWorker opens a pooled connection on every thread it runs on
+        _image_thread_pool.setExpiryTimeout(-1)
+        # Runs only when the CPU would otherwise be idle (SCHED_IDLE on
+        # Linux), so decoding never slows down scrolling or typing
+        _image_thread_pool.setThreadPriority(QThread.IdlePriority)
+    return _image_thread_pool
+
+
+def get_job_thread_pool():
+    global _job_thread_pool
+    if _job_thread_pool is None:
+        _job_thread_pool = QThreadPool()
+        _job_thread_pool.setMaxThreadCount(JOB_THREAD_COUNT)
+        _job_thread_pool.setExpiryTimeout(-1)
+    return _job_thread_pool
+
+
+def shutdown_thread_pool():
+    # Lets in-flight queries finish before the connections are closed
+    for pool in (_job_thread_pool, _image_thread_pool, _thread_pool):
+        if pool is not None:
+            pool.waitForDone()
+
+
+class WorkerSignals(QObject):
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+
+
+class QueryWorker(QRunnable):
+    """Runs ``fn(*args)`` on a pool thread and reports back via signals.
+
+    ``fn`` must not touch widgets. ``cancel()`` drops the result and
+    interrupts the SQLite statement the worker is running, if any.
+    """
+
+    def __init__(self, token, fn, args):
+        super().__init__()
+        self.token = token
+        self.fn = fn
+        self.args = args
+        self.signals = WorkerSignals()
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def run(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self._conn = get_connection()
+        try:
+            result = self.fn(*self.args)
+        except sqlite3.OperationalError as e:
+            # An interrupted statement fails with "interrupted"; nobody
+            # is waiting for it any more
+            if not self.cancelled:
+                self._emit(self.signals.failed, str(e))
+            return
+        except Exception as e:
+            self._emit(self.signals.failed, str(e))
+            return
+        finally:
+            with self._lock:
+                self._conn = None
+        if not self.cancelled:
+            self._emit(self.signals.finished, result)
+
+    def _emit(self, signal, value):
+        try:
+            signal.emit(self.token, value)
+        except RuntimeError:
+            pass  # the application is shutting down
+
+
+class QueryRunner(QObject):
+    """Runs database calls for one form off the GUI thread.
+
+    ``run(key, ...)`` supersedes any call still pending under the same key,
+    so only the latest load for e.g. the product list ever reaches the
+    screen. ``submit(...)`` is for saves, which are never superseded.
+    Callbacks are always invoked on the GUI thread. Calls run on the
+    database threads unless another ``thread_pool`` is given.
+    """
+
+    # True while any call is in flight, for loading indicators
+    busy_changed = Signal(bool)
+
+    def __init__(self, parent=None, thread_pool=None):
+        super().__init__(parent)
+        self._thread_pool = thread_pool
+        self._next_token = 0
+        self._workers = {}
+        self._callbacks = {}
+        self._latest = {}
+
+    def run(self, key, fn, args=(), on_result=None, on_error=None):
+        previous = self._latest.get(key)
+        token = self._start(fn, args, on_result, on_error)
+        self._latest[key] = token
+        if previous is not None:
+            self._cancel_token(previous)
+        return token
+
+    def submit(self, fn, args=(), on_result=None, on_error=None):
+        return self._start(fn, args, on_result, on_error)
+
+    def cancel(self, key):
+        token = self._latest.pop(key, None)
+        if token is not None:
+            self._cancel_token(token)
+
+    def cancel_all(self):
+        for key in list(self._latest):
+            self.cancel(key)
+
+    def is_busy(self):
+        return bool(self._workers)
+
+    def _start(self, fn, args, on_result, on_error):
+        self._next_token += 1
+        token = self._next_token
+        worker = QueryWorker(token, fn, args)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.failed.connect(self._on_failed)
+        was_busy = self.is_busy()
+        self._workers[token] = worker
+        self._callbacks[token] = (on_result, on_error)
+        if not was_busy:
+            self.busy_changed.emit(True)
+        (self._thread_pool or get_thread_pool()).start(worker)
+        return token
+
+    def _cancel_token(self, token):
+        if token in self._workers:
+            self._workers[token].cancel()
+            self._forget(token)
+
+    def _forget(self, token):
+        self._workers.pop(token, None)
+        callbacks = self._callbacks.pop(token, (None, None))
+        for key, latest in list(self._latest.items()):
+            if latest == token:
+                del self._latest[key]
+        if not self.is_busy():
+            self.busy_changed.emit(False)
+        return callbacks
+
+    @Slot(int, object)
+    def _on_finished(self, token, result):
+        if token not in self._workers:
+            return  # superseded or cancelled
+        on_result, _ = self._forget(token)
+        if on_result:
+            on_result(result)
+
+    @Slot(int, str)
+    def _on_failed(self, token, message):
+        if token not in self._workers:
+            return
+        _, on_error = self._forget(token)
+        if on_error:
+            on_error(message)
@@ -1,27 +1,35 @@
 import sys
-import sqlite3
-import os
+import startup_profile
+startup_profile.start()
+
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton,
-                             QMessageBox, QStackedWidget, QFrame)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QIcon, QFont
-
-from forms.goods_receiving import GoodsReceivingForm
-from forms.sales_form import SalesForm
-from forms.product_master import ProductMasterForm
-from forms.supplier_master import SupplierMasterForm
-from forms.customer_master import CustomerMasterForm
-from forms.signup import SignupWindow
+                             QMessageBox, QStackedWidget, QFrame, QProgressDialog)
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QIcon
+
+# Form modules are imported when their window or page is first needed,
+# which keeps them off the path to the login window
+from forms.workers import shutdown_thread_pool
 from database.db_setup import setup_database
-from styles import MAIN_WINDOW_STYLE, NAV_BUTTON_STYLE, FORM_STYLE
+from database.connection import get_connection, close_all
+from database.catalog import invalidate as invalidate_catalog
+from styles import APP_STYLE
+
+startup_profile.mark("imports")
+
+# Stacked widget pages, in navigation bar order
+GOODS_RECEIVING_PAGE, SALES_PAGE, SALES_HISTORY_PAGE, REPORTS_PAGE, PRODUCT_MASTER_PAGE, \
+    SUPPLIER_MASTER_PAGE, CUSTOMER_MASTER_PAGE = range(7)
+
+# Shown first after login, so it is built while the login window is up
+LANDING_PAGE = GOODS_RECEIVING_PAGE
 
 class LoginWindow(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
         self.setup_ui()
-        self.setStyleSheet(MAIN_WINDOW_STYLE)
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -31,10 +39,7 @@ class LoginWindow(QWidget):
         # Title
         title_label = QLabel("Inventory Management System")
         title_label.setAlignment(Qt.AlignCenter)
-        title_font = QFont()
-        title_font.setPointSize(16)
-        title_font.setBold(True)
-        title_label.setFont(title_font)
+        title_label.setObjectName("loginTitle")
         
         # Username
         username_layout = QHBoxLayout()
@@ -57,8 +62,8 @@ class LoginWindow(QWidget):
         button_layout = QHBoxLayout()
         login_button = QPushButton("Login")
         signup_button = QPushButton("Sign Up")
-        login_button.setStyleSheet(NAV_BUTTON_STYLE)
-        signup_button.setStyleSheet(NAV_BUTTON_STYLE)
+        login_button.setProperty("nav", True)
+        signup_button.setProperty("nav", True)
         login_button.clicked.connect(self.login)
         signup_button.clicked.connect(self.show_signup)
         button_layout.addWidget(login_button)
@@ -75,30 +80,19 @@ class LoginWindow(QWidget):
         self.setLayout(layout)
         self.setWindowTitle("Login")
         self.setFixedSize(400, 300)
-        self.setStyleSheet("""
-            QWidget {
-                background-color: white;
-                border-radius: 10px;
-            }
-        """)
-
-    def get_db_connection(self):
-        db_path = os.path.join('database', 'inventory.db')
-        return sqlite3.connect(db_path)
+        self.setObjectName("loginWindow")
 
     def login(self):
         username = self.username_input.text()
         password = self.password_input.text()
         
-        conn = self.get_db_connection()
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute("SELECT id, username, name FROM users WHERE username = ? AND password = ?",
                       (username, password))
         user = cursor.fetchone()
         
-        conn.close()
-        
         if user:
             self.main_window.current_user = {
                 'id': user[0],
@@ -111,6 +105,7 @@ class LoginWindow(QWidget):
             QMessageBox.warning(self, "Error", "Invalid username or password")
 
     def show_signup(self):
+        from forms.signup import SignupWindow
         self.signup_window = SignupWindow(self)
         self.signup_window.show()
         self.hide()
@@ -118,15 +113,39 @@ class LoginWindow(QWidget):
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        # One sheet for every window; see styles.py
+        QApplication.instance().setStyleSheet(APP_STYLE)
         self.current_user = None
         self.setup_database()
         self.setup_ui()
         self.show_login()
-        self.setStyleSheet(MAIN_WINDOW_STYLE)
+        
+        # Once the login window is up, build the first page while the user
+        # types; its data loads at login
+        QTimer.singleShot(0, lambda: self.page_form(LANDING_PAGE))
 
     def setup_database(self):
-        # Always call setup_database to ensure tables are created
-        setup_database()
+        # Creates the schema on first run and applies pending migrations;
+        # an up-to-date database is left untouched
+        self.migration_progress = None
+        setup_database(report=self.report_migration_progress)
+        startup_profile.mark("database")
+        if self.migration_progress:
+            self.migration_progress.close()
+            self.migration_progress = None
+
+    def report_migration_progress(self, message, done, total):
+        # Only shown when a migration actually runs
+        if self.migration_progress is None:
+            self.migration_progress = QProgressDialog(self)
+            self.migration_progress.setWindowTitle("Updating Database")
+            self.migration_progress.setCancelButton(None)
+            self.migration_progress.setWindowModality(Qt.ApplicationModal)
+            self.migration_progress.setMinimumDuration(0)
+        self.migration_progress.setLabelText(message)
+        self.migration_progress.setMaximum(total)
+        self.migration_progress.setValue(done)
+        QApplication.processEvents()
 
     def setup_ui(self):
         self.setWindowTitle("Inventory Management System")
@@ -140,12 +159,7 @@ class MainWindow(QMainWindow):
         
         # Create navigation bar
         nav_frame = QFrame()
-        nav_frame.setStyleSheet("""
-            QFrame {
-                background-color: #2c3e50;
-                padding: 10px;
-            }
-        """)
+        nav_frame.setObjectName("navBar")
         nav_layout = QHBoxLayout()
         nav_layout.setSpacing(10)
         nav_layout.setContentsMargins(20, 10, 20, 10)
@@ -153,25 +167,31 @@ class MainWindow(QMainWindow):
         # Navigation buttons
         self.goods_receiving_btn = QPushButton("Goods Receiving")
         self.sales_btn = QPushButton("Sales")
+        self.sales_history_btn = QPushButton("Sales History")
+        self.reports_btn = QPushButton("Reports")
         self.product_master_btn = QPushButton("Product Master")
         self.supplier_master_btn = QPushButton("Supplier Master")
         self.customer_master_btn = QPushButton("Customer Master")
         
         # Set button styles
-        for btn in [self.goods_receiving_btn, self.sales_btn, self.product_master_btn,
-                   self.supplier_master_btn, self.customer_master_btn]:
-            btn.setStyleSheet(NAV_BUTTON_STYLE)
+        for btn in [self.goods_receiving_btn, self.sales_btn, self.sales_history_btn,
+                   self.reports_btn, self.product_master_btn, self.supplier_master_btn, self.customer_master_btn]:
+            btn.setProperty("nav", True)
         
         # Connect buttons
-        self.goods_receiving_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
-        self.sales_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(1))
-        self.product_master_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
-        self.supplier_master_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(3))
-        self.customer_master_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(4))
+        self.goods_receiving_btn.clicked.connect(lambda: self.show_page(GOODS_RECEIVING_PAGE))
+        self.sales_btn.clicked.connect(lambda: self.show_page(SALES_PAGE))
+        self.sales_history_btn.clicked.connect(lambda: self.show_page(SALES_HISTORY_PAGE))
+        self.reports_btn.clicked.connect(lambda: self.show_page(REPORTS_PAGE))
+        self.product_master_btn.clicked.connect(lambda: self.show_page(PRODUCT_MASTER_PAGE))
+        self.supplier_master_btn.clicked.connect(lambda: self.show_page(SUPPLIER_MASTER_PAGE))
+        self.customer_master_btn.clicked.connect(lambda: self.show_page(CUSTOMER_MASTER_PAGE))
         
         # Add buttons to nav layout
         nav_layout.addWidget(self.goods_receiving_btn)
         nav_layout.addWidget(self.sales_btn)
+        nav_layout.addWidget(self.sales_history_btn)
+        nav_layout.addWidget(self.reports_btn)
         nav_layout.addWidget(self.product_master_btn)
         nav_layout.addWidget(self.supplier_master_btn)
         nav_layout.addWidget(self.customer_master_btn)
@@ -181,24 +201,19 @@ class MainWindow(QMainWindow):
         
         # Create stacked widget for different forms
         self.stacked_widget = QStackedWidget()
-        self.stacked_widget.setStyleSheet(FORM_STYLE)
-        
-        # Add forms to stacked widget
-        self.product_master_form = ProductMasterForm(self.current_user)
-        self.supplier_master_form = SupplierMasterForm(self.current_user)
-        self.customer_master_form = CustomerMasterForm(self.current_user)
-        self.goods_receiving_form = GoodsReceivingForm(self.product_master_form, self.current_user)
-        self.sales_form = SalesForm(self.product_master_form, self.current_user)
+        self.stacked_widget.setProperty("form", True)
         
-        # Connect signals
-        self.supplier_master_form.supplier_added.connect(self.goods_receiving_form.load_suppliers)
-        self.customer_master_form.customer_added.connect(self.sales_form.load_customers)
-        
-        self.stacked_widget.addWidget(self.goods_receiving_form)
-        self.stacked_widget.addWidget(self.sales_form)
-        self.stacked_widget.addWidget(self.product_master_form)
-        self.stacked_widget.addWidget(self.supplier_master_form)
-        self.stacked_widget.addWidget(self.customer_master_form)
+        # Forms are built the first time their page is shown (see
+        # page_form); until then each page is an empty placeholder
+        self.goods_receiving_form = None
+        self.sales_form = None
+        self.sales_history_form = None
+        self.reports_form = None
+        self.product_master_form = None
+        self.supplier_master_form = None
+        self.customer_master_form = None
+        for _ in range(CUSTOMER_MASTER_PAGE + 1):
+            self.stacked_widget.addWidget(QWidget())
         
         # Add widgets to main layout
         main_layout.addWidget(nav_frame)
@@ -212,29 +227,94 @@ class MainWindow(QMainWindow):
         self.login_window.show()
         self.hide()
 
+    def built_forms(self):
+        return [form for form in (self.goods_receiving_form, self.sales_form,
+                                  self.sales_history_form, self.reports_form,
+                                  self.product_master_form,
+                                  self.supplier_master_form, self.customer_master_form)
+                if form is not None]
+
+    def page_form(self, index):
+        form = self.stacked_widget.widget(index)
+        if form in self.built_forms():
+            return form
+        
+        # Built with the current user (if any), so the form loads its own data
+        if index == GOODS_RECEIVING_PAGE:
+            from forms.goods_receiving import GoodsReceivingForm
+            form = self.goods_receiving_form = GoodsReceivingForm(current_user=self.current_user)
+        elif index == SALES_PAGE:
+            from forms.sales_form import SalesForm
+            form = self.sales_form = SalesForm(current_user=self.current_user)
+        elif index == SALES_HISTORY_PAGE:
+            from forms.sales_history import SalesHistoryForm
+            form = self.sales_history_form = SalesHistoryForm(current_user=self.current_user)
+        elif index == REPORTS_PAGE:
+            from forms.reports import ReportsForm
+            form = self.reports_form = ReportsForm(current_user=self.current_user)
+        elif index == PRODUCT_MASTER_PAGE:
+            from forms.product_master import ProductMasterForm
+            form = self.product_master_form = ProductMasterForm(self.current_user)
+            form.product_added.connect(self.product_added)
+        elif index == SUPPLIER_MASTER_PAGE:
+            from forms.supplier_master import SupplierMasterForm
+            form = self.supplier_master_form = SupplierMasterForm(self.current_user)
+            form.supplier_added.connect(self.supplier_added)
+        else:
+            from forms.customer_master import CustomerMasterForm
+            form = self.customer_master_form = CustomerMasterForm(self.current_user)
+            form.customer_added.connect(self.customer_added)
+        
+        current = self.stacked_widget.currentIndex()
+        placeholder = self.stacked_widget.widget(index)
+        self.stacked_widget.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stacked_widget.insertWidget(index, form)
+        self.stacked_widget.setCurrentIndex(current)
+        return form
+
+    def show_page(self, index):
+        self.page_form(index)
+        self.stacked_widget.setCurrentIndex(index)
+
+    # Masters notify only the forms that have been built; the rest read
+    # fresh data when they are
+    def product_added(self):
+        for form in (self.goods_receiving_form, self.sales_form, self.sales_history_form):
+            if form is not None:
+                form.load_products()
+
+    def supplier_added(self):
+        if self.goods_receiving_form is not None:
+            self.goods_receiving_form.load_suppliers()
+
+    def customer_added(self):
+        for form in (self.sales_form, self.sales_history_form):
+            if form is not None:
+                form.load_customers()
+
     def show_main_interface(self):
-        # Update forms with current user
-        self.product_master_form.current_user = self.current_user
-        self.supplier_master_form.current_user = self.current_user
-        self.customer_master_form.current_user = self.current_user
-        self.goods_receiving_form.current_user = self.current_user
-        self.sales_form.current_user = self.current_user
-        
-        # Refresh data
-        self.product_master_form.load_categories()
-        self.product_master_form.load_products()
-        self.supplier_master_form.load_suppliers()
-        self.customer_master_form.load_customers()
-        self.goods_receiving_form.load_products()
-        self.goods_receiving_form.load_suppliers()
-        self.goods_receiving_form.load_receiving_list()
-        self.sales_form.load_products()
-        self.sales_form.load_customers()
-        self.sales_form.load_sales_list()
+        # The product catalog is reloaded once per login so products added
+        # from other terminals show up
+        invalidate_catalog(self.current_user['id'])
+        
+        # Forms built before login (normally just the landing page) load now;
+        # the others load when first shown
+        for form in self.built_forms():
+            form.current_user = self.current_user
+            form.load_data()
+        self.show_page(self.stacked_widget.currentIndex())
         
         self.show()
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(shutdown_thread_pool)
+    app.aboutToQuit.connect(close_all)
+    startup_profile.mark("QApplication")
+    # Runs on the first turn of the event loop, with the login window up
+    # and before MainWindow builds the landing page
+    QTimer.singleShot(0, startup_profile.report)
     window = MainWindow()
+    startup_profile.mark("main window")
     sys.exit(app.exec()) 
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Startup instrumentation for main.py.
+
+With INVENTORY_PROFILE_STARTUP=1 set, main.py prints to stderr, once the
+login window is up, how long startup took to reach each milestone and
+which module imports cost the most. Times are measured from the first
+line of main.py, so interpreter start-up itself is not included.
+
+    INVENTORY_PROFILE_STARTUP=1 python main.py
+
+Without the variable every function here returns at once.
+"""
+import builtins
+import os
+import sys
+import time
+
+ENABLED = os.environ.get('INVENTORY_PROFILE_STARTUP', '') not in ('', '0')
+
+# Slowest imports listed in the report
+REPORT_IMPORTS = 20
+
+_started = time.perf_counter()
+_real_import = builtins.__import__
+_milestones = []
+_imports = {}   # module name -> [self seconds, cumulative seconds]
+_children = []  # time spent in nested imports, one entry per import in progress
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level == 0 and name in sys.modules:
+        return _real_import(name, globals, locals, fromlist, level)
+
+    _children.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _real_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = _children.pop()
+        if _children:
+            _children[-1] += elapsed
+        totals = _imports.setdefault(name, [0.0, 0.0])
+        totals[0] += elapsed - nested
+        totals[1] += elapsed
+
+
+def start():
+    """Begin timing imports; call before any other import in main.py."""
+    if ENABLED:
+        builtins.__import__ = _timed_import
+
+
+def mark(milestone):
+    if ENABLED:
+        _milestones.append((milestone, time.perf_counter() - _started))
+
+
+def report():
+    """Stop timing imports and print the milestones and slowest imports."""
+    if not ENABLED or builtins.__import__ is not _timed_import:
+        return
+    mark("login window")
+    builtins.__import__ = _real_import
+
+    print("Startup milestones:", file=sys.stderr)
+    for milestone, elapsed in _milestones:
+        print(f"  {elapsed * 1000:8.1f}ms  {milestone}", file=sys.stderr)
+    print(f"Slowest imports (of {len(_imports)}):", file=sys.stderr)
+    print(f"  {'self':>9} {'cumulative':>11}  module", file=sys.stderr)
+    slowest = sorted(_imports.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (own, cumulative) in slowest[:REPORT_IMPORTS]:
+        print(f"  {own * 1000:7.1f}ms {cumulative * 1000:9.1f}ms  {name}", file=sys.stderr)
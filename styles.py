@@ -8,8 +8,20 @@ BACKGROUND_COLOR = "#ecf0f1"  # Light gray
 TEXT_COLOR = "#2c3e50"  # Dark blue-gray
 WHITE = "#ffffff"
 
-# Main Window Styles
-MAIN_WINDOW_STYLE = f"""
+# The whole application is styled by this one sheet, set on the
+# QApplication by MainWindow. Widgets opt into the narrower rules with an
+# object name (#loginWindow, #navBar, ...) or a dynamic
+# property: nav="true" on navigation buttons, form="true" on form pages
+# and the stacked widget holding them.
+#
+# With an application style sheet, a widget is re-polished, and its
+# children with it, every time it is reparented. Forms therefore put each
+# container in place (form, scroll area, main widget, group box) before
+# adding its contents, so widgets are parented once instead of once per
+# level of nesting.
+FORM = 'QWidget[form="true"]'
+
+APP_STYLE = f"""
 QMainWindow {{
     background-color: {BACKGROUND_COLOR};
 }}
@@ -52,18 +64,18 @@ QLabel {{
     font-weight: bold;
 }}
 
-QTableWidget {{
+QTableView {{
     background-color: {WHITE};
     border: 1px solid #bdc3c7;
     border-radius: 4px;
     gridline-color: #ecf0f1;
 }}
 
-QTableWidget::item {{
+QTableView::item {{
     padding: 5px;
 }}
 
-QTableWidget::item:selected {{
+QTableView::item:selected {{
     background-color: {SECONDARY_COLOR};
     color: {WHITE};
 }}
@@ -93,17 +105,73 @@ QMessageBox {{
 QMessageBox QPushButton {{
     min-width: 80px;
 }}
-"""
 
-# Form-specific styles
-FORM_STYLE = f"""
-QWidget {{
+QWidget#loginWindow {{
+    background-color: {WHITE};
+    border-radius: 10px;
+}}
+
+QLabel#loginTitle {{
+    font-size: 16pt;
+}}
+
+/* Navigation */
+
+QFrame#navBar {{
+    background-color: {PRIMARY_COLOR};
+    padding: 10px;
+}}
+
+QPushButton[nav="true"] {{
+    background-color: {PRIMARY_COLOR};
+    color: {WHITE};
+    border: none;
+    padding: 10px 20px;
+    border-radius: 4px;
+    font-weight: bold;
+    font-size: 11pt;
+    min-width: 120px;
+}}
+
+QPushButton[nav="true"]:hover {{
+    background-color: #34495e;
+}}
+
+QPushButton[nav="true"]:pressed {{
+    background-color: #2c3e50;
+}}
+
+/* Forms */
+
+{FORM}, {FORM} QWidget {{
     background-color: {WHITE};
     border-radius: 8px;
     padding: 16px;
 }}
 
-QGroupBox {{
+{FORM} QScrollArea {{
+    border: none;
+    background-color: transparent;
+}}
+
+{FORM} QScrollBar:vertical {{
+    border: none;
+    background: #f0f0f0;
+    width: 10px;
+    margin: 0px;
+}}
+
+{FORM} QScrollBar::handle:vertical {{
+    background: #c0c0c0;
+    min-height: 20px;
+    border-radius: 5px;
+}}
+
+{FORM} QScrollBar::add-line:vertical, {FORM} QScrollBar::sub-line:vertical {{
+    height: 0px;
+}}
+
+{FORM} QGroupBox {{
     border: 2px solid {PRIMARY_COLOR};
     border-radius: 6px;
     margin-top: 12px;
@@ -111,13 +179,13 @@ QGroupBox {{
     color: {PRIMARY_COLOR};
 }}
 
-QGroupBox::title {{
+{FORM} QGroupBox::title {{
     subcontrol-origin: margin;
     left: 10px;
     padding: 0 5px;
 }}
 
-QPushButton {{
+{FORM} QPushButton {{
     background-color: {PRIMARY_COLOR};
     color: {WHITE};
     border: none;
@@ -128,83 +196,84 @@ QPushButton {{
     min-width: 120px;
 }}
 
-QPushButton:hover {{
+{FORM} QPushButton:hover {{
     background-color: #34495e;
 }}
 
-QPushButton:pressed {{
+{FORM} QPushButton:pressed {{
     background-color: #2c3e50;
 }}
 
-QPushButton[text="Clear Form"], QPushButton[text="Clear Filters"] {{
+{FORM} QPushButton[text="Clear Form"], {FORM} QPushButton[text="Clear Filters"] {{
     background-color: #e74c3c;
 }}
 
-QPushButton[text="Clear Form"]:hover, QPushButton[text="Clear Filters"]:hover {{
+{FORM} QPushButton[text="Clear Form"]:hover, {FORM} QPushButton[text="Clear Filters"]:hover {{
     background-color: #c0392b;
 }}
 
-QPushButton[text="Clear Form"]:pressed, QPushButton[text="Clear Filters"]:pressed {{
+{FORM} QPushButton[text="Clear Form"]:pressed, {FORM} QPushButton[text="Clear Filters"]:pressed {{
     background-color: #a93226;
 }}
 
-QComboBox {{
+QPushButton#uploadButton {{
+    padding: 5px 15px;
+    background-color: #4CAF50;
+    color: white;
+    border: none;
+    border-radius: 4px;
+}}
+
+QPushButton#uploadButton:hover {{
+    background-color: #45a049;
+}}
+
+{FORM} QComboBox {{
     border: 2px solid {PRIMARY_COLOR};
     border-radius: 4px;
-    padding: 5px 30px 5px 10px;
+    padding: 5px 20px 5px 10px;
     background-color: white;
     min-height: 30px;
 }}
 
-QComboBox:hover {{
+{FORM} QComboBox:hover {{
     border-color: #34495e;
 }}
 
-QComboBox:focus {{
+{FORM} QComboBox:focus {{
     border-color: #2980b9;
 }}
 
-QComboBox::drop-down {{
+{FORM} QComboBox::drop-down {{
     border: none;
-    width: 30px;
+    width: 20px;
     background-color: {PRIMARY_COLOR};
     border-top-right-radius: 2px;
     border-bottom-right-radius: 2px;
 }}
 
-QComboBox::down-arrow {{
+{FORM} QComboBox::down-arrow {{
     image: url(resources/down_arrow.png);
-    width: 16px;
-    height: 16px;
+    width: 12px;
+    height: 12px;
 }}
 
-QComboBox QAbstractItemView {{
+{FORM} QComboBox QAbstractItemView {{
     border: 2px solid {PRIMARY_COLOR};
     border-radius: 4px;
     background-color: white;
     selection-background-color: {PRIMARY_COLOR};
     selection-color: white;
 }}
-"""
 
-# Navigation button styles
-NAV_BUTTON_STYLE = f"""
-QPushButton {{
-    background-color: {PRIMARY_COLOR};
-    color: {WHITE};
+{FORM} QTableView {{
     border: none;
-    padding: 10px 20px;
-    border-radius: 4px;
-    font-weight: bold;
-    font-size: 11pt;
-    min-width: 120px;
-}}
-
-QPushButton:hover {{
-    background-color: #34495e;
+    background-color: white;
 }}
 
-QPushButton:pressed {{
-    background-color: #2c3e50;
+QLabel#imagePreview {{
+    border: 2px dashed #bdc3c7;
+    border-radius: 8px;
+    background-color: white;
 }}
-""" 
\ No newline at end of file
+"""
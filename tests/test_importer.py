@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connection
+from database.db_setup import setup_database
+from database.importer import import_products
+
+PRODUCTS_CSV = """SKU ID,Barcode,Category,Product Name,Tax Rate,Price,Default Unit
+A-1,111,Fruit,Apple,5,1.20,kg
+B-2,222,Fruit,Banana,5,0.80,kg
+C-3,,Dairy,Cheese,12,4.50,pc
+"""
+
+
+class ImportProductsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        connection.set_database_path(os.path.join(self.tmp.name, 'inventory.db'))
+        setup_database()
+        self.path = os.path.join(self.tmp.name, 'products.csv')
+        self.write_csv(PRODUCTS_CSV)
+
+    def tearDown(self):
+        connection.close_all()
+        self.tmp.cleanup()
+
+    def write_csv(self, text):
+        with open(self.path, 'w', newline='') as f:
+            f.write(text)
+
+    def test_reimport_writes_nothing(self):
+        first = import_products(1, self.path)
+        self.assertEqual((first['imported'], first['added']), (3, 3))
+
+        second = import_products(1, self.path)
+        self.assertEqual((second['imported'], second['added']), (0, 0))
+        self.assertEqual(second['error_count'], 0)
+
+    def test_reimport_counts_changed_rows(self):
+        import_products(1, self.path)
+        self.write_csv(PRODUCTS_CSV.replace('Banana,5,0.80', 'Banana,5,0.95'))
+
+        result = import_products(1, self.path)
+        self.assertEqual((result['imported'], result['added']), (1, 0))
+        price = connection.get_connection().execute(
+            "SELECT price FROM products WHERE sku_id = 'B-2' AND user_id = 1").fetchone()[0]
+        self.assertEqual(price, 0.95)
+
+
+if __name__ == '__main__':
+    unittest.main()